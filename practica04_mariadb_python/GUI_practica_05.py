@@ -1,20 +1,20 @@
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import mariadb
-import os
-from dotenv import load_dotenv
+from catalogo import Catalogo, obtener_pool
+from indice_busqueda import IndiceBusqueda
+from busqueda_texto import BuscadorTexto
+import importador
+
+MAX_ERRORES_VISTA = 1000
+MAX_FILAS_SELECTOR = 500
 
 def get_db_connection():
-    load_dotenv()
+    # Conexión del pool (el .env se lee una sola vez); conn.close() la regresa al pool
     try:
-        conn = mariadb.connect(
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASS"),
-            host=os.getenv("DB_HOST"),
-            port=int(os.getenv("DB_PORT")),
-            database=os.getenv("DB_NAME")
-        )
-        return conn
+        return obtener_pool().get_connection()
     except mariadb.Error as e:
         messagebox.showerror("Error de Conexión", f"No se pudo conectar a la base de datos: {e}")
         return None
@@ -26,8 +26,13 @@ class App(tk.Tk):
         self.geometry("600x650") 
 
         self.editoriales_map = {}
-        self.autores_map = {}
-        self.generos_map = {}
+        self.catalogo = Catalogo()
+        # Selectores de autores/géneros: índice de búsqueda, ID mostrados en el Listbox y ID elegidos
+        self.indices = {"autor": IndiceBusqueda(), "genero": IndiceBusqueda()}
+        self.visibles = {"autor": [], "genero": []}
+        self.seleccion = {"autor": set(), "genero": set()}
+        self.coincidencias = {"autor": 0, "genero": 0}
+        self.buscador = BuscadorTexto()
         
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(pady=10, padx=10, expand=True, fill="both")
@@ -36,12 +41,31 @@ class App(tk.Tk):
         self.create_genero_tab()
         self.create_autor_tab()
         self.create_libro_tab()
+        self.create_busqueda_tab()
+        self.create_import_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_all_data())
 
     def refresh_all_data(self):
-        self.load_editoriales()
-        self.load_autores()
-        self.load_generos()
-        print("Datos recargados en la pestaña de Libros.")
+        # COUNT/MAX(id) de las tres tablas en una consulta; solo se recarga lo que otro cambió
+        conn = get_db_connection()
+        if not conn: return
+        try:
+            cambiaron = self.catalogo.sincronizar(conn.cursor())
+        except mariadb.Error as e:
+            messagebox.showerror("Error de Carga", f"No se pudo leer el catálogo: {e}")
+            return
+        finally:
+            conn.close()
+        if "editorial" in cambiaron: self.load_editoriales()
+        if "autor" in cambiaron: self.load_selector("autor")
+        if "genero" in cambiaron: self.load_selector("genero")
+        if cambiaron: print(f"Catálogo recargado: {', '.join(cambiaron)}.")
+
+    def catalogo_agregar(self, tabla, id_nuevo, nombre):
+        # Lo recién insertado entra a la caché y a su índice, sin releer la tabla
+        self.catalogo[tabla].agregar(id_nuevo, nombre)
+        if tabla == "editorial": self.load_editoriales()
+        else: self.indices[tabla].agregar(id_nuevo, nombre); self.filtrar_selector(tabla)
 
     def create_editorial_tab(self):
         tab = ttk.Frame(self.notebook)
@@ -75,10 +99,10 @@ class App(tk.Tk):
             query = "INSERT INTO editorial (E_nombre, E_ubicacion) VALUES (?, ?)"
             cursor.execute(query, (nombre, ubicacion))
             conn.commit()
+            self.catalogo_agregar("editorial", cursor.lastrowid, nombre)
             messagebox.showinfo("Éxito", "Editorial insertada correctamente.")
             nombre_entry.delete(0, tk.END)
             ubicacion_entry.delete(0, tk.END)
-            self.refresh_all_data() 
         except mariadb.Error as e:
             messagebox.showerror("Error en Inserción", f"No se pudo insertar la editorial: {e}")
         finally:
@@ -121,11 +145,11 @@ class App(tk.Tk):
             query = "INSERT INTO genero (G_nombre, G_popularidad, G_descripcion) VALUES (?, ?, ?)"
             cursor.execute(query, (nombre, int(popularidad) if popularidad else 0, descripcion))
             conn.commit()
+            self.catalogo_agregar("genero", cursor.lastrowid, nombre)
             messagebox.showinfo("Éxito", "Género insertado correctamente.")
             nombre_entry.delete(0, tk.END)
             popularidad_entry.delete(0, tk.END)
             descripcion_entry.delete("1.0", tk.END)
-            self.refresh_all_data() 
         except mariadb.Error as e:
             messagebox.showerror("Error en Inserción", f"No se pudo insertar el género: {e}")
         except ValueError:
@@ -173,12 +197,12 @@ class App(tk.Tk):
             query = "INSERT INTO autor (A_nombre, A_finado, A_fecha_n, A_biografia) VALUES (?, ?, ?, ?)"
             cursor.execute(query, (nombre, finado, fecha_nac, biografia))
             conn.commit()
+            self.catalogo_agregar("autor", cursor.lastrowid, nombre)
             messagebox.showinfo("Éxito", "Autor insertado correctamente.")
             self.autor_nombre.delete(0, tk.END)
             self.autor_fecha.delete(0, tk.END)
             self.autor_bio.delete("1.0", tk.END)
             self.autor_finado.set(False)
-            self.refresh_all_data() 
         except mariadb.Error as e:
             messagebox.showerror("Error en Inserción", f"No se pudo insertar el autor: {e}")
         finally:
@@ -218,67 +242,71 @@ class App(tk.Tk):
         rel_frame.pack(fill="both", expand=True, padx=10, pady=5)
         
         ttk.Label(rel_frame, text="Autores (Ctrl+Click para multiselect):").grid(row=0, column=0, padx=5, pady=2, sticky="nw")
+        self.autores_filtro = tk.StringVar()
+        ttk.Entry(rel_frame, textvariable=self.autores_filtro).grid(row=1, column=0, padx=5, pady=2, sticky="ew")
         self.autores_listbox = tk.Listbox(rel_frame, selectmode="multiple", exportselection=False, height=5)
-        self.autores_listbox.grid(row=1, column=0, padx=5, pady=2)
+        self.autores_listbox.grid(row=2, column=0, padx=5, pady=2)
+        self.autores_conteo = ttk.Label(rel_frame, text="")
+        self.autores_conteo.grid(row=3, column=0, padx=5, sticky="w")
         
         ttk.Label(rel_frame, text="Géneros (Ctrl+Click para multiselect):").grid(row=0, column=1, padx=5, pady=2, sticky="nw")
+        self.generos_filtro = tk.StringVar()
+        ttk.Entry(rel_frame, textvariable=self.generos_filtro).grid(row=1, column=1, padx=5, pady=2, sticky="ew")
         self.generos_listbox = tk.Listbox(rel_frame, selectmode="multiple", exportselection=False, height=5)
-        self.generos_listbox.grid(row=1, column=1, padx=5, pady=2)
+        self.generos_listbox.grid(row=2, column=1, padx=5, pady=2)
+        self.generos_conteo = ttk.Label(rel_frame, text="")
+        self.generos_conteo.grid(row=3, column=1, padx=5, sticky="w")
+
+        self.selectores = {
+            "autor": (self.autores_filtro, self.autores_listbox, self.autores_conteo),
+            "genero": (self.generos_filtro, self.generos_listbox, self.generos_conteo),
+        }
+        for tabla, (filtro, listbox, _) in self.selectores.items():
+            filtro.trace_add("write", lambda *_, t=tabla: self.filtrar_selector(t))
+            listbox.bind("<<ListboxSelect>>", lambda e, t=tabla: self.actualizar_seleccion(t))
         
         assign_button = ttk.Button(rel_frame, text="2. Asignar Seleccionados", command=self.assign_autores_generos)
-        assign_button.grid(row=2, column=0, columnspan=2, pady=10)
+        assign_button.grid(row=4, column=0, columnspan=2, pady=10)
         
         self.refresh_all_data()
 
+    # Los widgets se llenan desde la caché del catálogo (refresh_all_data decide cuándo releer la DB)
     def load_editoriales(self):
-        conn = get_db_connection()
-        if not conn: return
-        cursor = conn.cursor()
-        self.editoriales_map.clear()
-        try:
-            cursor.execute("SELECT ID_editorial, E_nombre FROM editorial ORDER BY E_nombre")
-            editoriales = cursor.fetchall()
-            for id_ed, nombre_ed in editoriales:
-                self.editoriales_map[nombre_ed] = id_ed
-            self.libro_editorial['values'] = list(self.editoriales_map.keys())
-        except mariadb.Error as e:
-            messagebox.showerror("Error de Carga", f"No se pudieron cargar las editoriales: {e}")
-        finally:
-            conn.close()
-
-    def load_autores(self):
-        conn = get_db_connection()
-        if not conn: return
-        cursor = conn.cursor()
-        self.autores_map.clear()
-        self.autores_listbox.delete(0, tk.END)
-        try:
-            cursor.execute("SELECT ID_autor, A_nombre FROM autor ORDER BY A_nombre")
-            autores = cursor.fetchall()
-            for id_au, nombre_au in autores:
-                self.autores_map[nombre_au] = id_au
-                self.autores_listbox.insert(tk.END, nombre_au)
-        except mariadb.Error as e:
-            messagebox.showerror("Error de Carga", f"No se pudieron cargar los autores: {e}")
-        finally:
-            conn.close()
-
-    def load_generos(self):
-        conn = get_db_connection()
-        if not conn: return
-        cursor = conn.cursor()
-        self.generos_map.clear()
-        self.generos_listbox.delete(0, tk.END)
-        try:
-            cursor.execute("SELECT ID_genero, G_nombre FROM genero ORDER BY G_nombre")
-            generos = cursor.fetchall()
-            for id_gen, nombre_gen in generos:
-                self.generos_map[nombre_gen] = id_gen
-                self.generos_listbox.insert(tk.END, nombre_gen)
-        except mariadb.Error as e:
-            messagebox.showerror("Error de Carga", f"No se pudieron cargar los géneros: {e}")
-        finally:
-            conn.close()
+        filas = self.catalogo["editorial"].filas
+        self.editoriales_map = {nombre_ed: id_ed for id_ed, nombre_ed in filas}
+        self.libro_editorial['values'] = [nombre_ed for _, nombre_ed in filas]
+
+    def load_selector(self, tabla):
+        # El índice se arma una vez por recarga; lo elegido que ya no existe se descarta
+        self.indices[tabla].cargar(self.catalogo[tabla].filas)
+        self.seleccion[tabla] &= self.catalogo[tabla].por_id.keys()
+        self.filtrar_selector(tabla)
+
+    def filtrar_selector(self, tabla):
+        # Solo se pintan las filas que coinciden (hasta MAX_FILAS_SELECTOR); la selección va por ID
+        filtro, listbox, conteo = self.selectores[tabla]
+        indice = self.indices[tabla]
+        ids = indice.buscar(filtro.get())
+        self.visibles[tabla] = ids[:MAX_FILAS_SELECTOR]
+        listbox.delete(0, tk.END)
+        listbox.insert(tk.END, *[indice.etiqueta(id_) for id_ in self.visibles[tabla]])
+        for pos, id_ in enumerate(self.visibles[tabla]):
+            if id_ in self.seleccion[tabla]: listbox.selection_set(pos)
+        self.coincidencias[tabla] = len(ids)
+        self.mostrar_conteo(tabla)
+
+    def actualizar_seleccion(self, tabla):
+        # Lo elegido fuera del filtro actual se conserva
+        elegidas = set(self.selectores[tabla][1].curselection())
+        for pos, id_ in enumerate(self.visibles[tabla]):
+            if pos in elegidas: self.seleccion[tabla].add(id_)
+            else: self.seleccion[tabla].discard(id_)
+        self.mostrar_conteo(tabla)
+
+    def mostrar_conteo(self, tabla):
+        total, mostrados = self.coincidencias[tabla], len(self.visibles[tabla])
+        texto = f"{mostrados} de {total}" if total > mostrados else f"{total}"
+        self.selectores[tabla][2].config(text=f"{texto} coincidencias, {len(self.seleccion[tabla])} seleccionados")
 
     def insert_libro(self):
         isbn = self.libro_isbn.get()
@@ -315,10 +343,10 @@ class App(tk.Tk):
             messagebox.showwarning("ISBN Vacío", "Inserta un libro primero o escribe el ISBN del libro a modificar.")
             return
 
-        selected_autores_indices = self.autores_listbox.curselection()
-        selected_generos_indices = self.generos_listbox.curselection()
+        selected_autores = sorted(self.seleccion["autor"])
+        selected_generos = sorted(self.seleccion["genero"])
 
-        if not selected_autores_indices and not selected_generos_indices:
+        if not selected_autores and not selected_generos:
             messagebox.showwarning("Sin Selección", "No has seleccionado ningún autor o género para asignar.")
             return
 
@@ -327,15 +355,11 @@ class App(tk.Tk):
         cursor = conn.cursor()
         
         try:
-            for i in selected_autores_indices:
-                nombre_autor = self.autores_listbox.get(i)
-                id_autor = self.autores_map.get(nombre_autor)
-                cursor.execute("INSERT IGNORE INTO rel_a_l (ID_autor, L_ISBN) VALUES (?, ?)", (id_autor, isbn))
-
-            for i in selected_generos_indices:
-                nombre_genero = self.generos_listbox.get(i)
-                id_genero = self.generos_map.get(nombre_genero)
-                cursor.execute("INSERT IGNORE INTO rel_l_g (ID_genero, L_ISBN) VALUES (?, ?)", (id_genero, isbn))
+            # Un executemany por tabla en lugar de un INSERT por relación
+            autores = [(id_autor, isbn) for id_autor in selected_autores]
+            generos = [(id_genero, isbn) for id_genero in selected_generos]
+            if autores: cursor.executemany("INSERT IGNORE INTO rel_a_l (ID_autor, L_ISBN) VALUES (?, ?)", autores)
+            if generos: cursor.executemany("INSERT IGNORE INTO rel_l_g (ID_genero, L_ISBN) VALUES (?, ?)", generos)
 
             conn.commit()
             messagebox.showinfo("Éxito", "Autores y géneros asignados correctamente.")
@@ -344,13 +368,183 @@ class App(tk.Tk):
             self.libro_precio.delete(0, tk.END)
             self.libro_cantidad.delete(0, tk.END)
             self.libro_editorial.set('')
-            self.autores_listbox.selection_clear(0, tk.END)
-            self.generos_listbox.selection_clear(0, tk.END)
+            for tabla, (filtro, _, _) in self.selectores.items():
+                self.seleccion[tabla].clear()
+                filtro.set("")   # el trace vuelve a pintar la lista completa
         except mariadb.Error as e:
             messagebox.showerror("Error en Asignación", f"No se pudo asignar la relación: {e}")
         finally:
             conn.close()
 
+    # ============================================================
+    # BÚSQUEDA DE TEXTO (FULLTEXT)
+    # ============================================================
+    def create_busqueda_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Buscar")
+
+        form_frame = ttk.LabelFrame(tab, text="Buscar en el Catálogo")
+        form_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(form_frame, text="Buscar en:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.busqueda_campos = {"Biografías de autores": "autor.biografia", "Nombres de autores": "autor.nombre",
+                                "Descripciones de géneros": "genero.descripcion"}
+        self.busqueda_campo = ttk.Combobox(form_frame, width=38, state="readonly", values=list(self.busqueda_campos))
+        self.busqueda_campo.current(0)
+        self.busqueda_campo.grid(row=0, column=1, padx=5, pady=2)
+
+        ttk.Label(form_frame, text="Palabras:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.busqueda_texto = ttk.Entry(form_frame, width=40)
+        self.busqueda_texto.grid(row=1, column=1, padx=5, pady=2)
+        self.busqueda_texto.bind("<Return>", lambda e: self.buscar_texto())
+
+        ttk.Button(form_frame, text="Buscar", command=self.buscar_texto).grid(row=2, column=0, columnspan=2, pady=10)
+
+        res_frame = ttk.LabelFrame(tab, text="Resultados (más relevantes primero)")
+        res_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.busqueda_resultados = ttk.Treeview(res_frame, columns=("id", "nombre", "relevancia"), show="headings", height=12)
+        for col, titulo, ancho in (("id", "ID", 60), ("nombre", "Nombre", 320), ("relevancia", "Relevancia", 100)):
+            self.busqueda_resultados.heading(col, text=titulo)
+            self.busqueda_resultados.column(col, width=ancho)
+        self.busqueda_resultados.pack(fill="both", expand=True, padx=5, pady=5)
+        self.busqueda_estado = ttk.Label(res_frame, text="")
+        self.busqueda_estado.pack(fill="x", padx=5)
+
+    def buscar_texto(self):
+        texto = self.busqueda_texto.get()
+        if not texto.strip():
+            messagebox.showwarning("Campo Vacío", "Escribe al menos una palabra para buscar.")
+            return
+
+        conn = get_db_connection()
+        if not conn: return
+        try:
+            # Sin índice FULLTEXT (python busqueda_texto.py --crear-indices) se busca con LIKE
+            resultados = self.buscador.buscar(conn, self.busqueda_campos[self.busqueda_campo.get()], texto)
+        except mariadb.Error as e:
+            messagebox.showerror("Error en Búsqueda", f"No se pudo buscar: {e}")
+            return
+        finally:
+            conn.close()
+
+        self.busqueda_resultados.delete(*self.busqueda_resultados.get_children())
+        for id_, nombre, relevancia in resultados:
+            self.busqueda_resultados.insert("", tk.END, values=(id_, nombre, f"{relevancia:.2f}"))
+        campo = self.busqueda_campos[self.busqueda_campo.get()]
+        sin_indice = " Sin índice FULLTEXT: búsqueda con LIKE, sin relevancia." if self.buscador.con_indice and not self.buscador.con_indice[campo] else ""
+        self.busqueda_estado.config(text=(f"{len(resultados)} resultados." if resultados else
+                                          "Sin resultados (se buscan palabras completas o su inicio, de 3 letras o más).") + sin_indice)
+
+    # ============================================================
+    # IMPORTACIÓN MASIVA (CSV / JSON)
+    # ============================================================
+    def create_import_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Importar")
+
+        form_frame = ttk.LabelFrame(tab, text="Archivo a Importar")
+        form_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(form_frame, text="Archivo:").grid(row=0, column=0, padx=5, pady=2, sticky="w")
+        self.import_ruta = ttk.Entry(form_frame, width=40)
+        self.import_ruta.grid(row=0, column=1, padx=5, pady=2)
+        ttk.Button(form_frame, text="Examinar...", command=self.elegir_archivo_import).grid(row=0, column=2, padx=5, pady=2)
+
+        ttk.Label(form_frame, text="Tipo:").grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.import_tipo = ttk.Combobox(form_frame, width=38, state="readonly", values=importador.TIPOS)
+        self.import_tipo.set("libros")
+        self.import_tipo.grid(row=1, column=1, padx=5, pady=2)
+
+        ttk.Label(form_frame, text="Filas por lote:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.import_lote = ttk.Entry(form_frame, width=40)
+        self.import_lote.insert(0, str(importador.LOTE))
+        self.import_lote.grid(row=2, column=1, padx=5, pady=2)
+
+        self.import_estricto = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form_frame, text="Estricto (no crear autores/géneros/editoriales que falten)",
+                        variable=self.import_estricto).grid(row=3, column=0, columnspan=3, padx=5, pady=2, sticky="w")
+
+        self.import_button = ttk.Button(form_frame, text="Importar", command=self.iniciar_import)
+        self.import_button.grid(row=4, column=0, columnspan=3, pady=10)
+
+        estado_frame = ttk.LabelFrame(tab, text="Progreso")
+        estado_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.import_estado = ttk.Label(estado_frame, text="Sin importar.")
+        self.import_estado.pack(fill="x", padx=5, pady=2)
+        self.import_errores = tk.Text(estado_frame, height=10, state="disabled")
+        self.import_errores.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.import_cola = queue.Queue()
+
+    def elegir_archivo_import(self):
+        ruta = filedialog.askopenfilename(filetypes=[("CSV o JSON", "*.csv *.json *.jsonl"), ("Todos", "*.*")])
+        if ruta:
+            self.import_ruta.delete(0, tk.END)
+            self.import_ruta.insert(0, ruta)
+
+    def iniciar_import(self):
+        ruta = self.import_ruta.get()
+        if not ruta:
+            messagebox.showwarning("Archivo Vacío", "Elige un archivo CSV o JSON.")
+            return
+        try:
+            lote = int(self.import_lote.get())
+        except ValueError:
+            messagebox.showerror("Error de Formato", "Las filas por lote deben ser un número entero.")
+            return
+
+        conn = get_db_connection()
+        if not conn: return
+        self.import_button.config(state="disabled")
+        self.import_estado.config(text="Importando...")
+        self.mostrar_errores_import([])
+        # El hilo usa su propia conexión y su propio Catalogo; al terminar se sincroniza el de la GUI
+        trabajo = importador.Importador(conn, lote=max(1, lote), estricto=self.import_estricto.get())
+        threading.Thread(target=self.hilo_import, args=(conn, trabajo, ruta, self.import_tipo.get()), daemon=True).start()
+        self.after(100, self.revisar_import)
+
+    def hilo_import(self, conn, trabajo, ruta, tipo):
+        # Corre fuera del hilo de Tk: solo se comunica por la cola
+        try:
+            res = trabajo.importar(ruta, tipo, al_progreso=lambda *p: self.import_cola.put(("progreso", p)))
+            self.import_cola.put(("fin", res))
+        except Exception as e:
+            # Cualquier error (mariadb, archivo, csv.Error, JSON mal formado...) termina la importación
+            # con su mensaje; si el hilo muriera callado, revisar_import esperaría para siempre
+            self.import_cola.put(("error", e))
+        finally:
+            conn.close()
+
+    def revisar_import(self):
+        while True:
+            try: evento, dato = self.import_cola.get_nowait()
+            except queue.Empty: break
+            if evento == "progreso":
+                leidas, insertadas, errores, seg = dato
+                self.import_estado.config(text=f"{leidas:,d} leídas, {insertadas:,d} insertadas, {errores:,d} errores "
+                                               f"({insertadas / seg if seg else 0:,.0f} filas/s)")
+                continue
+            self.import_button.config(state="normal")
+            if evento == "error":
+                self.import_estado.config(text="Importación interrumpida.")
+                messagebox.showerror("Error en Importación", f"No se pudo importar el archivo: {dato}")
+            else:
+                creados = ", ".join(f"{n} {t}" for t, n in dato["creados"].items() if n) or "nada"
+                self.import_estado.config(text=f"{dato['insertadas']:,d} de {dato['leidas']:,d} registros en {dato['segundos']:.1f} s "
+                                               f"({dato['filas_s']:,.0f} filas/s). Creados: {creados}. Errores: {len(dato['errores']):,d}")
+                self.mostrar_errores_import(dato["errores"])
+                self.refresh_all_data()
+            return
+        self.after(100, self.revisar_import)
+
+    def mostrar_errores_import(self, errores):
+        self.import_errores.config(state="normal")
+        self.import_errores.delete("1.0", tk.END)
+        # Solo los primeros: un archivo muy malo no debe congelar el Text
+        self.import_errores.insert(tk.END, "".join(f"registro {n}: {msg}\n" for n, msg in errores[:MAX_ERRORES_VISTA]))
+        if len(errores) > MAX_ERRORES_VISTA: self.import_errores.insert(tk.END, f"... y {len(errores) - MAX_ERRORES_VISTA:,d} más\n")
+        self.import_errores.config(state="disabled")
+
 if __name__ == "__main__":
     app = App()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import sqlite3
+import time
+
+from catalogo import es_sqlite
+
+# ============================================================
+# ACTUALIZACIÓN MASIVA POR LLAVE (EN LUGAR DE UN UPDATE POR FILA)
+# ============================================================
+# actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad"], filas)
+# con filas = [(llave, valor, ...), ...]. Dos métodos:
+#   - "tabla" (el de siempre): los valores van a una tabla temporal con
+#     executemany (por lotes) y se aplican con un solo UPDATE unido por la
+#     llave (UPDATE ... JOIN en MariaDB, UPDATE ... FROM en SQLite 3.33+ y
+#     subconsultas correlacionadas en versiones anteriores).
+#   - "case": sin tabla temporal (p. ej. sin permiso CREATE TEMPORARY
+#     TABLES): UPDATE ... SET col = CASE llave WHEN ? THEN ? ... END por
+#     lotes de LOTE_CASE llaves.
+# Conteos exactos e iguales en ambos motores: "encontradas" (llaves que
+# existen), "cambiadas" (filas cuyo valor era distinto: las iguales se
+# excluyen en el WHERE con <=> / IS, así rowcount no depende de cómo
+# cuente cada motor) y "no_encontradas". Si una llave viene repetida, gana
+# el último valor. No hace commit: queda en la transacción del que llama.
+
+LOTE = 5000
+LOTE_CASE = 500
+METODOS = ("tabla", "case")
+
+def actualizar_masivo(conn, tabla, llave, columnas, filas, metodo="tabla", lote=LOTE):
+    if metodo not in METODOS: raise ValueError(f"método desconocido: {metodo}")
+    t0 = time.perf_counter()
+    valores = {f[0]: tuple(f[1:]) for f in filas}
+    if any(len(v) != len(columnas) for v in valores.values()): raise ValueError(f"cada fila debe traer la llave y {len(columnas)} valores")
+    cur = conn.cursor()
+    igual = "IS" if es_sqlite(conn) else "<=>"
+    if metodo == "tabla": encontradas, cambiadas = _por_tabla(conn, cur, tabla, llave, columnas, valores, igual, lote)
+    else: encontradas, cambiadas = _por_case(cur, tabla, llave, columnas, valores, igual)
+    return {"encontradas": encontradas, "cambiadas": cambiadas, "no_encontradas": len(valores) - encontradas,
+            "segundos": time.perf_counter() - t0}
+
+def _por_tabla(conn, cur, tabla, llave, columnas, valores, igual, lote):
+    temporal = f"_act_{tabla}"
+    cols = ", ".join(columnas)
+    # La temporal copia los tipos de la tabla real (SELECT ... LIMIT 0)
+    if es_sqlite(conn):
+        cur.execute(f"DROP TABLE IF EXISTS temp.{temporal}")
+        cur.execute(f"CREATE TEMP TABLE {temporal} AS SELECT {llave}, {cols} FROM {tabla} LIMIT 0")
+        cur.execute(f"CREATE UNIQUE INDEX temp.{temporal}_llave ON {temporal} ({llave})")
+    else:
+        # Llave primaria en el mismo CREATE: un ALTER/CREATE INDEX aparte haría commit implícito
+        cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {temporal}")
+        cur.execute(f"CREATE TEMPORARY TABLE {temporal} (PRIMARY KEY ({llave})) SELECT {llave}, {cols} FROM {tabla} LIMIT 0")
+    try:
+        insertar = f"INSERT INTO {temporal} ({llave}, {cols}) VALUES ({', '.join('?' * (len(columnas) + 1))})"
+        filas = [(k, *v) for k, v in valores.items()]
+        for i in range(0, len(filas), lote): cur.executemany(insertar, filas[i:i + lote])
+
+        cur.execute(f"SELECT COUNT(*) FROM {temporal} s JOIN {tabla} t ON t.{llave} = s.{llave}")
+        encontradas = cur.fetchone()[0]
+        if es_sqlite(conn):
+            iguales = " AND ".join(f"{tabla}.{c} {igual} s.{c}" for c in columnas)
+            if sqlite3.sqlite_version_info >= (3, 33):
+                asignar = ", ".join(f"{c} = s.{c}" for c in columnas)
+                cur.execute(f"UPDATE {tabla} SET {asignar} FROM {temporal} s WHERE s.{llave} = {tabla}.{llave} AND NOT ({iguales})")
+            else:
+                asignar = ", ".join(f"{c} = (SELECT s.{c} FROM {temporal} s WHERE s.{llave} = {tabla}.{llave})" for c in columnas)
+                cur.execute(f"UPDATE {tabla} SET {asignar} WHERE EXISTS (SELECT 1 FROM {temporal} s WHERE s.{llave} = {tabla}.{llave} "
+                            f"AND NOT ({iguales}))")
+        else:
+            asignar = ", ".join(f"t.{c} = s.{c}" for c in columnas)
+            iguales = " AND ".join(f"t.{c} {igual} s.{c}" for c in columnas)
+            cur.execute(f"UPDATE {tabla} t JOIN {temporal} s ON t.{llave} = s.{llave} SET {asignar} WHERE NOT ({iguales})")
+        return encontradas, cur.rowcount
+    finally:
+        cur.execute(f"DROP TABLE IF EXISTS temp.{temporal}" if es_sqlite(conn) else f"DROP TEMPORARY TABLE IF EXISTS {temporal}")
+
+def _por_case(cur, tabla, llave, columnas, valores, igual):
+    encontradas = cambiadas = 0
+    llaves = list(valores)
+    for i in range(0, len(llaves), LOTE_CASE):
+        grupo = llaves[i:i + LOTE_CASE]
+        en = f"{llave} IN ({', '.join('?' * len(grupo))})"
+        cur.execute(f"SELECT COUNT(*) FROM {tabla} WHERE {en}", grupo)
+        encontradas += cur.fetchone()[0]
+        casos = [(f"CASE {llave} {' '.join('WHEN ? THEN ?' for _ in grupo)} END", [x for k in grupo for x in (k, valores[k][j])])
+                 for j in range(len(columnas))]
+        # Texto y parámetros se arman juntos, en el orden en que aparecen los ? en la sentencia
+        sql, params = [], []
+        def agregar(texto, p=()): sql.append(texto); params.extend(p)
+        agregar(f"UPDATE {tabla} SET ")
+        for n, (c, (caso, p)) in enumerate(zip(columnas, casos)): agregar(f"{', ' if n else ''}{c} = {caso}", p)
+        agregar(f" WHERE {en} AND (", grupo)
+        # El mismo CASE en el WHERE deja fuera las filas que ya tenían ese valor
+        for n, (c, (caso, p)) in enumerate(zip(columnas, casos)): agregar(f"{' OR ' if n else ''}NOT ({c} {igual} {caso})", p)
+        agregar(")")
+        cur.execute("".join(sql), params)
+        cambiadas += cur.rowcount
+    return encontradas, cambiadas
+
+# ============================================================
+# BENCHMARK: UPDATE fila por fila vs tabla temporal + UPDATE unido vs CASE por lotes
+# ============================================================
+# SQLite en memoria; con --mariadb usa una tabla TEMPORARY en la base del .env (no toca autor).
+# En SQLite (dentro del proceso) cada UPDATE cuesta casi nada y el lazo no pierde; lo que se
+# ahorra es una ida y vuelta al servidor por fila: en MariaDB son n UPDATE contra n / LOTE
+# executemany + 2 sentencias.
+if __name__ == "__main__":
+    import random
+    import sys
+
+    n = 100_000
+    rng = random.Random(0)
+    paises = ["mexicana", "chilena", "argentina", "peruana", "colombiana", "estadounidense", "británica"]
+    nuevas = [(k, rng.choice(paises)) for k in range(1, n + 1)] + [(n + k, "fantasma") for k in range(1, 501)]
+
+    if sys.argv[1:] == ["--mariadb"]:
+        from catalogo import obtener_pool
+        conn = obtener_pool().get_connection()
+        crear = "CREATE TEMPORARY TABLE autor_bench (ID_autor INT PRIMARY KEY, nacionalidad VARCHAR(100) NOT NULL)"
+    else:
+        conn = sqlite3.connect(":memory:")
+        crear = "CREATE TABLE autor_bench (ID_autor INTEGER PRIMARY KEY, nacionalidad VARCHAR(100) NOT NULL)"
+    cur = conn.cursor()
+    cur.execute(crear)
+
+    def reiniciar():
+        cur.execute("DELETE FROM autor_bench")
+        cur.executemany("INSERT INTO autor_bench VALUES (?, ?)", [(k, paises[k % 2]) for k in range(1, n + 1)])
+        conn.commit()
+
+    reiniciar(); t0 = time.perf_counter(); cambiadas = 0
+    for id_autor, nacionalidad in nuevas:
+        cur.execute("UPDATE autor_bench SET nacionalidad = ? WHERE ID_autor = ?", (nacionalidad, id_autor)); cambiadas += cur.rowcount
+    conn.commit(); por_fila = time.perf_counter() - t0
+    cur.execute("SELECT ID_autor, nacionalidad FROM autor_bench"); esperado = sorted(cur.fetchall())
+    print(f"{n:,d} autores (+500 llaves que no existen) | fila por fila: {por_fila:.2f} s, rowcount sumado {cambiadas:,d} "
+          f"(SQLite cuenta las encontradas, MariaDB solo las que cambiaron)")
+
+    for metodo in METODOS:
+        reiniciar()
+        res = actualizar_masivo(conn, "autor_bench", "ID_autor", ["nacionalidad"], nuevas, metodo=metodo)
+        conn.commit()
+        cur.execute("SELECT ID_autor, nacionalidad FROM autor_bench"); assert sorted(cur.fetchall()) == esperado
+        print(f"{metodo:>6}: {res['segundos']:.2f} s ({por_fila / res['segundos']:.1f}x) | encontradas {res['encontradas']:,d}, "
+              f"cambiadas {res['cambiadas']:,d}, no encontradas {res['no_encontradas']:,d}")
+    conn.close()
@@ -0,0 +1,183 @@
+import math
+from collections import Counter
+from bisect import bisect_left
+
+from catalogo import es_sqlite
+from indice_busqueda import normalizar
+
+# ============================================================
+# BÚSQUEDA DE TEXTO COMPLETO (BIOGRAFÍAS, DESCRIPCIONES, NOMBRES)
+# ============================================================
+# Una sola API para la GUI y los scripts: buscar(conn, campo, texto) regresa
+# (id, nombre, relevancia) de mayor a menor relevancia.
+#   - MariaDB: índices FULLTEXT y MATCH ... AGAINST en modo booleano,
+#     "+palabra*" por cada palabra: todas deben aparecer, como inicio de
+#     alguna palabra del texto. Los índices se crean en un paso aparte
+#     (crear_indices / python busqueda_texto.py --crear-indices): es DDL,
+#     con commit implícito y permiso ALTER. Buscar nunca los crea: si
+#     falta el de un campo se busca con LIKE (misma regla, más lento y sin
+#     relevancia: todas valen 1.0 y salen por nombre).
+#   - SQLite: no hay FULLTEXT en el esquema; se arma en memoria un índice
+#     invertido (palabra -> {id: veces}) con la misma regla y relevancia
+#     tf-idf. Se vuelve a armar si la base cambió desde que se armó:
+#     PRAGMA data_version (escrituras de otras conexiones) y total_changes
+#     (de esta conexión) cuestan microsegundos, no recorren la tabla.
+# A diferencia de LIKE '%texto%', no encuentra pedazos a media palabra
+# ("obel" no da "Nobel"). Las palabras de menos de MIN_PALABRA letras se
+# ignoran, igual que InnoDB (innodb_ft_min_token_size = 3).
+
+CAMPOS = {
+    # campo: (tabla, columna id, columna nombre, columna de texto)
+    "autor.biografia": ("autor", "ID_autor", "A_nombre", "A_biografia"),
+    "autor.nombre": ("autor", "ID_autor", "A_nombre", "A_nombre"),
+    "genero.descripcion": ("genero", "ID_genero", "G_nombre", "G_descripcion"),
+}
+MIN_PALABRA = 3
+LIMITE = 100
+
+def palabras_busqueda(texto): return [p for p in normalizar(texto).split() if len(p) >= MIN_PALABRA]
+
+def nombre_indice(campo): return "ft_" + campo.replace(".", "_")
+
+def indices_existentes(cur):
+    # MariaDB: campo -> si ya tiene su índice FULLTEXT (solo lee information_schema)
+    cur.execute("SELECT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'")
+    hay = {tuple(f) for f in cur.fetchall()}
+    return {campo: (tabla, nombre_indice(campo)) in hay for campo, (tabla, _, _, _) in CAMPOS.items()}
+
+def crear_indices(conn):
+    # Paso de instalación (MariaDB): crea los índices FULLTEXT que falten y regresa sus nombres
+    cur = conn.cursor(); creados = []
+    for campo, existe in indices_existentes(cur).items():
+        if existe: continue
+        tabla, _, _, columna = CAMPOS[campo]
+        cur.execute(f"ALTER TABLE {tabla} ADD FULLTEXT INDEX {nombre_indice(campo)} ({columna})")
+        creados.append(nombre_indice(campo))
+    return creados
+
+class IndiceInvertido:
+    def __init__(self, filas=()):
+        # filas: (id, nombre, texto)
+        self.nombres = {}
+        self.postings = {}   # palabra -> {id: veces}
+        for id_, nombre, texto in filas:
+            self.nombres[id_] = nombre
+            for p, veces in Counter(normalizar(texto).split()).items():
+                docs = self.postings.get(p)
+                if docs is None: self.postings[p] = {id_: veces}
+                else: docs[id_] = veces
+        self.vocabulario = sorted(self.postings)
+        self.firma = None
+
+    def buscar(self, palabras, limite=LIMITE):
+        n = len(self.nombres) or 1
+        puntos = None
+        for palabra in palabras:
+            # Todas las palabras del índice que empiezan con esta (como "palabra*" en MariaDB)
+            lo = bisect_left(self.vocabulario, palabra)
+            hi = bisect_left(self.vocabulario, palabra + "\U0010ffff")
+            esta = {}
+            for p in self.vocabulario[lo:hi]:
+                docs = self.postings[p]; idf = math.log(1 + n / len(docs))
+                for id_, veces in docs.items(): esta[id_] = esta.get(id_, 0.0) + veces * idf
+            puntos = esta if puntos is None else {i: s + esta[i] for i, s in puntos.items() if i in esta}
+            if not puntos: return []
+        mejores = sorted(puntos.items(), key=lambda t: (-t[1], t[0]))[:limite]
+        return [(id_, self.nombres[id_], s) for id_, s in mejores]
+
+class BuscadorTexto:
+    def __init__(self):
+        self.indices = {}          # campo -> IndiceInvertido (solo SQLite)
+        self.con_indice = None     # MariaDB: campo -> tiene índice FULLTEXT (se revisa una vez; None = sin revisar)
+
+    def preparar(self, conn):
+        # MariaDB: qué campos tienen índice FULLTEXT. Después de crear_indices, con_indice = None para volver a ver
+        if self.con_indice is None and not es_sqlite(conn): self.con_indice = indices_existentes(conn.cursor())
+
+    def buscar(self, conn, campo, texto, limite=LIMITE):
+        # limite=None: todos los resultados
+        if campo not in CAMPOS: raise ValueError(f"campo desconocido: {campo}")
+        palabras = palabras_busqueda(texto)
+        if not palabras: return []
+        tabla, col_id, col_nombre, columna = CAMPOS[campo]
+        cur = conn.cursor()
+        if es_sqlite(conn): return self._indice(cur, campo).buscar(palabras, limite)
+        self.preparar(conn)
+        if not self.con_indice[campo]:
+            # Inicio de palabra: al principio del texto o después de un espacio ("_" es comodín en LIKE)
+            palabras = [p.replace("_", "!_") for p in palabras]
+            cur.execute(f"SELECT {col_id}, {col_nombre}, 1.0 FROM {tabla} WHERE "
+                        + " AND ".join(f"({columna} LIKE ? ESCAPE '!' OR {columna} LIKE ? ESCAPE '!')" for _ in palabras)
+                        + f" ORDER BY {col_nombre}, {col_id}" + (" LIMIT ?" if limite else ""),
+                        [x for p in palabras for x in (f"{p}%", f"% {p}%")] + ([limite] if limite else []))
+            return [(i, n, float(r)) for i, n, r in cur.fetchall()]
+        consulta = " ".join(f"+{p}*" for p in palabras)
+        cur.execute(f"SELECT {col_id}, {col_nombre}, MATCH({columna}) AGAINST (? IN BOOLEAN MODE) AS relevancia FROM {tabla} "
+                    f"WHERE MATCH({columna}) AGAINST (? IN BOOLEAN MODE) ORDER BY relevancia DESC, {col_id}"
+                    + (" LIMIT ?" if limite else ""), (consulta, consulta, limite)[:3 if limite else 2])
+        return [tuple(f) for f in cur.fetchall()]
+
+    def _indice(self, cur, campo):
+        tabla, col_id, col_nombre, columna = CAMPOS[campo]
+        cur.execute("PRAGMA data_version")
+        firma = (cur.fetchone()[0], cur.connection.total_changes)
+        indice = self.indices.get(campo)
+        if indice is None or indice.firma != firma:
+            cur.execute(f"SELECT {col_id}, {col_nombre}, {columna} FROM {tabla}")
+            indice = self.indices[campo] = IndiceInvertido(cur.fetchall()); indice.firma = firma
+        return indice
+
+# ============================================================
+# BENCHMARK: LIKE '%texto%' vs índice (SQLite en memoria; --mariadb usa la base del .env)
+# python busqueda_texto.py --crear-indices solo crea los índices FULLTEXT que falten.
+# ============================================================
+if __name__ == "__main__":
+    import random
+    import sqlite3
+    import sys
+    import time
+
+    buscador = BuscadorTexto()
+
+    def comparar(conn, textos, total):
+        for texto in textos:
+            like = " AND ".join("A_biografia LIKE ?" for _ in texto.split())
+            cur = conn.cursor(); t0 = time.perf_counter()
+            cur.execute(f"SELECT ID_autor FROM autor WHERE {like}", [f"%{p}%" for p in texto.split()])
+            esperado = {r[0] for r in cur.fetchall()}
+            lento = time.perf_counter() - t0
+            t0 = time.perf_counter(); vueltas = 20
+            for _ in range(vueltas): r = buscador.buscar(conn, "autor.biografia", texto, limite=total)
+            rapido = (time.perf_counter() - t0) / vueltas
+            print(f"{texto!r:>24}: LIKE {len(esperado):6,d} filas en {lento * 1000:7.1f} ms | "
+                  f"índice {len(r):6,d} filas en {rapido * 1000:7.2f} ms")
+            yield esperado, {i for i, _, _ in r}
+
+    textos = ["Nobel", "premio cervantes", "dramaturgo ensayista", "palabra2999"]
+    if sys.argv[1:2] in (["--mariadb"], ["--crear-indices"]):
+        # --crear-indices: el paso de instalación; --mariadb: benchmark sobre la tabla autor real de la base del .env
+        from catalogo import obtener_pool
+        conn = obtener_pool().get_connection()
+        try:
+            creados = crear_indices(conn)
+            print(f"Índices FULLTEXT creados: {', '.join(creados)}" if creados else "Los índices FULLTEXT ya existían.")
+            if sys.argv[1] == "--mariadb":
+                for _ in comparar(conn, sys.argv[2:] or textos, 10_000): pass
+        finally:
+            conn.close()
+        sys.exit()
+
+    n = 50_000
+    rng = random.Random(0)
+    vocab = [f"palabra{k}" for k in range(3000)] + ["novelista", "poeta", "ensayista", "periodista", "dramaturgo"]
+    premios = ["Premio Nobel de Literatura", "Premio Cervantes", "Premio Rómulo Gallegos", "Premio Pulitzer"]
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE autor (ID_autor INTEGER PRIMARY KEY, A_nombre TEXT, A_finado TEXT, A_fecha_n TEXT, A_biografia TEXT)")
+    db.executemany("INSERT INTO autor (A_nombre, A_biografia) VALUES (?, ?)",
+                   ((f"Autor {k}", " ".join(rng.choices(vocab, k=40)) + (f" Ganó el {rng.choice(premios)} en {1950 + k % 70}." if k % 50 == 0 else ""))
+                    for k in range(n)))
+
+    t0 = time.perf_counter(); buscador.buscar(db, "autor.biografia", "Nobel"); armado = time.perf_counter() - t0
+    print(f"{n:,d} biografías | índice invertido armado en {armado * 1000:.0f} ms (solo la primera búsqueda o tras un cambio)")
+    for esperado, encontrados in comparar(db, textos, n): assert esperado == encontrados
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+# ============================================================
+# POOL DE CONEXIONES Y CACHÉ DEL CATÁLOGO
+# ============================================================
+# El .env se lee una vez y las conexiones salen de un mariadb.ConnectionPool:
+# conn.close() regresa la conexión al pool en lugar de cerrarla.
+#
+# El catálogo (editoriales, autores, géneros: id y nombre) vive en memoria
+# ordenado por nombre. Lo que inserta la GUI se agrega directo a la caché
+# (con el id de lastrowid), sin volver a leer la tabla. Para enterarse de
+# lo que insertan o borran otros, una sola consulta trae COUNT(*) y MAX(id)
+# de las tres tablas; solo la que cambió se vuelve a cargar.
+# Funciona igual con sqlite3 (mismo estilo de parámetros "?"); el conector
+# mariadb solo se importa al crear el pool, así que con SQLite no hace falta.
+
+TABLAS = {
+    "editorial": ("ID_editorial", "E_nombre"),
+    "autor": ("ID_autor", "A_nombre"),
+    "genero": ("ID_genero", "G_nombre"),
+}
+
+_pool = None
+
+def config_db():
+    load_dotenv()
+    return dict(user=os.getenv("DB_USER"), password=os.getenv("DB_PASS"), host=os.getenv("DB_HOST"),
+                port=int(os.getenv("DB_PORT")), database=os.getenv("DB_NAME"))
+
+def obtener_pool(tamano=4):
+    global _pool
+    if _pool is None:
+        import mariadb
+        _pool = mariadb.ConnectionPool(pool_name="libreria", pool_size=tamano, **config_db())
+    return _pool
+
+@contextmanager
+def conexion():
+    conn = obtener_pool().get_connection()
+    try: yield conn
+    finally: conn.close()  # de vuelta al pool
+
+def orden(nombre): return (nombre or "").casefold()
+
+def es_sqlite(conn): return isinstance(conn, sqlite3.Connection)
+
+class TablaCatalogo:
+    def __init__(self, tabla, col_id, col_nombre):
+        self.tabla = tabla
+        self.col_id = col_id
+        self.col_nombre = col_nombre
+        self.claves = []    # orden(nombre), en el mismo orden que filas (para bisect)
+        self.filas = []     # (id, nombre) ordenadas por nombre
+        self.por_id = {}
+        self.firma = None   # (COUNT(*), MAX(id)) de la última carga
+        self._por_nombre = None
+
+    def cargar(self, cursor):
+        cursor.execute(f"SELECT {self.col_id}, {self.col_nombre} FROM {self.tabla}")
+        self.filas = sorted(((i, n or "") for i, n in cursor.fetchall()), key=lambda f: (orden(f[1]), f[0]))
+        self.claves = [orden(n) for _, n in self.filas]
+        self.por_id = dict(self.filas)
+        self.firma = (len(self.filas), max(self.por_id, default=None))
+        self._por_nombre = None
+
+    def agregar(self, id_, nombre):
+        # Regresa la posición donde quedó (para insertarla igual en el Listbox)
+        clave = orden(nombre)
+        pos = bisect_left(self.claves, clave)
+        while pos < len(self.filas) and self.claves[pos] == clave and self.filas[pos][0] < id_: pos += 1
+        self.claves.insert(pos, clave); self.filas.insert(pos, (id_, nombre))
+        self.por_id[id_] = nombre
+        if self._por_nombre is not None: self._por_nombre.setdefault(nombre, id_)
+        n, maximo = self.firma or (0, None)
+        self.firma = (n + 1, id_ if maximo is None else max(maximo, id_))
+        return pos
+
+    def nombres(self): return [n for _, n in self.filas]
+
+    def por_nombre(self):
+        # nombre -> ID (si hay nombres repetidos, el ID menor); se arma solo cuando se pide
+        if self._por_nombre is None:
+            self._por_nombre = {}
+            for id_, nombre in sorted(self.filas): self._por_nombre.setdefault(nombre, id_)
+        return self._por_nombre
+
+class Catalogo:
+    def __init__(self):
+        self.tablas = {t: TablaCatalogo(t, *cols) for t, cols in TABLAS.items()}
+
+    def __getitem__(self, tabla): return self.tablas[tabla]
+
+    def firmas(self, cursor):
+        # Una sola ida a la DB para las tres tablas
+        cursor.execute(" UNION ALL ".join(f"SELECT '{t}', COUNT(*), MAX({c.col_id}) FROM {t}" for t, c in self.tablas.items()))
+        return {t: (n, m) for t, n, m in cursor.fetchall()}
+
+    def sincronizar(self, cursor):
+        # Recarga solo las tablas que cambiaron desde la última vez; regresa cuáles
+        cambiaron = []
+        for tabla, firma in self.firmas(cursor).items():
+            if firma != self.tablas[tabla].firma:
+                self.tablas[tabla].cargar(cursor); cambiaron.append(tabla)
+        return cambiaron
+
+# ============================================================
+# BENCHMARK: recarga completa vs revisión de cambios + inserción incremental
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    n = 50_000
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE editorial (ID_editorial INTEGER PRIMARY KEY, E_nombre TEXT, E_ubicacion TEXT)")
+    db.execute("CREATE TABLE autor (ID_autor INTEGER PRIMARY KEY, A_nombre TEXT, A_finado TEXT, A_fecha_n TEXT, A_biografia TEXT)")
+    db.execute("CREATE TABLE genero (ID_genero INTEGER PRIMARY KEY, G_nombre TEXT, G_popularidad INTEGER, G_descripcion TEXT)")
+    db.executemany("INSERT INTO autor (A_nombre) VALUES (?)", ((f"Autor {k * 7919 % n:05d}",) for k in range(n)))
+    db.executemany("INSERT INTO genero (G_nombre) VALUES (?)", ((f"Género {k}",) for k in range(200)))
+    cur = db.cursor()
+    cat = Catalogo(); cat.sincronizar(cur)
+
+    t0 = time.perf_counter()
+    for t in cat.tablas.values(): t.cargar(cur)
+    recarga = time.perf_counter() - t0
+
+    t0 = time.perf_counter(); vueltas = 200
+    for k in range(vueltas):
+        cur.execute("INSERT INTO autor (A_nombre) VALUES (?)", (f"Nuevo {k}",))
+        cat["autor"].agregar(cur.lastrowid, f"Nuevo {k}")
+        assert cat.sincronizar(cur) == []   # nada que recargar: la caché ya lo tiene
+    incremental = (time.perf_counter() - t0) / vueltas
+
+    db.execute("INSERT INTO genero (G_nombre) VALUES ('Otro cliente')")
+    print(f"{n:,d} autores | recarga completa {recarga * 1000:.1f} ms | insertar + revisar cambios {incremental * 1000:.2f} ms "
+          f"| cambio externo detectado: {cat.sincronizar(cur)}")
+    assert [n for _, n in cat["autor"].filas] == sorted((n for _, n in cat["autor"].filas), key=orden)
@@ -0,0 +1,245 @@
+import csv
+import json
+import os
+import time
+from itertools import chain
+
+from catalogo import Catalogo, es_sqlite
+
+# ============================================================
+# IMPORTACIÓN MASIVA (CSV / JSON) DE LIBROS, AUTORES, GÉNEROS Y EDITORIALES
+# ============================================================
+# El archivo se lee en streaming (CSV, JSON Lines o un arreglo JSON) y se
+# escribe por lotes: cada lote es una transacción con un executemany por
+# tabla. Columnas (encabezados del CSV o llaves del JSON):
+#   libros:      isbn, nombre, precio, cantidad, editorial, autores, generos
+#                (autores/generos: nombres separados por ";" o lista JSON)
+#   autores:     nombre, finado, fecha_n, biografia
+#   generos:     nombre, popularidad, descripcion
+#   editoriales: nombre, ubicacion
+# En libros, editorial/autores/géneros van por nombre: se resuelven a ID
+# con los mapas del catálogo (catalogo.py) y los que no existen se crean
+# en el mismo lote (o son error por fila con estricto=True).
+# Una fila inválida no tumba el lote: se valida antes, los ISBN repetidos
+# se detectan con una consulta por lote, y si aun así el executemany falla
+# el lote se reintenta fila por fila para reportar solo las malas.
+
+TIPOS = ("libros", "autores", "generos", "editoriales")
+LOTE = 1000
+
+SQL = {
+    "autores": "INSERT INTO autor (A_nombre, A_finado, A_fecha_n, A_biografia) VALUES (?, ?, ?, ?)",
+    "generos": "INSERT INTO genero (G_nombre, G_popularidad, G_descripcion) VALUES (?, ?, ?)",
+    "editoriales": "INSERT INTO editorial (E_nombre, E_ubicacion) VALUES (?, ?)",
+    "libros": "INSERT INTO libro (L_ISBN, L_nombre, L_Precio, L_Cantidad, ID_editorial) VALUES (?, ?, ?, ?, ?)",
+}
+
+class ErrorFila(Exception):
+    pass
+
+# ============================================================
+# LECTURA EN STREAMING
+# ============================================================
+def leer_registros(ruta):
+    # (número de registro, dict) uno por uno, sin cargar el archivo completo
+    with open(ruta, encoding="utf-8-sig", newline="") as f:
+        if os.path.splitext(ruta)[1].lower() == ".csv":
+            yield from enumerate(csv.DictReader(f), start=1)
+            return
+        inicio = f.read(1)
+        while inicio and inicio.isspace(): inicio = f.read(1)
+        if inicio == "[": yield from _arreglo_json(f)
+        else:
+            n = 0
+            for linea in chain([inicio + f.readline()], f):
+                if linea.strip(): n += 1; yield n, json.loads(linea)
+
+def _arreglo_json(f, bloque=1 << 16):
+    # Objetos de un arreglo JSON grande, decodificados de a uno con raw_decode
+    decoder = json.JSONDecoder(); buf = ""; n = 0
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if buf.startswith("]"): return
+        try:
+            obj, fin = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            mas = f.read(bloque)
+            if not mas: raise
+            buf += mas; continue
+        n += 1; buf = buf[fin:]
+        yield n, obj
+
+def _texto(r, campo):
+    v = r.get(campo)
+    return v.strip() if isinstance(v, str) else v
+
+def _nombres(v):
+    if not v: return []
+    if isinstance(v, str): v = v.split(";")
+    return [x.strip() for x in v if x and x.strip()]
+
+def _convertir(tipo, r):
+    # dict del archivo -> tupla para SQL[tipo] (libros: con nombres en lugar de IDs); ErrorFila si no sirve
+    if not isinstance(r, dict): raise ErrorFila(f"se esperaba un objeto con columnas, llegó {type(r).__name__}")
+    nombre = _texto(r, "nombre")
+    if not nombre: raise ErrorFila("falta el nombre")
+    try:
+        if tipo == "autores":
+            finado = _texto(r, "finado")
+            finado = str(finado).upper() in ("1", "TRUE", "SI", "SÍ", "X") if finado not in (None, "") else False
+            return (nombre, finado, _texto(r, "fecha_n") or None, _texto(r, "biografia") or "")
+        if tipo == "generos":
+            pop = _texto(r, "popularidad")
+            return (nombre, int(pop) if pop not in (None, "") else 0, _texto(r, "descripcion") or "")
+        if tipo == "editoriales":
+            return (nombre, _texto(r, "ubicacion") or "")
+        isbn = str(_texto(r, "isbn") or "")
+        if not isbn: raise ErrorFila("falta el ISBN")
+        editorial = _texto(r, "editorial")
+        if not editorial: raise ErrorFila("falta la editorial")
+        return (isbn, nombre, float(_texto(r, "precio")), int(_texto(r, "cantidad")), editorial,
+                _nombres(r.get("autores")), _nombres(r.get("generos")))
+    except (TypeError, ValueError) as e:
+        raise ErrorFila(f"valor inválido: {e}")
+
+# ============================================================
+# ESCRITURA POR LOTES
+# ============================================================
+class Importador:
+    def __init__(self, conn, catalogo=None, lote=LOTE, estricto=False):
+        self.conn = conn
+        self.catalogo = catalogo or Catalogo()
+        self.lote = lote
+        self.estricto = estricto
+        self.ignorar = "INSERT OR IGNORE" if es_sqlite(conn) else "INSERT IGNORE"
+
+    def importar(self, ruta, tipo, al_progreso=None):
+        # Regresa dict con leidas, insertadas, errores [(registro, mensaje)], creados {tabla: n}, segundos, filas_s
+        if tipo not in TIPOS: raise ValueError(f"tipo desconocido: {tipo}")
+        cur = self.conn.cursor()
+        self.catalogo.sincronizar(cur)
+        res = {"leidas": 0, "insertadas": 0, "errores": [], "creados": {"editorial": 0, "autor": 0, "genero": 0}}
+        t0 = time.perf_counter(); pendientes = []
+        for n, registro in leer_registros(ruta):
+            res["leidas"] += 1
+            try: pendientes.append((n, _convertir(tipo, registro)))
+            except ErrorFila as e: res["errores"].append((n, str(e)))
+            if len(pendientes) >= self.lote:
+                self._lote(cur, tipo, pendientes, res); pendientes = []
+                if al_progreso: al_progreso(res["leidas"], res["insertadas"], len(res["errores"]), time.perf_counter() - t0)
+        if pendientes: self._lote(cur, tipo, pendientes, res)
+        self.catalogo.sincronizar(cur)   # lo importado entra a la caché (una recarga por tabla que cambió)
+        res["segundos"] = time.perf_counter() - t0
+        res["filas_s"] = res["insertadas"] / res["segundos"] if res["segundos"] else 0.0
+        if al_progreso: al_progreso(res["leidas"], res["insertadas"], len(res["errores"]), res["segundos"])
+        return res
+
+    def _lote(self, cur, tipo, filas, res):
+        errores, creados = len(res["errores"]), dict(res["creados"])
+        try:
+            listas = self._preparar_libros(cur, filas, res) if tipo == "libros" else filas
+            self._escribir(cur, tipo, listas)
+            self.conn.commit(); res["insertadas"] += len(listas)
+        except Exception:
+            # Algo que la validación no vio (FK, tipo de columna...): fila por fila, cada una en su transacción.
+            # Lo que el lote alcanzó a crear se deshizo: la caché se vuelve a leer.
+            self.conn.rollback(); self.catalogo.sincronizar(cur)
+            del res["errores"][errores:]; res["creados"] = creados
+            for n, fila in filas:
+                errores, creados = len(res["errores"]), dict(res["creados"])
+                try:
+                    listas = self._preparar_libros(cur, [(n, fila)], res) if tipo == "libros" else [(n, fila)]
+                    self._escribir(cur, tipo, listas)
+                    self.conn.commit(); res["insertadas"] += len(listas)
+                except Exception as e:
+                    self.conn.rollback(); self.catalogo.sincronizar(cur)
+                    del res["errores"][errores:]; res["creados"] = creados; res["errores"].append((n, str(e)))
+
+    def _escribir(self, cur, tipo, filas):
+        if not filas: return
+        if tipo != "libros": cur.executemany(SQL[tipo], [f for _, f in filas]); return
+        cur.executemany(SQL["libros"], [f[:5] for _, f in filas])
+        autores = [(a, f[0]) for _, f in filas for a in dict.fromkeys(f[5])]
+        generos = [(g, f[0]) for _, f in filas for g in dict.fromkeys(f[6])]
+        if autores: cur.executemany(f"{self.ignorar} INTO rel_a_l (ID_autor, L_ISBN) VALUES (?, ?)", autores)
+        if generos: cur.executemany(f"{self.ignorar} INTO rel_l_g (ID_genero, L_ISBN) VALUES (?, ?)", generos)
+
+    def _preparar_libros(self, cur, filas, res):
+        # ISBN repetidos (en la DB o dentro del mismo archivo) son error de esa fila, no del lote
+        isbns = [f[0] for _, f in filas]
+        cur.execute(f"SELECT L_ISBN FROM libro WHERE L_ISBN IN ({', '.join('?' * len(isbns))})", isbns)
+        vistos = {r[0] for r in cur.fetchall()}
+        buenas = []
+        for n, f in filas:
+            if f[0] in vistos: res["errores"].append((n, f"ISBN {f[0]} repetido")); continue
+            vistos.add(f[0]); buenas.append((n, f))
+        return self._resolver(cur, buenas, res)
+
+    def _resolver(self, cur, filas, res):
+        # Nombres -> IDs con los mapas del catálogo; los que faltan se crean todos juntos
+        faltan = {"editorial": set(), "autor": set(), "genero": set()}
+        ed, au, ge = (self.catalogo[t].por_nombre() for t in ("editorial", "autor", "genero"))
+        for _, f in filas:
+            if f[4] not in ed: faltan["editorial"].add(f[4])
+            faltan["autor"].update(a for a in f[5] if a not in au)
+            faltan["genero"].update(g for g in f[6] if g not in ge)
+        if self.estricto:
+            buenas = []
+            for n, f in filas:
+                malos = [x for x in [f[4], *f[5], *f[6]] if x in faltan["editorial"] | faltan["autor"] | faltan["genero"]]
+                if malos: res["errores"].append((n, f"no existe: {', '.join(malos)}"))
+                else: buenas.append((n, f))
+            filas = buenas
+        else:
+            for tabla, nombres in faltan.items():
+                if nombres: self._crear(cur, tabla, sorted(nombres)); res["creados"][tabla] += len(nombres)
+        ed, au, ge = (self.catalogo[t].por_nombre() for t in ("editorial", "autor", "genero"))
+        return [(n, (f[0], f[1], f[2], f[3], ed[f[4]], [au[a] for a in f[5]], [ge[g] for g in f[6]])) for n, f in filas]
+
+    def _crear(self, cur, tabla, nombres):
+        t = self.catalogo[tabla]
+        columnas = {"editorial": "(E_nombre, E_ubicacion) VALUES (?, '')", "autor": "(A_nombre, A_finado, A_biografia) VALUES (?, FALSE, '')",
+                    "genero": "(G_nombre, G_popularidad, G_descripcion) VALUES (?, 0, '')"}[tabla]
+        cur.executemany(f"INSERT INTO {tabla} {columnas}", [(x,) for x in nombres])
+        # executemany no da cada lastrowid: se leen los IDs por nombre
+        cur.execute(f"SELECT {t.col_id}, {t.col_nombre} FROM {tabla} WHERE {t.col_nombre} IN ({', '.join('?' * len(nombres))})", nombres)
+        existentes = set(t.por_id)
+        for i, nombre in cur.fetchall():
+            if i not in existentes: t.agregar(i, nombre)
+
+def guardar_errores(errores, ruta):
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f); w.writerow(["registro", "error"]); w.writerows(errores)
+
+# ============================================================
+# LÍNEA DE COMANDOS
+# ============================================================
+# python importador.py catalogo.csv --tipo libros [--lote 1000] [--estricto] [--errores errores.csv]
+# Usa la base de datos del .env (o --sqlite ruta para una base local).
+if __name__ == "__main__":
+    import argparse
+    import sqlite3
+    import sys
+
+    ap = argparse.ArgumentParser(description="Importación masiva a la base de datos de la librería")
+    ap.add_argument("archivo"); ap.add_argument("--tipo", choices=TIPOS, default="libros")
+    ap.add_argument("--lote", type=int, default=LOTE); ap.add_argument("--estricto", action="store_true", help="no crear editoriales/autores/géneros que falten")
+    ap.add_argument("--errores", help="CSV donde guardar las filas con error"); ap.add_argument("--sqlite", help="usar esta base SQLite en lugar de MariaDB")
+    args = ap.parse_args()
+
+    def progreso(leidas, insertadas, errores, seg):
+        print(f"\r{leidas:,d} leídas, {insertadas:,d} insertadas, {errores:,d} errores, {insertadas / seg if seg else 0:,.0f} filas/s", end="", flush=True)
+
+    if args.sqlite: conn = sqlite3.connect(args.sqlite)
+    else:
+        from catalogo import obtener_pool
+        conn = obtener_pool().get_connection()
+    try:
+        res = Importador(conn, lote=args.lote, estricto=args.estricto).importar(args.archivo, args.tipo, progreso)
+    finally:
+        conn.close()
+    print(f"\n{res['insertadas']:,d} de {res['leidas']:,d} registros en {res['segundos']:.2f} s ({res['filas_s']:,.0f} filas/s). "
+          f"Creados: {res['creados']}. Errores: {len(res['errores'])}")
+    for n, e in res["errores"][:20]: print(f"  registro {n}: {e}")
+    if args.errores and res["errores"]: guardar_errores(res["errores"], args.errores); print(f"Errores guardados en {args.errores}")
+    sys.exit(1 if res["errores"] else 0)
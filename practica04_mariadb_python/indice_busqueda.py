@@ -0,0 +1,146 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+from catalogo import orden
+
+# ============================================================
+# ÍNDICE EN MEMORIA PARA FILTRAR LOS SELECTORES (TYPE-AHEAD)
+# ============================================================
+# Se arma una vez desde la caché del catálogo (TablaCatalogo.filas, ya
+# ordenadas por nombre) y contesta con los ID que coinciden, en el mismo
+# orden en que se muestran. Nombres y búsqueda se normalizan igual (sin
+# acentos, casefold), y la búsqueda se parte en fragmentos que deben
+# aparecer todos:
+#   - 1 o 2 letras: inicio de alguna palabra (lista ordenada de palabras + bisect)
+#   - 3 o más: en cualquier parte del nombre (trigramas -> filas que los tienen)
+# Se toma como punto de partida el fragmento con menos candidatos y el resto
+# se verifica solo sobre esos. Lo insertado después (agregar) entra a las
+# listas y a su lugar en el orden sin rearmar nada.
+
+_PALABRA = re.compile(r"\w+")
+
+def normalizar(texto):
+    texto = (texto or "").casefold()
+    if not texto.isascii():
+        texto = "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+    return " ".join(_PALABRA.findall(texto))
+
+# Los trigramas que cruzan un espacio sobran pero no estorban: sale más barato sacarlos del nombre completo
+def trigramas(clave): return {clave[k:k + 3] for k in range(len(clave) - 2)}
+
+_VACIO = frozenset()
+
+class IndiceBusqueda:
+    def __init__(self, filas=()):
+        self.cargar(filas)
+
+    def cargar(self, filas):
+        # filas: (id, nombre) en el orden de la caché del catálogo
+        self.ids = []
+        self.claves = []     # nombre normalizado de cada fila
+        self.nombres = {}    # id -> nombre tal cual
+        self.llaves = []     # (orden(nombre), id) ordenadas: el orden de despliegue del catálogo
+        self.orden = []      # filas en orden de despliegue (paralela a llaves)
+        self.posicion = []   # fila -> lugar en orden
+        self.palabras = []   # (palabra, fila) ordenadas
+        self.trigramas = {}  # trigrama -> set de filas
+        self._repetidos = {}
+        for id_, nombre in filas:
+            r = self._indexar(id_, nombre)
+            self.palabras.extend((palabra, r) for palabra in self.claves[r].split())
+        self.palabras.sort()
+        # Las filas vienen ya en el orden del catálogo; por si acaso se ordenan (timsort: casi gratis si ya lo están)
+        llaves = [(orden(self.nombres[id_]), id_) for id_ in self.ids]
+        self.orden = sorted(range(len(llaves)), key=llaves.__getitem__)
+        self.llaves = [llaves[r] for r in self.orden]
+        self.posicion = [0] * len(self.ids)
+        for k, r in enumerate(self.orden): self.posicion[r] = k
+
+    def agregar(self, id_, nombre):
+        # Una fila nueva (insertada desde la GUI) entra en su lugar sin rearmar el índice
+        r = self._indexar(id_, nombre)
+        for palabra in self.claves[r].split(): insort(self.palabras, (palabra, r))
+        llave = (orden(nombre), id_); k = bisect_left(self.llaves, llave)
+        self.llaves.insert(k, llave); self.orden.insert(k, r); self.posicion.append(k)
+        for j in range(k + 1, len(self.orden)): self.posicion[self.orden[j]] = j
+
+    def _indexar(self, id_, nombre):
+        r = len(self.ids); clave = normalizar(nombre)
+        self.ids.append(id_); self.claves.append(clave); self.nombres[id_] = nombre
+        self._repetidos[nombre] = self._repetidos.get(nombre, 0) + 1
+        indice = self.trigramas
+        for g in trigramas(clave):
+            filas = indice.get(g)
+            if filas is None: indice[g] = {r}
+            else: filas.add(r)
+        return r
+
+    def __len__(self): return len(self.ids)
+
+    def etiqueta(self, id_):
+        # Los nombres repetidos llevan su ID para distinguirlos en la lista
+        nombre = self.nombres[id_]
+        return f"{nombre} (ID {id_})" if self._repetidos.get(nombre, 0) > 1 else nombre
+
+    def buscar(self, texto):
+        # Regresa los ID que coinciden, en orden de despliegue
+        fragmentos = normalizar(texto).split()
+        if not fragmentos: return [self.ids[r] for r in self.orden]
+        listas = sorted((self.trigramas.get(g, _VACIO) for f in fragmentos if len(f) >= 3 for g in trigramas(f)), key=len)
+        if listas:
+            # Intersección de los trigramas, empezando por el más raro; exacta para fragmentos de 3 letras
+            candidatas = set(listas[0])
+            for lista in listas[1:]:
+                if not candidatas: break
+                candidatas &= lista
+            revisar = [f for f in fragmentos if len(f) != 3]
+            # Un fragmento corto cuyo rango de palabras es angosto también recorta (y ya no se revisa)
+            for f in [f for f in revisar if len(f) < 3]:
+                lo, hi = self._rango(f)
+                if hi - lo <= 4 * len(candidatas):
+                    candidatas &= {r for _, r in self.palabras[lo:hi]}; revisar.remove(f)
+        else:
+            # Solo fragmentos cortos: el rango de palabras más angosto; los demás se revisan
+            rangos = sorted(((self._rango(f), f) for f in fragmentos), key=lambda r: r[0][1] - r[0][0])
+            (lo, hi), _ = rangos[0]
+            candidatas = {r for _, r in self.palabras[lo:hi]}
+            revisar = [f for _, f in rangos[1:]]
+        if revisar: candidatas = [r for r in candidatas if all(_coincide(self.claves[r], f) for f in revisar)]
+        return [self.ids[r] for r in sorted(candidatas, key=self.posicion.__getitem__)]
+
+    def _rango(self, prefijo):
+        return bisect_left(self.palabras, (prefijo,)), bisect_left(self.palabras, (prefijo + "\U0010ffff",))
+
+def _coincide(clave, fragmento):
+    if len(fragmento) >= 3: return fragmento in clave
+    return clave.startswith(fragmento) or f" {fragmento}" in clave
+
+# ============================================================
+# BENCHMARK: índice vs recorrer todos los nombres
+# ============================================================
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(0)
+    nombres_ = ["José", "María", "Stephen", "Gabriel", "Isabel", "Jorge", "Octavio", "Rosario", "Juan", "Elena", "Carlos", "Ana"]
+    apellidos = ["King", "García Márquez", "Allende", "Borges", "Paz", "Castellanos", "Rulfo", "Poniatowska", "Fuentes", "Cortázar"]
+    filas = [(k + 1, f"{rng.choice(nombres_)} {rng.choice(apellidos)} {k:05d}") for k in range(50_000)]
+    filas.sort(key=lambda f: (orden(f[1]), f[0]))
+
+    t0 = time.perf_counter(); indice = IndiceBusqueda(filas); armado = time.perf_counter() - t0
+
+    def lineal(texto):
+        fragmentos = normalizar(texto).split()
+        return [i for i, n in filas if all(_coincide(normalizar(n), f) for f in fragmentos)]
+
+    for k in range(300): indice.agregar(50_001 + k, f"{rng.choice(nombres_)} Nuevo {k}")
+    filas = sorted(filas + [(i, indice.nombres[i]) for i in indice.ids[50_000:]], key=lambda f: (orden(f[1]), f[0]))
+    print(f"{len(indice):,d} nombres | índice armado en {armado * 1000:.0f} ms")
+    for texto in ["s", "st", "ste", "gabriel garc", "marquez 0042", "cortazar 4", "nuevo 1", "zzz"]:
+        t0 = time.perf_counter(); vueltas = 50
+        for _ in range(vueltas): r = indice.buscar(texto)
+        rapido = (time.perf_counter() - t0) / vueltas
+        t0 = time.perf_counter(); lineal(texto); lento = time.perf_counter() - t0
+        print(f"{texto!r:>16}: {len(r):6,d} coincidencias | índice {rapido * 1000:7.3f} ms | recorrido {lento * 1000:7.1f} ms")
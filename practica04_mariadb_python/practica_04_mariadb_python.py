@@ -2,6 +2,8 @@ import mariadb
 import sys
 import os 
 from dotenv import load_dotenv 
+from busqueda_texto import BuscadorTexto, crear_indices
+from actualizacion_masiva import actualizar_masivo
 
 load_dotenv()
 
@@ -34,22 +36,30 @@ try:
     for fila in cursor.fetchall():
         print(fila)
 
+    # Búsquedas de texto con índices FULLTEXT (MATCH ... AGAINST) en lugar de LIKE '%...%'
+    creados = crear_indices(conn)
+    if creados: print(f"Índices FULLTEXT creados: {', '.join(creados)}")
+    buscador = BuscadorTexto()
+
     print("\nBuscar a 'Stephen King'")
-    query_sk = "SELECT * FROM autor WHERE A_nombre LIKE ?"
-    cursor.execute(query_sk, ('%Stephen King%',))
-    for fila in cursor.fetchall():
-        print(fila)
+    ids_sk = [id_autor for id_autor, _, _ in buscador.buscar(conn, "autor.nombre", "Stephen King", limite=None)]
+    if ids_sk:
+        cursor.execute(f"SELECT * FROM autor WHERE ID_autor IN ({', '.join('?' * len(ids_sk))})", ids_sk)
+        for fila in cursor.fetchall():
+            print(fila)
 
     print("\nAutores finados, con Nobel, nacidos en marzo")
-    query_nobel = """
-        SELECT A_nombre, A_biografia, A_fecha_n FROM autor
-        WHERE A_finado = 'TRUE'
-        AND A_biografia LIKE ?
-        AND A_fecha_n LIKE ?
-    """
-    cursor.execute(query_nobel, ('%Nobel%', '__/03/%'))
-    for fila in cursor.fetchall():
-        print(fila)
+    ids_nobel = [id_autor for id_autor, _, _ in buscador.buscar(conn, "autor.biografia", "Nobel", limite=None)]
+    if ids_nobel:
+        query_nobel = f"""
+            SELECT A_nombre, A_biografia, A_fecha_n FROM autor
+            WHERE A_finado = 'TRUE'
+            AND ID_autor IN ({', '.join('?' * len(ids_nobel))})
+            AND A_fecha_n LIKE ?
+        """
+        cursor.execute(query_nobel, (*ids_nobel, '__/03/%'))
+        for fila in cursor.fetchall():
+            print(fila)
 
     print("\nModificando tabla y actualizando datos")
     
@@ -69,12 +79,12 @@ try:
         13: 'británica', 14: 'británica', 15: 'inglesa', 16: 'británica'
     }
 
-    query_update = "UPDATE autor SET nacionalidad = ? WHERE ID_autor = ?"
-    for id_autor, nacionalidad in nacionalidades.items():
-        cursor.execute(query_update, (nacionalidad, id_autor))
+    # Tabla temporal + un solo UPDATE unido por ID_autor (en lugar de un UPDATE por autor)
+    res = actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad"], nacionalidades.items())
     
     conn.commit()
-    print(f"{cursor.rowcount * len(nacionalidades)} registros de nacionalidad actualizados correctamente.")
+    print(f"{res['cambiadas']} registros de nacionalidad actualizados correctamente "
+          f"({res['encontradas'] - res['cambiadas']} ya estaban al día, {res['no_encontradas']} IDs no existen).")
     print("Cambios guardados permanentemente en la base de datos (commit).")
 
     print("\nVerificando actualización del autor con ID 1:")
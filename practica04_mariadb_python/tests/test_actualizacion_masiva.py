@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+import actualizacion_masiva
+from actualizacion_masiva import METODOS, actualizar_masivo
+
+INICIAL = [(1, "mexicana", "Ana"), (2, "chilena", None), (3, "peruana", "Luis"), (4, "argentina", None), (5, "mexicana", "Eva")]
+
+@pytest.fixture
+def conn():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE autor (ID_autor INTEGER PRIMARY KEY, nacionalidad VARCHAR(100) NOT NULL, alias VARCHAR(50))")
+    db.executemany("INSERT INTO autor VALUES (?, ?, ?)", INICIAL)
+    db.commit()
+    yield db; db.close()
+
+def autores(conn): return conn.execute("SELECT ID_autor, nacionalidad, alias FROM autor ORDER BY ID_autor").fetchall()
+
+FILAS = [
+    (1, "mexicana", "Ana"),     # igual: no cuenta como cambiada
+    (2, "chilena", None),       # igual con NULL (IS, no =)
+    (3, "colombiana", "Luis"),  # cambia una columna
+    (4, "argentina", "Tito"),   # NULL -> valor
+    (5, "mexicana", None),      # valor -> NULL
+    (9, "fantasma", None),      # no existe
+    (3, "británica", "Lu"),     # llave repetida: gana la última
+]
+
+@pytest.mark.parametrize("metodo", METODOS)
+def test_conteos_y_valores(conn, metodo):
+    res = actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad", "alias"], FILAS, metodo=metodo, lote=2)
+    assert (res["encontradas"], res["cambiadas"], res["no_encontradas"]) == (5, 3, 1)
+    assert autores(conn) == [(1, "mexicana", "Ana"), (2, "chilena", None), (3, "británica", "Lu"),
+                             (4, "argentina", "Tito"), (5, "mexicana", None)]
+
+@pytest.mark.parametrize("metodo", METODOS)
+def test_nada_que_cambiar(conn, metodo):
+    res = actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad", "alias"], INICIAL, metodo=metodo)
+    assert (res["encontradas"], res["cambiadas"], res["no_encontradas"]) == (5, 0, 0)
+    assert autores(conn) == INICIAL
+
+def test_case_por_lotes_una_columna(conn, monkeypatch):
+    # Lotes de 2 llaves: cada UPDATE lleva sus propios CASE e IN, con los ? en el orden de la sentencia
+    monkeypatch.setattr(actualizacion_masiva, "LOTE_CASE", 2)
+    filas = [(k, "mexicana") for k in range(1, 10)]
+    res = actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad"], filas, metodo="case")
+    assert (res["encontradas"], res["cambiadas"], res["no_encontradas"]) == (5, 3, 4)
+    assert [r[1] for r in autores(conn)] == ["mexicana"] * 5 and [r[2] for r in autores(conn)] == [r[2] for r in INICIAL]
+
+def test_tabla_con_sqlite_sin_update_from(conn, monkeypatch):
+    # SQLite < 3.33: subconsultas correlacionadas en lugar de UPDATE ... FROM
+    monkeypatch.setattr(actualizacion_masiva.sqlite3, "sqlite_version_info", (3, 31, 1))
+    res = actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad", "alias"], FILAS, metodo="tabla")
+    assert (res["encontradas"], res["cambiadas"], res["no_encontradas"]) == (5, 3, 1)
+    assert autores(conn)[2:] == [(3, "británica", "Lu"), (4, "argentina", "Tito"), (5, "mexicana", None)]
+
+@pytest.mark.parametrize("metodo", METODOS)
+def test_no_hace_commit(conn, metodo):
+    actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad", "alias"], FILAS, metodo=metodo)
+    conn.rollback()
+    assert autores(conn) == INICIAL
+    # En SQLite el rollback también deshace el DROP de la temporal; la siguiente llamada la tira antes de crearla
+    assert actualizar_masivo(conn, "autor", "ID_autor", ["nacionalidad", "alias"], FILAS, metodo=metodo)["cambiadas"] == 3
+
+def test_errores_de_uso(conn):
+    with pytest.raises(ValueError, match="método"): actualizar_masivo(conn, "autor", "ID_autor", ["alias"], [(1, "x")], metodo="lazo")
+    with pytest.raises(ValueError, match="1 valores"): actualizar_masivo(conn, "autor", "ID_autor", ["alias"], [(1, "x", "y")])
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from busqueda_texto import BuscadorTexto, crear_indices
+
+class ConexionMariaDB:
+    # SQLite disfrazado de MariaDB (es_sqlite da False), con information_schema sin índices FULLTEXT
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:"); self.sentencias = []
+        self.db.execute("CREATE TABLE autor (ID_autor INTEGER PRIMARY KEY, A_nombre TEXT, A_biografia TEXT)")
+        self.db.executemany("INSERT INTO autor VALUES (?, ?, ?)", [
+            (1, "Gabriela Mistral", "Poeta chilena, Premio Nobel de Literatura 1945."),
+            (2, "Jorge Luis Borges", "Cuentista argentino; nunca ganó el Nobel."),
+            (3, "Juan Rulfo", "Novelista mexicano, autor de Pedro Páramo."),
+            (4, "Anónimo", "Sin biografía: noble_desconocido"),
+        ])
+    def cursor(self): return Cursor(self)
+
+class Cursor:
+    def __init__(self, conn): self.conn = conn; self.cur = conn.db.cursor()
+    def execute(self, sql, params=()):
+        self.conn.sentencias.append(sql)
+        if "information_schema" in sql: self.cur.execute("SELECT 1 WHERE 0")
+        elif sql.startswith("ALTER TABLE"): pass
+        else: self.cur.execute(sql, params)
+    def fetchall(self): return self.cur.fetchall()
+
+def test_sin_indice_busca_con_like_y_no_toca_el_esquema():
+    conn = ConexionMariaDB(); buscador = BuscadorTexto()
+    assert [i for i, _, _ in buscador.buscar(conn, "autor.biografia", "nobel")] == [1, 2]
+    assert [i for i, _, _ in buscador.buscar(conn, "autor.biografia", "premio nob")] == [1]
+    # Inicio de palabra, como el índice: "obel" no es inicio de nada, y "_" no es comodín
+    assert buscador.buscar(conn, "autor.biografia", "obel") == []
+    assert buscador.buscar(conn, "autor.biografia", "noble_d")[0][:2] == (4, "Anónimo")
+    assert buscador.con_indice["autor.biografia"] is False
+    assert not any(s.startswith("ALTER") for s in conn.sentencias)
+    assert sum("information_schema" in s for s in conn.sentencias) == 1   # se revisa una sola vez
+
+def test_crear_indices_es_el_paso_explicito():
+    conn = ConexionMariaDB()
+    assert crear_indices(conn) == ["ft_autor_biografia", "ft_autor_nombre", "ft_genero_descripcion"]
+    assert sum(s.startswith("ALTER TABLE") for s in conn.sentencias) == 3
+
+@pytest.mark.parametrize("texto, esperado", [("nobel", {1, 2}), ("novelista mexicano", {3}), ("xyz", set())])
+def test_sqlite_usa_el_indice_en_memoria(texto, esperado):
+    db = ConexionMariaDB().db
+    assert {i for i, _, _ in BuscadorTexto().buscar(db, "autor.biografia", texto)} == esperado
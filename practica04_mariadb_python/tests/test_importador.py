@@ -0,0 +1,36 @@
+import json
+import sqlite3
+
+import pytest
+
+from importador import Importador, ErrorFila, _convertir
+
+@pytest.fixture
+def conn():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE editorial (ID_editorial INTEGER PRIMARY KEY, E_nombre TEXT, E_ubicacion TEXT)")
+    db.execute("CREATE TABLE autor (ID_autor INTEGER PRIMARY KEY, A_nombre TEXT, A_finado TEXT, A_fecha_n TEXT, A_biografia TEXT)")
+    db.execute("CREATE TABLE genero (ID_genero INTEGER PRIMARY KEY, G_nombre TEXT, G_popularidad INTEGER NOT NULL, G_descripcion TEXT)")
+    yield db; db.close()
+
+@pytest.mark.parametrize("registro", [["Cuentos", 3, ""], "Cuentos", 42, None])
+def test_registro_que_no_es_objeto_es_error_de_fila(registro):
+    with pytest.raises(ErrorFila, match="objeto"): _convertir("generos", registro)
+
+def test_registros_malos_no_tumban_la_importacion(conn, tmp_path):
+    ruta = tmp_path / "generos.jsonl"
+    registros = [{"nombre": "Cuentos", "popularidad": 3}, ["no", "es", "objeto"], {"popularidad": 1},
+                 {"nombre": "Poesía", "popularidad": "mucha"}, 7, {"nombre": "Ensayo"}]
+    ruta.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    res = Importador(conn, lote=2).importar(str(ruta), "generos")
+    assert res["leidas"] == 6 and res["insertadas"] == 2
+    assert [n for n, _ in res["errores"]] == [2, 3, 4, 5]
+    assert sorted(r[0] for r in conn.execute("SELECT G_nombre FROM genero")) == ["Cuentos", "Ensayo"]
+
+def test_fila_que_rechaza_la_base_se_reporta_sola(conn, tmp_path):
+    # Pasa la validación pero la tabla la rechaza: el lote se reintenta fila por fila
+    conn.execute("CREATE UNIQUE INDEX genero_nombre ON genero (G_nombre)"); conn.execute("INSERT INTO genero VALUES (1, 'Drama', 0, '')"); conn.commit()
+    ruta = tmp_path / "generos.csv"
+    ruta.write_text("nombre,popularidad\nCuentos,3\nDrama,1\nEnsayo,2\n", encoding="utf-8")
+    res = Importador(conn, lote=10).importar(str(ruta), "generos")
+    assert res["insertadas"] == 2 and [n for n, _ in res["errores"]] == [2] and "UNIQUE" in res["errores"][0][1]
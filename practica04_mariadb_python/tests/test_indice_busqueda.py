@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import indice_busqueda
+from catalogo import orden
+from indice_busqueda import IndiceBusqueda, normalizar, _coincide
+
+NOMBRES = ["José", "María", "Stephen", "Gabriel", "Isabel", "Jorge", "Octavio", "Rosario", "Juan", "Elena", "Carlos", "Ana"]
+APELLIDOS = ["King", "García Márquez", "Allende", "Borges", "Paz", "Castellanos", "Rulfo", "Poniatowska", "Fuentes", "Cortázar"]
+
+@pytest.fixture(scope="module")
+def datos():
+    rng = random.Random(0)
+    filas = sorted(((k + 1, f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {k:04d}") for k in range(3000)), key=lambda f: (orden(f[1]), f[0]))
+    indice = IndiceBusqueda(filas)
+    for k in range(50): indice.agregar(3001 + k, f"{rng.choice(NOMBRES)} Nuevo {k}")
+    filas = sorted(filas + [(i, indice.nombres[i]) for i in indice.ids[3000:]], key=lambda f: (orden(f[1]), f[0]))
+    return indice, filas
+
+def lineal(filas, texto):
+    fragmentos = normalizar(texto).split()
+    return [i for i, n in filas if all(_coincide(normalizar(n), f) for f in fragmentos)]
+
+@pytest.mark.parametrize("texto", ["", "s", "st", "ste", "gabriel garc", "marquez 0042", "cortazar 4", "nuevo 1", "zzz",
+                                   "j g", "ga m", "e p 1", "CORTÁZAR", "o"])
+def test_igual_que_recorrer_todos(datos, texto):
+    indice, filas = datos
+    assert indice.buscar(texto) == lineal(filas, texto)
+
+def test_fragmentos_cortos_parten_del_rango_mas_angosto(monkeypatch):
+    # "a" es inicio de muchas palabras y "z" de una sola: se parte de "z" y solo esa fila se revisa con "a"
+    filas = [(k, f"Ana Alba {k}") for k in range(200)] + [(999, "Ana Zapata")]
+    indice = IndiceBusqueda(sorted(filas, key=lambda f: (orden(f[1]), f[0])))
+    revisadas = []
+    def contar(clave, fragmento): revisadas.append(clave); return _coincide(clave, fragmento)
+    monkeypatch.setattr(indice_busqueda, "_coincide", contar)
+    assert indice.buscar("a z") == [999]
+    assert revisadas == ["ana zapata"]
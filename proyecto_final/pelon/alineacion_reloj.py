@@ -0,0 +1,153 @@
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+# ============================================================
+# ALINEACIÓN DEL RELOJ DE LA PLACA CON EL DEL HOST
+# ============================================================
+# Cada muestra trae el millis() de la ESP32. En vez de sellarla con la
+# hora a la que Python la leyó (los buffers del puerto juntan varias en el
+# mismo instante), se ajusta un modelo
+#     hora_host = s + desfase + deriva * s        (s = millis / 1000)
+# y se aplica a todo el lote de una vez.
+#
+# Cada lectura del puerto da una cota: la última muestra del lote llegó
+# a más tardar "ahora", así que ahora - s >= desfase real. La envolvente
+# inferior de esas cotas (el mínimo por segmento de tiempo) es el retraso
+# mínimo de transmisión; una recta por esos mínimos da la deriva del
+# cristal de la placa (decenas de ppm).
+#
+# El T: del firmware solo ajusta la hora de la pantalla, no millis(), así
+# que no mueve el modelo. Lo que sí lo reinicia es que millis() retroceda
+# (la placa se reinició, p. ej. tras SET_NAME:); el desborde de millis()
+# a los ~49.7 días se detecta y se desenrolla. Si el reinicio cae a media
+# lectura, el lote se parte: lo de antes se sella con el modelo viejo y lo
+# de después empieza el nuevo.
+
+DESBORDE_MS = 2 ** 32
+DERIVA_MAX = 1e-3   # 1000 ppm: más que eso no es el cristal, es un error de ajuste
+
+class AlineadorReloj:
+    def __init__(self, segmento_s=30.0, segmentos=40):
+        self.segmento_s = segmento_s
+        self.segmentos = segmentos
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.vueltas = 0          # desbordes de millis() desenrollados
+        self.ultimo_ms = None
+        self.minimos = deque(maxlen=self.segmentos)  # (s, cota mínima) de segmentos cerrados
+        self._seg_inicio = None
+        self._seg = None          # (s, cota) mínima del segmento en curso
+        self.desfase = None
+        self.deriva = 0.0
+        self.reinicios = 0
+
+    def alinear(self, millis, ahora):
+        # millis: arreglo con el millis() de cada muestra del lote (en orden); ahora: time.time() de la lectura
+        millis = np.asarray(millis, dtype=np.float64)
+        if not len(millis): return millis
+        ms, reinicio = self._desenrollar(millis)
+        tiempos = self._sellar(ms, ahora) if len(ms) else ms
+        if reinicio is None: return tiempos
+        # La placa se reinició en la muestra "reinicio": lo anterior ya quedó con el modelo viejo
+        # (la última de esas muestras también llegó a más tardar "ahora"); el resto empieza uno nuevo
+        reinicios = self.reinicios + 1
+        self.reiniciar(); self.reinicios = reinicios
+        return np.concatenate((tiempos, self.alinear(millis[reinicio:], ahora)))
+
+    def _sellar(self, ms, ahora):
+        s = ms / 1000.0
+        self._observar(s[-1], ahora - s[-1])
+        tiempos = self.desfase + s * (1.0 + self.deriva)
+        # Nunca en el futuro: si el modelo todavía no converge, manda la hora de llegada
+        return np.minimum(tiempos, ahora)
+
+    def _desenrollar(self, millis):
+        # Regresa (ms desenrollados, None), o hasta antes del primer reinicio y el índice donde empieza
+        ms = millis + self.vueltas * DESBORDE_MS
+        previo = self.ultimo_ms
+        saltos = np.flatnonzero(np.diff(ms) < 0)
+        if previo is not None and ms[0] < previo: saltos = np.concatenate(([-1], saltos))
+        for i in saltos.tolist():
+            antes = previo if i < 0 else ms[i]
+            if antes - ms[i + 1] > DESBORDE_MS / 2:
+                self.vueltas += 1; ms[i + 1:] += DESBORDE_MS   # desborde de 32 bits
+            else:
+                ms = ms[:i + 1]
+                if len(ms): self.ultimo_ms = ms[-1]
+                return ms, i + 1
+        self.ultimo_ms = ms[-1]
+        return ms, None
+
+    def _observar(self, s, cota):
+        if self._seg_inicio is None or s - self._seg_inicio >= self.segmento_s:
+            if self._seg is not None: self.minimos.append(self._seg)
+            self._seg_inicio = s; self._seg = (s, cota)
+        elif cota < self._seg[1]: self._seg = (s, cota)
+        else: return  # la envolvente no cambió: el modelo tampoco
+
+        puntos = list(self.minimos) + [self._seg]
+        if len(puntos) >= 3 and puntos[-1][0] - puntos[0][0] >= 4 * self.segmento_s:
+            x = np.array([p[0] for p in puntos]); y = np.array([p[1] for p in puntos])
+            self.deriva = float(np.clip(np.polyfit(x - x[0], y, 1)[0], -DERIVA_MAX, DERIVA_MAX))
+            self.desfase = float(np.min(y - self.deriva * x))  # recta apoyada en la envolvente inferior
+        else:
+            self.deriva = 0.0
+            self.desfase = min(p[1] for p in puntos)
+
+def fechas_locales(tiempos):
+    # epoch (s) -> datetime local sin zona, todo el lote en un paso (como datetime.fromtimestamp)
+    if not len(tiempos): return []
+    t0 = float(tiempos[0])
+    utc = datetime.fromtimestamp(t0, timezone.utc).replace(tzinfo=None)
+    offset = (datetime.fromtimestamp(t0) - utc).total_seconds()
+    return (np.round((np.asarray(tiempos) + offset) * 1e6).astype("datetime64[us]")).tolist()
+
+# ============================================================
+# BENCHMARK: error de tiempo con hora de lectura vs millis alineado
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    horas = 6; periodo = 0.5; deriva_real = 40e-6; desfase_real = 1.7e9
+    n = int(horas * 3600 / periodo)
+    s_real = np.arange(n) * periodo
+    millis = np.floor(s_real * (1 - deriva_real) * 1000 + 1234)  # cristal de la placa 40 ppm lento
+    verdad = desfase_real + s_real
+
+    # Lecturas del puerto: retraso de 1-5 ms, y a veces el host se atora hasta 2 s y llega un bloque junto
+    retraso = 0.001 + rng.exponential(0.002, n)
+    atoron = rng.random(n) < 0.01
+    llegada = verdad + retraso
+    for i in np.flatnonzero(atoron): llegada[i:i + 4] = np.maximum(llegada[i:i + 4], verdad[i] + rng.uniform(0.5, 2.0))
+    llegada = np.maximum.accumulate(llegada)
+    cortes = np.flatnonzero(np.diff(llegada) > 1e-4) + 1  # muestras que llegan juntas forman un lote
+    lotes = np.split(np.arange(n), cortes)
+
+    al = AlineadorReloj()
+    ingenuo = np.empty(n); alineado = np.empty(n)
+    t0 = time.perf_counter()
+    for idx in lotes:
+        ahora = llegada[idx[-1]]
+        ingenuo[idx] = ahora
+        alineado[idx] = al.alinear(millis[idx], ahora)
+    seg = time.perf_counter() - t0
+
+    ultima_hora = s_real >= (horas - 1) * 3600
+    for nombre, t in (("hora de lectura", ingenuo), ("millis alineado", alineado)):
+        err = (t - verdad)[ultima_hora] * 1000
+        paso = np.diff(t)[ultima_hora[1:]] * 1000
+        print(f"{nombre:16s} | error medio {np.mean(np.abs(err)):7.2f} ms, máx {np.max(np.abs(err)):7.1f} ms | "
+              f"paso {np.mean(paso):6.1f} ± {np.std(paso):6.2f} ms | pasos ~0: {int(np.sum(paso < 50))}")
+    print(f"deriva estimada {al.deriva * 1e6:.1f} ppm (real {deriva_real * 1e6:.0f}) | {len(lotes)} lotes en {seg * 1000:.0f} ms")
+
+    # Reinicio y desborde de millis
+    al = AlineadorReloj()
+    al.alinear([1000, 1500], 100.0); r = al.alinear([2000, 300, 800], 101.0)
+    print("reinicio:", r, "reinicios", al.reinicios)
+    al = AlineadorReloj()
+    al.alinear([DESBORDE_MS - 1000, DESBORDE_MS - 500], 100.0); r = al.alinear([0, 500], 101.0)
+    print("desborde:", r, "vueltas", al.vueltas)
@@ -0,0 +1,121 @@
+import os
+import sys
+import pty
+import time
+import tty
+import select
+import argparse
+import threading
+
+import serial
+
+import ingesta
+from protocolo import trama
+
+# ============================================================
+# BANCO DE PRUEBAS CON PSEUDO-TERMINALES (POSIX)
+# ============================================================
+# Simula N placas ESP32: un proceso hijo escribe el protocolo
+# "ID:mac|alias" / "millis,t,h,p" en el lado maestro de cada pty y la
+# estación lee el lado esclavo como si fuera un puerto serial real.
+# Mide CPU del lector en reposo y bajo carga, y líneas/s sostenidas.
+#
+#   python banco_pty.py --puertos 4 --tasa 2000 --segundos 5
+#   python banco_pty.py --sondeo          (lector viejo con in_waiting, para comparar)
+#   python banco_pty.py --binario         (tramas binarias en lugar de texto)
+
+def lineas_protocolo(mac, alias, binario=False, archivo="prueba.txt"):
+    # Reusa las mediciones capturadas (K/Pa) y las manda como las imprime el firmware (°C/hPa)
+    valores = []
+    if os.path.exists(archivo):
+        with open(archivo, encoding="utf-8") as f:
+            next(f, None)
+            for linea in f:
+                c = linea.split("\t")
+                try: valores.append((float(c[1]) - 273.15, float(c[2]), float(c[3]) / 100.0))
+                except (ValueError, IndexError): pass
+    if not valores: valores = [(22.5, 58.0, 816.0)]
+    millis = 0; ident = f"ID:{mac}|{alias}\r\n".encode()
+    while True:
+        for t, h, p in valores:
+            millis += 500
+            # Igual que el firmware: en binario el ID sale cada 10 lecturas
+            if binario: yield (ident if millis % 5000 == 500 else b"") + trama(millis, t, h, p)
+            else: yield ident + f"{millis},{t:.2f},{h:.2f},{p:.2f}\r\n".encode()
+
+def escritor_hijo(maestros, tasa, segundos, binario):
+    # tasa: muestras/s por puerto (0 = lo más rápido posible)
+    generadores = [lineas_protocolo(f"24:D7:EB:59:2E:{i:02X}", f"banco{i}", binario) for i in range(len(maestros))]
+    fin = time.monotonic() + segundos
+    paso = 0.01
+    por_paso = max(1, int(tasa * paso)) if tasa else 200
+    while time.monotonic() < fin:
+        t0 = time.monotonic()
+        for m, g in zip(maestros, generadores):
+            os.write(m, b"".join(next(g) for _ in range(por_paso)))
+            if select.select([m], [], [], 0)[0]: os.read(m, 4096)  # descartamos lo que manda la estación (T:...)
+        if tasa: time.sleep(max(0.0, paso - (time.monotonic() - t0)))
+    os._exit(0)
+
+class EscritorNulo:
+    def __init__(self): self.filas = 0
+    def encolar(self, fila): self.filas += 1; return True
+    def encolar_lote(self, filas): self.filas += len(filas); return True
+
+def sondeo_viejo(arduino, contador, activo):
+    # Réplica del bucle original: in_waiting + readline, sin esperar
+    while activo[0]:
+        try:
+            if arduino.in_waiting > 0:
+                linea = arduino.readline().decode('utf-8', errors='ignore').strip()
+                if "," in linea:
+                    partes = linea.split(",")
+                    if len(partes) >= 4: float(partes[1]); float(partes[2]); float(partes[3]); contador[0] += 1
+        except Exception: time.sleep(0.1)
+
+def medir_cpu(segundos):
+    c0, w0 = time.process_time(), time.monotonic()
+    time.sleep(segundos)
+    return (time.process_time() - c0) / (time.monotonic() - w0) * 100.0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--puertos", type=int, default=4)
+    ap.add_argument("--tasa", type=int, default=0, help="muestras/s por puerto, 0 = máximo")
+    ap.add_argument("--segundos", type=float, default=5.0)
+    ap.add_argument("--sondeo", action="store_true", help="usar el lector viejo (un hilo por puerto con in_waiting)")
+    ap.add_argument("--binario", action="store_true", help="las placas simuladas mandan tramas binarias")
+    args = ap.parse_args()
+
+    maestros, esclavos = [], []
+    for _ in range(args.puertos):
+        m, s = pty.openpty(); tty.setraw(s); os.set_blocking(m, True)
+        maestros.append(m); esclavos.append(os.ttyname(s))
+
+    ingesta.ESPERA_RESET_S = 0.0
+    escritor = EscritorNulo(); contador = [0]; activo = [True]
+    if args.sondeo:
+        for ruta in esclavos:
+            threading.Thread(target=sondeo_viejo, args=(serial.Serial(ruta, 115200, timeout=2), contador, activo), daemon=True).start()
+        muestras = lambda: contador[0]
+    else:
+        gestor = ingesta.GestorIngesta(escritor, 115200, 3600, 10)
+        for ruta in esclavos: gestor.abrir(ruta)
+        muestras = lambda: escritor.filas
+
+    print(f"Lector: {'sondeo in_waiting' if args.sondeo else 'selectors'} | puertos: {args.puertos} | {'binario' if args.binario else 'texto'}")
+    print(f"CPU en reposo: {medir_cpu(2.0):5.1f} %")
+
+    pid = os.fork()
+    if pid == 0: escritor_hijo(maestros, args.tasa, args.segundos, args.binario)
+    n0 = muestras(); c0, w0 = time.process_time(), time.monotonic()
+    os.waitpid(pid, 0)
+    time.sleep(0.5)  # que termine de vaciar lo que quedó en los pty
+    n = muestras() - n0; pared = time.monotonic() - w0
+    print(f"Carga: {n} muestras en {pared:.1f} s -> {n / pared:,.0f} muestras/s | CPU {(time.process_time() - c0) / pared * 100:5.1f} %")
+    activo[0] = False
+    if not args.sondeo: gestor.detener()
+
+if __name__ == "__main__":
+    if os.name == "nt": sys.exit("banco_pty.py necesita pseudo-terminales (Linux/macOS)")
+    main()
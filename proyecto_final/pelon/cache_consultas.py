@@ -0,0 +1,151 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# ============================================================
+# CACHÉ LRU DE CONSULTAS DEL HISTORIAL
+# ============================================================
+# Llave: (dispositivo, inicio, fin, resolución). Valor: la fuente de la
+# tabla virtual (filas en SI tal como vienen de la DB: cambiar de unidades
+# solo vuelve a pintar). Las fuentes crudas guardan además las páginas que
+# ya se leyeron, así que su tamaño crece mientras uno se desplaza: el peso
+# de cada entrada se recalcula en cada acceso y se expulsan las menos
+# usadas hasta quedar bajo max_bytes.
+#
+# Invalidación: el escritor avisa (invalidar_lote) qué dispositivos y qué
+# rango de fechas acaba de insertar; toda entrada que se traslape se tira.
+# Un rango que incluye el presente se invalida con cada lote, y uno viejo
+# solo si llegan filas atrasadas (p. ej. al vaciar el spool). Una consulta
+# que empezó antes de una invalidación que la toca no se guarda (leyó
+# datos de antes). invalidar_lote corre en el hilo del escritor: todo va
+# con candado.
+
+HISTORIAL_INVALIDACIONES = 256
+
+def bytes_filas(filas):
+    # Estimación: lo que pesa la primera fila (tupla + valores) por el número de filas
+    if not filas: return 0
+    muestra = filas[0]
+    return (sys.getsizeof(muestra) + sum(sys.getsizeof(v) for v in muestra) + 8) * len(filas)
+
+def _texto(fecha):
+    # Fechas del lote (datetime o texto ISO del spool) comparables con las llaves
+    return fecha if isinstance(fecha, str) else fecha.isoformat(sep=" ")
+
+class CacheConsultas:
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()   # llave -> valor (debe tener .bytes())
+        self._candado = threading.Lock()
+        self._invalidaciones = []        # (secuencia, dispositivos, desde, hasta) recientes
+        self.secuencia = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsadas = 0
+        self.invalidadas = 0
+        self.bytes = 0
+
+    def obtener(self, llave):
+        with self._candado:
+            valor = self._entradas.get(llave)
+            if valor is None: self.fallos += 1; return None
+            self._entradas.move_to_end(llave); self.aciertos += 1
+            self._ajustar()
+            return valor
+
+    def guardar(self, llave, valor, secuencia=None):
+        # secuencia: la de cuando empezó la consulta (marca()); si algo que la toca se invalidó después, no se guarda
+        with self._candado:
+            if secuencia is not None and any(s > secuencia and _traslapa(llave, d, a, b) for s, d, a, b in self._invalidaciones):
+                return False
+            self._entradas[llave] = valor; self._entradas.move_to_end(llave)
+            self._ajustar()
+            return llave in self._entradas
+
+    def marca(self):
+        with self._candado: return self.secuencia
+
+    def invalidar_lote(self, lote):
+        # lote: filas de SQL_INSERT (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias)
+        if not lote: return
+        rangos = {}
+        for fila in lote:
+            f = _texto(fila[3]); desde, hasta = rangos.get(fila[4], (f, f))
+            rangos[fila[4]] = (min(desde, f), max(hasta, f))
+        with self._candado:
+            for disp, (desde, hasta) in rangos.items():
+                self.secuencia += 1
+                self._invalidaciones.append((self.secuencia, disp, desde, hasta))
+                for llave in [ll for ll in self._entradas if _traslapa(ll, disp, desde, hasta)]:
+                    del self._entradas[llave]; self.invalidadas += 1
+            del self._invalidaciones[:-HISTORIAL_INVALIDACIONES]
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear(); self.bytes = 0
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas), "bytes": self.bytes,
+                "aciertos": self.aciertos, "fallos": self.fallos,
+                "tasa": self.aciertos / consultas if consultas else 0.0,
+                "expulsadas": self.expulsadas, "invalidadas": self.invalidadas,
+            }
+
+    def _ajustar(self):
+        # Recalcula pesos (las fuentes crudas crecen al leer páginas) y expulsa por LRU
+        pesos = {llave: valor.bytes() for llave, valor in self._entradas.items()}
+        self.bytes = sum(pesos.values())
+        while self.bytes > self.max_bytes and len(self._entradas) > 1:
+            llave, _ = self._entradas.popitem(last=False)
+            self.bytes -= pesos[llave]; self.expulsadas += 1
+        if self.bytes > self.max_bytes and self._entradas:
+            # Una sola entrada más grande que todo el presupuesto: no se guarda
+            self._entradas.clear(); self.bytes = 0; self.expulsadas += 1
+
+def _traslapa(llave, disp, desde, hasta):
+    dispositivo, inicio, fin, _ = llave
+    return (dispositivo is None or dispositivo == disp) and inicio <= hasta and desde <= fin
+
+# ============================================================
+# BENCHMARK: repetir consultas con y sin caché
+# ============================================================
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import datetime, timedelta
+
+    class Filas:
+        def __init__(self, filas): self.filas = filas
+        def bytes(self): return bytes_filas(self.filas)
+
+    def consulta_lenta(llave):
+        time.sleep(0.02)   # lo que tarda MariaDB en un rango mediano
+        return Filas([(datetime(2025, 1, 1), 294.1, 50.0, 81600.0, "24:D7:EB:59:2E:30", "SinAlias")] * 500)
+
+    rng = random.Random(0)
+    dias = [f"2025-01-{d:02d}" for d in range(1, 29)]
+    llaves = [(None, f"{d} 00:00:00", f"{d} 23:59:59", "1m") for d in dias]
+    pedidas = [rng.choice(llaves[:8]) if rng.random() < 0.8 else rng.choice(llaves) for _ in range(300)]
+
+    t0 = time.perf_counter()
+    for ll in pedidas: consulta_lenta(ll)
+    sin = time.perf_counter() - t0
+
+    cache = CacheConsultas(max_bytes=4 * 2**20)
+    t0 = time.perf_counter()
+    for ll in pedidas:
+        if cache.obtener(ll) is None: cache.guardar(ll, consulta_lenta(ll))
+    con = time.perf_counter() - t0
+    e = cache.estadisticas()
+    print(f"{len(pedidas)} consultas: sin caché {sin:.2f} s, con caché {con:.2f} s | aciertos {e['aciertos']} "
+          f"fallos {e['fallos']} ({e['tasa']:.0%}) | {e['entradas']} entradas, {e['bytes'] / 2**20:.1f} MiB, expulsadas {e['expulsadas']}")
+
+    # Un lote del presente tira solo lo que toca
+    cache.invalidar_lote([(294.0, 50.0, 81600.0, datetime(2025, 1, 3, 12) + timedelta(seconds=k), "24:D7:EB:59:2E:30", "x") for k in range(10)])
+    print("tras lote del 2025-01-03:", cache.obtener(llaves[2]) is None, cache.obtener(llaves[1]) is not None)
+    m = cache.marca()
+    cache.invalidar_lote([(294.0, 50.0, 81600.0, "2025-01-05 08:00:00.250000", "24:D7:EB:59:2E:31", "y")])
+    print("consulta que empezó antes de invalidarse se guarda:", cache.guardar(llaves[4], consulta_lenta(llaves[4]), m))
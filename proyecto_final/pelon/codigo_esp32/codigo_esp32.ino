@@ -31,10 +31,19 @@ unsigned long debounceDelay = 50;
 String macAddress; 
 String deviceNickname = "SinNombre"; // Apodo por defecto
 
+// Modo binario (lo pide Python con "BIN:1"): cada lectura va en una trama de 20 bytes
+// 0xA5 | 16 | uint32 millis | float tempC | float hum | float presHPa | CRC16 (little-endian)
+bool modoBinario = false;
+int lecturasSinID = 0;
+#define TRAMA_SYNC 0xA5
+#define TRAMA_CARGA 16
+#define ID_CADA 10 // en binario el ID (ASCII) se manda cada 10 lecturas
+
 void mostrarSoloTemperatura(float tempC);
 void mostrarSoloHumedad(float hum);
 void mostrarSoloPresion(float presHPa);
 void mostrarLogoPelon();
+void enviarTrama(uint32_t ms, float tempC, float hum, float presHPa);
 
 void setup() {
   Serial.begin(115200);
@@ -89,6 +98,12 @@ void loop() {
       lastTimeSync = millis(); 
     }
     
+    // Cambiar formato de salida: BIN:1 binario, BIN:0 texto
+    if (input.startsWith("BIN:")) {
+      modoBinario = input.substring(4).toInt() == 1;
+      lecturasSinID = 0; // que el ID salga de inmediato
+    }
+    
     // GUARDAR NUEVO APODO EN MEMORIA
     if (input.startsWith("SET_NAME:")) {
       String newName = input.substring(9);
@@ -115,16 +130,23 @@ void loop() {
   float presHPa = bme.readPressure() / 100.0F; 
 
   // --- 3. ENVIAR ID COMPUESTO (MAC + APODO) ---
-  // Formato: ID:MAC|APODO
-  Serial.print("ID:"); 
-  Serial.print(macAddress);
-  Serial.print("|");
-  Serial.println(deviceNickname);
+  // Formato: ID:MAC|APODO (siempre en texto)
+  if (!modoBinario || lecturasSinID == 0) {
+    Serial.print("ID:"); 
+    Serial.print(macAddress);
+    Serial.print("|");
+    Serial.println(deviceNickname);
+  }
+  lecturasSinID = (lecturasSinID + 1) % ID_CADA;
   
-  Serial.print(millis()); Serial.print(",");
-  Serial.print(tempC, 2); Serial.print(",");
-  Serial.print(hum, 2); Serial.print(",");
-  Serial.println(presHPa, 2);
+  if (modoBinario) {
+    enviarTrama(millis(), tempC, hum, presHPa);
+  } else {
+    Serial.print(millis()); Serial.print(",");
+    Serial.print(tempC, 2); Serial.print(",");
+    Serial.print(hum, 2); Serial.print(",");
+    Serial.println(presHPa, 2);
+  }
 
   // Lógica Botón
   int reading = digitalRead(BUTTON_PIN);
@@ -162,6 +184,30 @@ void loop() {
   delay(500); 
 }
 
+// CRC-16/CCITT-FALSE (polinomio 0x1021, inicio 0xFFFF), igual que binascii.crc_hqx en Python
+uint16_t crc16(const uint8_t* datos, size_t n) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < n; i++) {
+    crc ^= (uint16_t)datos[i] << 8;
+    for (int b = 0; b < 8; b++) crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+void enviarTrama(uint32_t ms, float tempC, float hum, float presHPa) {
+  uint8_t trama[4 + TRAMA_CARGA];
+  trama[0] = TRAMA_SYNC;
+  trama[1] = TRAMA_CARGA;
+  memcpy(trama + 2, &ms, 4);       // la ESP32 es little-endian
+  memcpy(trama + 6, &tempC, 4);
+  memcpy(trama + 10, &hum, 4);
+  memcpy(trama + 14, &presHPa, 4);
+  uint16_t crc = crc16(trama + 1, 1 + TRAMA_CARGA); // largo + carga útil
+  trama[18] = crc & 0xFF;
+  trama[19] = crc >> 8;
+  Serial.write(trama, sizeof(trama));
+}
+
 void mostrarSoloTemperatura(float tempC) {
   float tempK = tempC + 273.15;
   display.setCursor(0, 25); display.setTextSize(3);
@@ -0,0 +1,60 @@
+import time
+import numpy as np
+
+# ============================================================
+# CONVERSIÓN DE UNIDADES (VECTORIZADA)
+# ============================================================
+# Un solo lugar para los tres unit_mode de la estación. Las funciones
+# aceptan escalares o arreglos NumPy completos y convierten todo en una
+# sola pasada; la gráfica, la tabla del historial y el exportador las usan.
+
+MODO_C, MODO_F, MODO_SI = 0, 1, 2
+UNIDADES = {MODO_C: ("°C", "hPa"), MODO_F: ("°F", "hPa"), MODO_SI: ("K", "Pa")}
+
+def unidades(modo):
+    return UNIDADES.get(modo, UNIDADES[MODO_C])
+
+def desde_celsius(temp_c, pres_hpa, modo):
+    # Datos en vivo (°C, hPa) -> (temp, unidad_t, pres, unidad_p)
+    u_t, u_p = unidades(modo)
+    if modo == MODO_F: return temp_c * 1.8 + 32.0, u_t, pres_hpa, u_p
+    if modo == MODO_SI: return temp_c + 273.15, u_t, pres_hpa * 100.0, u_p
+    return temp_c, u_t, pres_hpa, u_p
+
+def desde_si(temp_k, pres_pa, modo):
+    # Datos de la DB (K, Pa) -> (temp, unidad_t, pres, unidad_p)
+    u_t, u_p = unidades(modo)
+    if modo == MODO_SI: return temp_k, u_t, pres_pa, u_p
+    temp_c = temp_k - 273.15
+    if modo == MODO_F: temp_c = temp_c * 1.8 + 32.0
+    return temp_c, u_t, pres_pa / 100.0, u_p
+
+def columnas(filas, *indices):
+    # Extrae columnas numéricas de filas de la DB como arreglos float64
+    n = len(filas)
+    return [np.fromiter((f[i] for f in filas), dtype=np.float64, count=n) for i in indices]
+
+# ============================================================
+# BENCHMARK: bucle por muestra vs una pasada vectorizada
+# ============================================================
+if __name__ == "__main__":
+    def por_muestra(cel, pres_hpa, modo):
+        if modo == 0: return (cel, "°C", pres_hpa, "hPa")
+        elif modo == 1: return ((cel * 9/5) + 32, "°F", pres_hpa, "hPa")
+        elif modo == 2: return (cel + 273.15, "K", pres_hpa * 100.0, "Pa")
+
+    for n in (10_000, 100_000, 1_000_000):
+        temps = np.random.uniform(15, 30, n).astype(np.float32)
+        press = np.random.uniform(800, 820, n).astype(np.float32)
+        for modo in (MODO_C, MODO_F, MODO_SI):
+            lt, lp = temps.tolist(), press.tolist()
+            t0 = time.perf_counter()
+            out_t = []; out_p = []
+            for i in range(n):
+                r = por_muestra(lt[i], lp[i], modo); out_t.append(r[0]); out_p.append(r[2])
+            ms_bucle = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            desde_celsius(temps, press, modo)
+            ms_vec = (time.perf_counter() - t0) * 1000
+            print(f"n={n:>9} modo={unidades(modo)[0]:>2} | bucle {ms_bucle:9.2f} ms | vectorizado {ms_vec:7.3f} ms | x{ms_bucle / max(ms_vec, 1e-6):.0f}")
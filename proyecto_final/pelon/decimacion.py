@@ -0,0 +1,72 @@
+import math
+import numpy as np
+
+# ============================================================
+# DECIMACIÓN MIN/MAX PARA LAS GRÁFICAS
+# ============================================================
+# Cada serie se reduce a ~2 puntos por columna de pixel (el mínimo y el
+# máximo de la columna, en orden de tiempo), así los picos y valles se
+# conservan y el costo de dibujar depende del ancho de la pantalla y no
+# de la duración de la sesión.
+#
+# Las columnas se alinean a una rejilla absoluta de tiempo con ancho
+# potencia de 2, de modo que al avanzar la ventana las columnas ya
+# cerradas siguen siendo válidas y se guardan en caché; en cada tick
+# solo se recalcula la columna abierta y las muestras nuevas.
+
+def ancho_columna(duracion_s, ancho_px):
+    bruto = max(duracion_s / max(ancho_px, 1), 1e-3)
+    return 2.0 ** math.ceil(math.log2(bruto))
+
+def minmax_por_columna(t, y, ancho):
+    # Regresa (t, y, columna) con dos puntos por columna: min y max en orden temporal
+    columnas = np.floor(t / ancho).astype(np.int64)
+    inicios = np.flatnonzero(np.r_[True, columnas[1:] != columnas[:-1]])
+    grupo = np.repeat(np.arange(len(inicios)), np.diff(np.r_[inicios, len(y)]))
+    i_min = _primero_por_grupo(y == np.minimum.reduceat(y, inicios)[grupo], grupo)
+    i_max = _primero_por_grupo(y == np.maximum.reduceat(y, inicios)[grupo], grupo)
+    idx = np.column_stack([np.minimum(i_min, i_max), np.maximum(i_min, i_max)]).ravel()
+    return t[idx], y[idx], columnas[idx]
+
+def _primero_por_grupo(mascara, grupo):
+    idx = np.flatnonzero(mascara); g = grupo[idx]
+    return idx[np.r_[True, g[1:] != g[:-1]]]
+
+class _CacheSerie:
+    def __init__(self, ancho):
+        self.ancho = ancho
+        self.t = np.empty(0); self.y = np.empty(0)
+        self.ultima_columna = None  # última columna ya cerrada
+
+class DecimadorMinMax:
+    def __init__(self):
+        self._cache = {}
+
+    def limpiar(self): self._cache.clear()
+
+    def reducir(self, clave, t, y, ancho_px):
+        # clave identifica la serie y la ventana (p.ej. ("t", 5)); t debe estar ordenado
+        if len(t) <= 2 * ancho_px: return t, y
+        ancho = ancho_columna(t[-1] - t[0], ancho_px)
+        c = self._cache.get(clave)
+        if c is None or c.ancho != ancho or (len(c.t) and c.t[-1] > t[-1]):
+            c = self._cache[clave] = _CacheSerie(ancho)
+
+        # Solo procesamos desde el inicio de la primera columna no cerrada
+        desde = 0
+        if c.ultima_columna is not None:
+            desde = int(np.searchsorted(t, (c.ultima_columna + 1) * ancho, side="left"))
+        nt, ny, ncol = minmax_por_columna(t[desde:], y[desde:], ancho)
+
+        # La columna del último dato sigue abierta; las anteriores ya no cambian
+        cerradas = ncol < ncol[-1]
+        if cerradas.any():
+            c.t = np.concatenate([c.t, nt[cerradas]]); c.y = np.concatenate([c.y, ny[cerradas]])
+            c.ultima_columna = int(ncol[cerradas][-1])
+
+        # Descartamos lo que ya salió de la ventana
+        corte = int(np.searchsorted(c.t, t[0], side="left"))
+        if corte: c.t = c.t[corte:]; c.y = c.y[corte:]
+
+        abiertas = ~cerradas
+        return np.concatenate([c.t, nt[abiertas]]), np.concatenate([c.y, ny[abiertas]])
@@ -0,0 +1,90 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================
+# EJECUTOR DE CONSULTAS EN SEGUNDO PLANO
+# ============================================================
+# Las consultas del historial y las exportaciones corren en un pool de
+# hilos. Tkinter no es thread-safe: los hilos nunca tocan widgets, solo
+# dejan mensajes en una cola que el hilo de Tk vacía con after().
+
+class Cancelada(Exception):
+    pass
+
+class Tarea:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self._cancelada = threading.Event()
+        self._mensajes = None  # lo asigna el ejecutor
+        self.terminada = False
+
+    def cancelar(self): self._cancelada.set()
+
+    @property
+    def cancelada(self): return self._cancelada.is_set()
+
+    def verificar(self):
+        # Llamar desde el trabajo entre pasos largos
+        if self._cancelada.is_set(): raise Cancelada(self.nombre)
+
+    def progreso(self, hechas, total=None, texto=""):
+        self._mensajes.put((self, "progreso", (hechas, total, texto)))
+
+class EjecutorConsultas:
+    def __init__(self, widget, hilos=2, intervalo_ms=50):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="consulta")
+        self._mensajes = queue.SimpleQueue()
+        self._callbacks = {}
+        self.activas = set()
+        widget.after(intervalo_ms, self._bombear)
+
+    def enviar(self, nombre, trabajo, al_terminar=None, al_error=None, al_progreso=None, al_cancelar=None):
+        # trabajo(tarea) corre en un hilo; su resultado llega a al_terminar en el hilo de Tk
+        tarea = Tarea(nombre); tarea._mensajes = self._mensajes
+        self._callbacks[tarea] = {"ok": al_terminar, "error": al_error, "progreso": al_progreso, "cancelada": al_cancelar}
+        self.activas.add(tarea)
+        self._pool.submit(self._correr, tarea, trabajo)
+        return tarea
+
+    def cancelar_todas(self):
+        for t in list(self.activas): t.cancelar()
+
+    def cerrar(self):
+        self.cancelar_todas()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _correr(self, tarea, trabajo):
+        try:
+            tarea.verificar()
+            self._mensajes.put((tarea, "ok", trabajo(tarea)))
+        except Cancelada:
+            self._mensajes.put((tarea, "cancelada", None))
+        except Exception as e:
+            self._mensajes.put((tarea, "error", e))
+
+    def _bombear(self):
+        while True:
+            try: tarea, tipo, dato = self._mensajes.get_nowait()
+            except queue.Empty: break
+            cbs = self._callbacks.get(tarea, {})
+            # Cancelada mientras corría: su resultado (o error) ya no le importa a nadie; la GUI pudo
+            # haber lanzado otra consulta y no debe pisarla con datos viejos
+            if tarea.cancelada:
+                if tipo == "progreso": continue
+                tipo, dato = "cancelada", None
+            if tipo != "progreso":
+                tarea.terminada = True; self.activas.discard(tarea); self._callbacks.pop(tarea, None)
+            cb = cbs.get(tipo)
+            if cb is None: continue
+            try:
+                if tipo == "progreso": cb(*dato)
+                elif tipo == "cancelada": cb()
+                else: cb(dato)
+            except Exception:
+                # Un callback con error no debe detener la bomba (dejaría colgadas las demás tareas)
+                traceback.print_exc()
+        self.widget.after(self.intervalo_ms, self._bombear)
@@ -0,0 +1,197 @@
+import time
+import queue
+import threading
+import traceback
+
+import pymysql
+
+# ============================================================
+# ESCRITOR DE BASE DE DATOS (LOTES ASÍNCRONOS)
+# ============================================================
+# El hilo receptor solo encola filas; este hilo las agrupa y las inserta
+# con executemany cuando se junta el lote o se vence el tiempo, así la
+# lectura del puerto serial nunca espera a MariaDB. La cola guarda bloques
+# (encolar_lote: todo lo que trajo una lectura del puerto, un solo put) y
+# la capacidad se cuenta en filas.
+#
+# Con spool (SpoolLocal) cada lote se escribe primero en disco y luego se
+# vacía hacia MariaDB en bloques; si la DB no está, nada se pierde: se
+# reintenta solo cuando el pool vuelve a tener conexión. Sin spool, un
+# lote que falla se pierde (y se cuenta).
+#
+# Del spool solo se tiran filas que MariaDB rechaza por sus datos
+# (IntegrityError/DataError en el INSERT crudo), y una por una. Todo lo
+# demás (conexión, tabla o esquema que falta, cualquier error en
+# al_insertar, p. ej. que no existan los resúmenes) se reintenta: las
+# filas se quedan en disco hasta que se pueda. Con cada conexión nueva
+# (arranque o reconexión) corre al_conectar antes de insertar nada (p. ej.
+# esquema.migrar): si la DB estaba caída al arrancar, migra al volver.
+
+ERRORES_DATOS = (pymysql.err.IntegrityError, pymysql.err.DataError)
+
+SQL_INSERT = "INSERT INTO mediciones (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias) VALUES (%s, %s, %s, %s, %s, %s)"
+
+class EscritorDB:
+    def __init__(self, obtener_conexion, max_filas=200, max_espera=1.0, capacidad=20000, spool=None, drenar_filas=5000, al_insertar=None, al_confirmar=None,
+                 al_conectar=None):
+        # obtener_conexion: función que regresa la conexión pymysql activa (o None si no hay DB)
+        # al_conectar(conn): preparar cada conexión nueva antes de insertar (p. ej. esquema.migrar); si falla se reintenta
+        # al_insertar(cur, lote): trabajo extra en la misma transacción (p. ej. resumenes.actualizar)
+        # al_confirmar(lote): aviso ya con el commit hecho (p. ej. invalidar la caché del historial)
+        self.obtener_conexion = obtener_conexion
+        self.al_insertar = al_insertar
+        self.al_confirmar = al_confirmar
+        self.al_conectar = al_conectar
+        self._preparada = None   # última conexión en la que al_conectar terminó bien
+        self.spool = spool
+        self.drenar_filas = drenar_filas  # filas del spool por INSERT al vaciarlo
+        self.max_filas = max_filas
+        self.max_espera = max_espera
+        self.capacidad = capacidad
+        self.cola = queue.SimpleQueue()   # listas de filas
+        self.en_cola = 0                  # filas en la cola (la capacidad es en filas, no en bloques)
+        self._lock_cola = threading.Lock()
+        self.insertadas = 0
+        self.perdidas = 0      # filas que no llegaron a MariaDB (sin spool) o que MariaDB rechazó
+        self.descartadas = 0   # cola llena (nunca bloqueamos al receptor) o spool lleno
+        self.lotes = 0
+        self.errores = 0
+        self.ultimo_error = ""
+        self.ultima_latencia_ms = 0.0
+        self.max_latencia_ms = 0.0
+        self._activo = False
+        self._hilo = None
+
+    def iniciar(self):
+        self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=5.0):
+        # Deja que el hilo vacíe lo pendiente antes de salir
+        self._activo = False
+        if self._hilo: self._hilo.join(timeout)
+        if self.spool and not (self._hilo and self._hilo.is_alive()): self.spool.cerrar()
+
+    def encolar(self, fila): return self.encolar_lote([fila])
+
+    def encolar_lote(self, filas):
+        # Un bloque de filas de una vez; con la cola llena se guarda lo que quepa y el resto se descarta
+        with self._lock_cola:
+            sobran = len(filas) - max(self.capacidad - self.en_cola, 0)
+            if sobran > 0:
+                self.descartadas += sobran; filas = filas[:len(filas) - sobran]
+                if not filas: return False
+            self.en_cola += len(filas)
+        self.cola.put(filas)
+        return sobran <= 0
+
+    def estadisticas(self):
+        return {
+            "cola": self.en_cola,
+            "spool": self.spool.pendientes if self.spool else 0,
+            "insertadas": self.insertadas,
+            "perdidas": self.perdidas,
+            "descartadas": self.descartadas + (self.spool.descartadas if self.spool else 0),
+            "lotes": self.lotes,
+            "errores": self.errores,
+            "ultimo_error": self.ultimo_error,
+            "latencia_ms": self.ultima_latencia_ms,
+            "latencia_max_ms": self.max_latencia_ms,
+        }
+
+    def _bucle(self):
+        lote = []
+        limite = time.monotonic() + self.max_espera
+        while self._activo or not self.cola.empty():
+            try:
+                lote += self._sacar(self.cola.get(timeout=max(limite - time.monotonic(), 0.01)))
+                # Tomamos todo lo que ya esté esperando sin volver a bloquear
+                while len(lote) < self.max_filas: lote += self._sacar(self.cola.get_nowait())
+            except queue.Empty: pass
+
+            if len(lote) >= self.max_filas or time.monotonic() >= limite:
+                if lote: self._guardar(lote); lote = []
+                if self.spool and self.spool.pendientes: self._drenar()
+                limite = time.monotonic() + self.max_espera
+        if lote: self._guardar(lote)
+        if self.spool and self.spool.pendientes: self._drenar(tiempo_max=2.0)
+
+    def _sacar(self, filas):
+        with self._lock_cola: self.en_cola -= len(filas)
+        return filas
+
+    def _guardar(self, lote):
+        if self.spool is None: self._flush(lote); return
+        try: self.spool.agregar(lote)
+        except Exception: self.perdidas += len(lote)  # disco lleno o spool dañado
+
+    def _drenar(self, tiempo_max=0.5):
+        # Vacía el spool hacia MariaDB, sin acaparar el hilo (la cola de entrada sigue creciendo)
+        if self._conexion() is None: return  # el pool está en backoff (o la DB no está lista): ni leemos el disco
+        fin = time.monotonic() + tiempo_max
+        while self.spool.pendientes and time.monotonic() < fin:
+            ids, filas = self.spool.leer(self.drenar_filas)
+            if not filas: self.spool.pendientes = 0; return
+            resultado = self._flush(filas)
+            if resultado is None: return  # se reintenta después: se queda en disco
+            if not resultado:
+                # MariaDB rechazó los datos del bloque: fila por fila, para tirar solo las inválidas
+                for k, fila in enumerate(filas):
+                    r = self._flush([fila])
+                    if r is None:
+                        # Lo ya insertado sale del spool; el resto espera
+                        if k: self.spool.confirmar(ids[k - 1], k)
+                        return
+                    if not r: self.perdidas += 1
+            self.spool.confirmar(ids[-1], len(filas))
+
+    def _flush(self, lote):
+        # True: insertado. False: MariaDB rechazó los datos (IntegrityError/DataError).
+        # None: reintentar después (sin conexión, falta una tabla, error en al_insertar...).
+        conn = self._conexion()
+        if conn is None:
+            if self.spool is None: self.perdidas += len(lote)
+            return None
+        t0 = time.perf_counter()
+        en_gancho = False
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(SQL_INSERT, lote)
+                en_gancho = True
+                if self.al_insertar: self.al_insertar(cur, lote)
+            conn.commit()
+            resultado = True
+        except Exception as e:
+            try: conn.rollback()
+            except Exception: pass
+            self._error(e)
+            # Un fallo de al_insertar (resúmenes) nunca es culpa de las filas: se reintenta todo el lote
+            resultado = False if isinstance(e, ERRORES_DATOS) and not en_gancho else None
+            if self.spool is None: self.perdidas += len(lote)
+        self.ultima_latencia_ms = (time.perf_counter() - t0) * 1000.0
+        self.max_latencia_ms = max(self.max_latencia_ms, self.ultima_latencia_ms)
+        if resultado:
+            self.insertadas += len(lote); self.lotes += 1
+            # Ya hay commit: si el aviso falla, las filas no se vuelven a insertar
+            if self.al_confirmar:
+                try: self.al_confirmar(lote)
+                except Exception as e: self._error(e)
+        return resultado
+
+    def _conexion(self):
+        conn = self.obtener_conexion()
+        if conn is None or conn is self._preparada or self.al_conectar is None: return conn
+        try:
+            self.al_conectar(conn)
+        except Exception as e:
+            try: conn.rollback()
+            except Exception: pass
+            self._error(e); return None
+        self._preparada = conn
+        return conn
+
+    def _error(self, e):
+        # Visible en el pie de la GUI; lo que no es de MariaDB es un bug: traza completa a la consola
+        self.errores += 1; self.ultimo_error = f"{type(e).__name__}: {e}"
+        if not isinstance(e, pymysql.Error): traceback.print_exc()
@@ -0,0 +1,241 @@
+from datetime import date, datetime
+
+import resumenes
+
+# ============================================================
+# ESQUEMA DE LA BASE DE DATOS Y MIGRACIONES
+# ============================================================
+# Crea y mantiene "mediciones" y sus tablas vecinas. Cada cambio de
+# esquema es una migración numerada; las aplicadas quedan en
+# esquema_version, y al arrancar solo corren las que faltan.
+#
+# mediciones:
+#   - tipos compactos: FLOAT para K/%/Pa (7 cifras: sobra para el BME280),
+#     MAC en ASCII de 17, fecha con milisegundos (la alineación de reloj
+#     ya da esa precisión)
+#   - índice (dispositivo_id, fecha_hora) para el historial filtrado y
+#     (fecha_hora) para "todos"; InnoDB le pega la llave primaria, así que
+#     (fecha_hora) ya ordena también por id
+#   - particiones por mes (RANGE COLUMNS): un rango de fechas solo abre los
+#     meses que toca, y borrar un mes viejo es DROP PARTITION, no un DELETE.
+#     Al arrancar se crean los meses que vienen; "pmax" atrapa lo demás.
+# Toda llave única de una tabla particionada debe incluir la columna de la
+# partición: por eso la primaria es (id, fecha_hora).
+
+TABLA = "mediciones"
+MESES_ADELANTE = 3
+
+SQL_VERSIONES = """CREATE TABLE IF NOT EXISTS esquema_version (
+    version INT NOT NULL PRIMARY KEY,
+    descripcion VARCHAR(200) NOT NULL,
+    aplicada DATETIME NOT NULL
+)"""
+
+SQL_MEDICIONES = """CREATE TABLE {tabla} (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    fecha_hora DATETIME(3) NOT NULL,
+    dispositivo_id VARCHAR(17) CHARACTER SET ascii NOT NULL,
+    temperatura FLOAT NOT NULL,
+    humedad FLOAT NOT NULL,
+    presion FLOAT NOT NULL,
+    alias VARCHAR(64),
+    PRIMARY KEY (id, fecha_hora),
+    KEY idx_disp_fecha (dispositivo_id, fecha_hora),
+    KEY idx_fecha (fecha_hora)
+) ENGINE=InnoDB
+PARTITION BY RANGE COLUMNS (fecha_hora) (
+{particiones}
+)"""
+
+_COLUMNAS = "fecha_hora, dispositivo_id, temperatura, humedad, presion, alias"
+
+# ============================================================
+# PARTICIONES POR MES
+# ============================================================
+def _mes(d): return date(d.year, d.month, 1)
+def _siguiente(d): return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+def _particion(mes):
+    return f"PARTITION p{mes:%Y%m} VALUES LESS THAN ('{_siguiente(mes):%Y-%m-%d}')"
+
+def particiones_sql(desde, hasta):
+    # Un mes por partición de desde a hasta (incluidos) y pmax al final
+    meses = []; mes = _mes(desde)
+    while mes <= _mes(hasta): meses.append(_particion(mes)); mes = _siguiente(mes)
+    return ",\n".join(meses + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"])
+
+def _hasta_meses(n, desde=None):
+    mes = _mes(desde or date.today())
+    for _ in range(n): mes = _siguiente(mes)
+    return mes
+
+def particionada(cur, tabla=TABLA):
+    cur.execute("SELECT COUNT(*) FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+                "AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL", (tabla,))
+    return cur.fetchone()[0] > 0
+
+def asegurar_particiones(cur, tabla=TABLA, meses=MESES_ADELANTE):
+    # Parte pmax para que existan los meses que vienen (pmax está vacía: es rápido)
+    cur.execute("SELECT PARTITION_NAME FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+                "AND TABLE_NAME = %s AND PARTITION_NAME LIKE 'p2%%' ORDER BY PARTITION_NAME DESC LIMIT 1", (tabla,))
+    fila = cur.fetchone()
+    if fila is None: return 0
+    ultimo = datetime.strptime(fila[0][1:], "%Y%m").date()
+    nuevas = []; mes = _siguiente(ultimo)
+    while mes <= _hasta_meses(meses): nuevas.append(_particion(mes)); mes = _siguiente(mes)
+    if nuevas:
+        cur.execute(f"ALTER TABLE {tabla} REORGANIZE PARTITION pmax INTO (" + ", ".join(nuevas) + ", PARTITION pmax VALUES LESS THAN (MAXVALUE))")
+    return len(nuevas)
+
+# ============================================================
+# MIGRACIONES
+# ============================================================
+def _existe(cur, tabla):
+    cur.execute("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (tabla,))
+    return cur.fetchone()[0] > 0
+
+def _m1_mediciones(cur):
+    # Tabla nueva, o la hecha a mano de antes copiada al esquema nuevo (la vieja queda como mediciones_v0)
+    if not _existe(cur, TABLA):
+        cur.execute(SQL_MEDICIONES.format(tabla=TABLA, particiones=particiones_sql(date.today(), _hasta_meses(MESES_ADELANTE))))
+        return
+    if particionada(cur): return
+    cur.execute(f"SELECT MIN(fecha_hora) FROM {TABLA}")
+    inicio = cur.fetchone()[0] or date.today()
+    cur.execute(SQL_MEDICIONES.format(tabla=f"{TABLA}_nueva", particiones=particiones_sql(inicio, _hasta_meses(MESES_ADELANTE))))
+    cur.execute(f"INSERT INTO {TABLA}_nueva ({_COLUMNAS}) SELECT {_COLUMNAS} FROM {TABLA} ORDER BY fecha_hora")
+    cur.execute(f"RENAME TABLE {TABLA} TO {TABLA}_v0, {TABLA}_nueva TO {TABLA}")
+
+def _m2_resumenes(cur):
+    # Si ya había resúmenes no se reconstruyen: reconstruir acumula y contaría doble
+    resumenes.crear_tablas(cur)
+    cur.execute(f"SELECT COUNT(*) FROM {resumenes.RESOLUCIONES[0][1]}")
+    if cur.fetchone()[0]: return
+    cur.execute(f"SELECT MIN(fecha_hora), MAX(fecha_hora) FROM {TABLA}")
+    inicio, fin = cur.fetchone()
+    if inicio is not None: resumenes.reconstruir(cur, inicio, fin)
+
+MIGRACIONES = [
+    (1, "mediciones particionada por mes, índice (dispositivo_id, fecha_hora), tipos compactos", _m1_mediciones),
+    (2, "resúmenes 1m/1h/1d con los datos existentes", _m2_resumenes),
+]
+
+def version_actual(cur):
+    cur.execute(SQL_VERSIONES)
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM esquema_version")
+    return cur.fetchone()[0]
+
+def migrar(conn, avisar=None):
+    # Aplica las migraciones pendientes (cada una con su commit) y crea las particiones que falten.
+    # Regresa las versiones aplicadas; avisar(texto) recibe el avance (copiar el historial puede
+    # tardar minutos). El DDL de MariaDB no se puede deshacer: si una falla, no se registra y se
+    # reintenta con la siguiente conexión (por eso son idempotentes).
+    aplicadas = []
+    with conn.cursor() as cur:
+        actual = version_actual(cur)
+        for version, descripcion, paso in MIGRACIONES:
+            if version <= actual: continue
+            if avisar: avisar(f"migrando a v{version}: {descripcion}")
+            paso(cur)
+            cur.execute("INSERT INTO esquema_version (version, descripcion, aplicada) VALUES (%s, %s, NOW())", (version, descripcion))
+            conn.commit(); aplicadas.append(version)
+        asegurar_particiones(cur)
+    conn.commit()
+    return aplicadas
+
+class Migrador:
+    # Estado del esquema para la GUI: migrar() es el gancho al_conectar del escritor (corre en su
+    # hilo con cada conexión nueva) y también se usa al arrancar; texto/error se leen desde la GUI.
+    def __init__(self):
+        self.texto = "pendiente (sin conexión)"
+        self.error = None
+        self.aplicadas = []
+
+    def migrar(self, conn):
+        try:
+            aplicadas = migrar(conn, avisar=self._avisar)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"; self.texto = f"error, se reintenta al reconectar ({self.error})"
+            raise
+        self.error = None; self.aplicadas += aplicadas
+        self.texto = f"v{MIGRACIONES[-1][0]} al día" + (f" (aplicadas: {', '.join(map(str, self.aplicadas))})" if self.aplicadas else "")
+        return aplicadas
+
+    def _avisar(self, texto): self.texto = texto
+
+# ============================================================
+# BENCHMARK: consultas por rango con 10M+ filas (necesita MariaDB)
+# ============================================================
+# python esquema.py --password ... --database ... [--filas 10000000]
+# Llena una tabla de prueba con el mismo DDL (motor Sequence de MariaDB),
+# revisa con EXPLAIN PARTITIONS que cada consulta use el índice esperado y
+# solo abra los meses del rango, y la cronometra contra la misma consulta
+# sin índices (IGNORE INDEX).
+if __name__ == "__main__":
+    import argparse
+    import time
+    import pymysql
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1"); ap.add_argument("--user", default="admin")
+    ap.add_argument("--password", default=""); ap.add_argument("--database", default="sensores")
+    ap.add_argument("--filas", type=int, default=10_000_000); ap.add_argument("--dispositivos", type=int, default=4)
+    ap.add_argument("--conservar", action="store_true", help="no borrar la tabla de prueba al final")
+    args = ap.parse_args()
+
+    banco = "mediciones_banco"
+    inicio = date(2025, 1, 1); fin = date(2025, 12, 31)
+    conn = pymysql.connect(host=args.host, user=args.user, password=args.password, database=args.database, autocommit=False)
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {banco}")
+    cur.execute(SQL_MEDICIONES.format(tabla=banco, particiones=particiones_sql(inicio, fin)))
+
+    # Un año repartido entre los dispositivos; cada uno con su paso de tiempo
+    paso_us = int(365 * 86400 * 1e6 * args.dispositivos / args.filas)
+    t0 = time.perf_counter(); bloque = 1_000_000
+    for a in range(1, args.filas + 1, bloque):
+        b = min(a + bloque - 1, args.filas)
+        cur.execute(f"INSERT INTO {banco} ({_COLUMNAS}) "
+                    f"SELECT TIMESTAMP('{inicio}') + INTERVAL (seq DIV {args.dispositivos}) * {paso_us} MICROSECOND, "
+                    f"CONCAT('24:D7:EB:59:2E:', LPAD(HEX(seq MOD {args.dispositivos}), 2, '0')), "
+                    "294 + (seq MOD 100) / 100, 40 + (seq MOD 30), 81600 + (seq MOD 50), 'Banco' "
+                    f"FROM seq_{a}_to_{b}")
+        conn.commit()
+    carga = time.perf_counter() - t0
+    cur.execute(f"ANALYZE TABLE {banco}"); cur.fetchall()
+    cur.execute("SELECT DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (banco,))
+    print(f"{args.filas:,d} filas cargadas en {carga:.0f} s ({args.filas / carga:,.0f} filas/s), {cur.fetchone()[0] / 2**20:,.0f} MiB")
+
+    mac = "24:D7:EB:59:2E:01"
+    consultas = [
+        # nombre, sql, params, índice esperado, máximo de particiones abiertas
+        ("1 disp, 1 hora", f"SELECT fecha_hora, temperatura, humedad, presion FROM {banco} {{hint}} WHERE dispositivo_id = %s "
+                           "AND fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora", (mac, "2025-06-15 10:00:00", "2025-06-15 11:00:00"), "idx_disp_fecha", 1),
+        ("1 disp, 1 día", f"SELECT fecha_hora, temperatura, humedad, presion FROM {banco} {{hint}} WHERE dispositivo_id = %s "
+                          "AND fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora", (mac, "2025-06-15 00:00:00", "2025-06-15 23:59:59"), "idx_disp_fecha", 1),
+        ("todos, 1 hora", f"SELECT fecha_hora, temperatura, humedad, presion, dispositivo_id FROM {banco} {{hint}} "
+                          "WHERE fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora", ("2025-06-15 10:00:00", "2025-06-15 11:00:00"), "idx_fecha", 1),
+        ("1 disp, 30 días (AVG)", f"SELECT COUNT(*), AVG(temperatura) FROM {banco} {{hint}} WHERE dispositivo_id = %s "
+                                  "AND fecha_hora BETWEEN %s AND %s", (mac, "2025-03-10 00:00:00", "2025-04-08 23:59:59"), "idx_disp_fecha", 2),
+    ]
+
+    def cronometrar(sql, params, vueltas=5):
+        mejor = float("inf")
+        for _ in range(vueltas):
+            t0 = time.perf_counter(); cur.execute(sql, params); filas = cur.fetchall()
+            mejor = min(mejor, time.perf_counter() - t0)
+        return mejor * 1000, len(filas)
+
+    for nombre, sql, params, indice, max_particiones in consultas:
+        cur.execute("EXPLAIN PARTITIONS " + sql.format(hint=""), params)
+        plan = dict(zip([d[0] for d in cur.description], cur.fetchone()))
+        abiertas = (plan.get("partitions") or "").split(",")
+        ok = plan.get("key") == indice and len(abiertas) <= max_particiones
+        ms_idx, n = cronometrar(sql.format(hint=""), params)
+        ms_sin, _ = cronometrar(sql.format(hint="IGNORE INDEX (idx_disp_fecha, idx_fecha)"), params, vueltas=1)
+        print(f"{nombre:22s} | {'OK ' if ok else 'MAL'} key={plan.get('key')} particiones={plan.get('partitions')} filas_est={plan.get('rows')} | "
+              f"{n:7,d} filas en {ms_idx:8.1f} ms (sin índice: {ms_sin:8.1f} ms)")
+        assert ok, f"plan inesperado para '{nombre}': {plan}"
+
+    if not args.conservar: cur.execute(f"DROP TABLE {banco}")
+    conn.close()
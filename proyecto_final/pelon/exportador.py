@@ -0,0 +1,216 @@
+import os
+import csv
+import time
+
+import numpy as np
+import pymysql.cursors
+
+import conversion_unidades as conv
+
+# Formatos columnares opcionales: sin pyarrow solo quedan CSV/TSV y .npz
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# ============================================================
+# EXPORTADOR EN STREAMING (MEMORIA CONSTANTE)
+# ============================================================
+# Usa un SSCursor (sin buffer del lado del cliente): MariaDB manda las
+# filas conforme se leen y aquí se procesan en bloques con fetchmany, así
+# que la memoria no depende del tamaño del rango exportado.
+#
+# Según la extensión del archivo se escribe:
+#   .csv / .txt        texto (coma / tabulador)
+#   .parquet           Parquet comprimido (zstd), por bloques
+#   .arrow / .feather  Arrow IPC comprimido (zstd), por bloques
+#   .npz               NumPy comprimido (respaldo si no hay pyarrow)
+# Todo va en SI: fecha como timestamp, temperatura (K), humedad (%) y
+# presión (Pa) como float32, MAC y alias como texto.
+
+SQL_EXPORT = "SELECT fecha_hora, temperatura, humedad, presion, dispositivo_id, alias FROM mediciones WHERE fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora ASC"
+
+EXTENSIONES = [("CSV", "*.csv"), ("Texto", "*.txt"), ("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow"), ("NumPy", "*.npz")]
+
+def encabezado():
+    u_t, u_p = conv.unidades(conv.MODO_SI)
+    return ["Fecha", f"Temperatura ({u_t})", "Humedad (%)", f"Presion ({u_p})", "MAC Address", "Alias"]
+
+def formatear_bloque(filas):
+    # Exportamos SIEMPRE en SI (K y Pa); la conversión va por bloque, no por fila
+    temps_k, press_pa = conv.columnas(filas, 1, 3)
+    t_si, _, p_si, _ = conv.desde_si(temps_k, press_pa, conv.MODO_SI)
+    return [(r[0], f"{ts:.2f}", r[2], f"{ps:.0f}", r[4], r[5] if r[5] else "---")
+            for r, ts, ps in zip(filas, t_si.tolist(), p_si.tolist())]
+
+def columnas_bloque(filas):
+    # Bloque de filas -> columnas tipadas
+    temps_k, hums, press_pa = conv.columnas(filas, 1, 2, 3)
+    return {
+        "fecha": np.array([r[0] for r in filas], dtype="datetime64[ms]"),
+        "temperatura_k": temps_k.astype(np.float32),
+        "humedad": hums.astype(np.float32),
+        "presion_pa": press_pa.astype(np.float32),
+        "dispositivo_id": [r[4] for r in filas],
+        "alias": [r[5] if r[5] else "---" for r in filas],
+    }
+
+def _bloques(cursor, tarea, bloque):
+    n = 0; t0 = time.perf_counter()
+    while True:
+        filas = cursor.fetchmany(bloque)
+        if not filas: return
+        yield filas
+        n += len(filas)
+        if tarea:
+            tarea.verificar()
+            tarea.progreso(n, None, f"Exportando... {n} filas ({n / max(time.perf_counter() - t0, 1e-6):.0f} filas/s)")
+
+def escribir_texto(cursor, filename, tarea=None, bloque=5000, buffer=1 << 20):
+    delimitador = ',' if filename.endswith(".csv") else '\t'
+    n = 0
+    with open(filename, mode='w', newline='', encoding='utf-8', buffering=buffer) as f:
+        writer = csv.writer(f, delimiter=delimitador)
+        writer.writerow(encabezado())
+        for filas in _bloques(cursor, tarea, bloque):
+            writer.writerows(formatear_bloque(filas)); n += len(filas)
+    return n
+
+def _esquema_arrow():
+    return pa.schema([("fecha", pa.timestamp("ms")), ("temperatura_k", pa.float32()), ("humedad", pa.float32()),
+                      ("presion_pa", pa.float32()), ("dispositivo_id", pa.dictionary(pa.int16(), pa.string())),
+                      ("alias", pa.dictionary(pa.int16(), pa.string()))])
+
+def _tabla_arrow(filas, esquema, catalogos=None):
+    # catalogos (valor -> código, por columna): un solo diccionario que crece en todo el archivo. El
+    # formato IPC no admite un diccionario distinto por bloque (una MAC nueva en el bloque 2 tronaba
+    # con "Dictionary replacement detected"), pero sí deltas: valores nuevos agregados al final.
+    c = columnas_bloque(filas); columnas = {}
+    for k, v in c.items():
+        tipo = esquema.field(k).type
+        if catalogos is not None and pa.types.is_dictionary(tipo):
+            cat = catalogos.setdefault(k, {})
+            codigos = pa.array([cat.setdefault(x, len(cat)) for x in v], type=tipo.index_type)
+            columnas[k] = pa.DictionaryArray.from_arrays(codigos, pa.array(list(cat), type=tipo.value_type))
+        else: columnas[k] = pa.array(v).cast(tipo)
+    return pa.Table.from_pydict(columnas, schema=esquema)
+
+def escribir_parquet(cursor, filename, tarea=None, bloque=50000):
+    if pa is None: raise RuntimeError("Parquet requiere pyarrow (pip install pyarrow); usa .npz")
+    esquema = _esquema_arrow(); n = 0
+    with pq.ParquetWriter(filename, esquema, compression="zstd") as w:
+        for filas in _bloques(cursor, tarea, bloque):
+            w.write_table(_tabla_arrow(filas, esquema)); n += len(filas)
+    return n
+
+def escribir_arrow(cursor, filename, tarea=None, bloque=50000):
+    if pa is None: raise RuntimeError("Arrow requiere pyarrow (pip install pyarrow); usa .npz")
+    esquema = _esquema_arrow(); n = 0; catalogos = {}
+    opciones = ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+    with pa.OSFile(filename, "wb") as sink, ipc.new_file(sink, esquema, options=opciones) as w:
+        for filas in _bloques(cursor, tarea, bloque):
+            w.write_table(_tabla_arrow(filas, esquema, catalogos)); n += len(filas)
+    return n
+
+def escribir_npz(cursor, filename, tarea=None, bloque=50000):
+    # np.savez no escribe por partes: juntamos columnas compactas (float32 y
+    # códigos uint16 para MAC/alias) y se guardan al final
+    partes = {"fecha": [], "temperatura_k": [], "humedad": [], "presion_pa": [], "dispositivo_id": [], "alias": []}
+    catalogos = {"dispositivo_id": {}, "alias": {}}
+    for filas in _bloques(cursor, tarea, bloque):
+        c = columnas_bloque(filas)
+        for k in ("fecha", "temperatura_k", "humedad", "presion_pa"): partes[k].append(c[k])
+        for k, cat in catalogos.items():
+            partes[k].append(np.array([cat.setdefault(v, len(cat)) for v in c[k]], dtype=np.uint16))
+    if not partes["fecha"]: return 0
+    datos = {k: np.concatenate(v) for k, v in partes.items()}
+    for k, cat in catalogos.items(): datos[k + "_valores"] = np.array(list(cat), dtype=str)
+    with open(filename, "wb") as f: np.savez_compressed(f, **datos)
+    return len(datos["fecha"])
+
+def escritor_para(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".parquet": return escribir_parquet
+    if ext in (".arrow", ".feather"): return escribir_arrow
+    if ext == ".npz": return escribir_npz
+    return escribir_texto
+
+def escribir(cursor, filename, tarea=None):
+    # Consume un cursor ya ejecutado. Regresa el número de filas.
+    try:
+        n = escritor_para(filename)(cursor, filename, tarea)
+    except BaseException:
+        # Cancelado o error: no dejamos un archivo a medias
+        try: os.remove(filename)
+        except OSError: pass
+        raise
+    if n == 0 and os.path.exists(filename): os.remove(filename)  # sin datos no hay archivo
+    return n
+
+def exportar_rango(conn, inicio, fin, filename, tarea=None):
+    cur = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cur.execute(SQL_EXPORT, (inicio, fin))
+        n = escribir(cur, filename, tarea)
+    except BaseException:
+        # Cerrar un SSCursor lee todo lo que falta del resultado; cerrando la
+        # conexión lo descartamos de inmediato (el pool la reemplaza solo)
+        conn.close(); raise
+    cur.close()
+    return n
+
+# ============================================================
+# BENCHMARK: filas/s, memoria pico, tamaño y tiempo de carga por formato
+# ============================================================
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import tracemalloc
+    from datetime import datetime, timedelta
+
+    class CursorSintetico:
+        # Imita un SSCursor: genera las filas al vuelo; desde la fila "otra_mac" llega un segundo dispositivo
+        def __init__(self, total, otra_mac=None):
+            self.total = total; self.i = 0; self.base = datetime(2025, 12, 1); self.otra_mac = otra_mac
+        def fetchmany(self, n):
+            fin = min(self.i + n, self.total)
+            filas = [(self.base + timedelta(seconds=k), 294.0 + (k % 100) / 100, 58.0 + (k % 13) / 10, 81600.0 + k % 7,
+                      *(("24:D7:EB:59:2E:31", "Sotano") if self.otra_mac is not None and k >= self.otra_mac else ("24:D7:EB:59:2E:30", "SinAlias")))
+                     for k in range(self.i, fin)]
+            self.i = fin; return filas
+
+    def cargar(filename):
+        # Lo que haría un analista para tener las columnas en memoria
+        ext = os.path.splitext(filename)[1]
+        if ext == ".npz":
+            with np.load(filename) as z: return {k: z[k] for k in z.files}
+        if ext == ".parquet": return pq.read_table(filename)
+        if ext == ".arrow":
+            with pa.memory_map(filename) as src: return ipc.open_file(src).read_all()
+        try:
+            import pandas
+            return pandas.read_csv(filename, parse_dates=["Fecha"])
+        except ImportError:
+            with open(filename, newline='', encoding='utf-8') as f: return list(csv.reader(f))
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    formatos = [".csv", ".npz"] + ([".parquet", ".arrow"] if pa is not None else [])
+    # Una MAC y un alias que aparecen hasta el segundo bloque de 50k: los formatos columnares deben conservarlos
+    for ext in [".npz"] + ([".parquet", ".arrow"] if pa is not None else []):
+        destino = os.path.join(tempfile.gettempdir(), "bench_export_macs" + ext)
+        escribir(CursorSintetico(120_000, otra_mac=60_000), destino); datos = cargar(destino); os.remove(destino)
+        if ext == ".npz": macs = datos["dispositivo_id_valores"][datos["dispositivo_id"]].tolist()
+        else: macs = datos.column("dispositivo_id").to_pylist()
+        assert macs.count("24:D7:EB:59:2E:30") == 60_000 and macs.count("24:D7:EB:59:2E:31") == 60_000, ext
+    print(f"{total} filas")
+    for ext in formatos:
+        destino = os.path.join(tempfile.gettempdir(), "bench_export" + ext)
+        t0 = time.perf_counter(); n = escribir(CursorSintetico(total), destino); seg = time.perf_counter() - t0
+        # Segunda pasada solo para medir memoria (tracemalloc hace lento todo)
+        tracemalloc.start(); escribir(CursorSintetico(total), destino)
+        _, pico = tracemalloc.get_traced_memory(); tracemalloc.stop()
+        t0 = time.perf_counter(); cargar(destino); carga = time.perf_counter() - t0
+        print(f"{ext:>9} | {n / seg:9.0f} filas/s | memoria pico {pico / 1e6:6.1f} MB | {os.path.getsize(destino) / 1e6:6.1f} MB en disco | carga {carga * 1000:7.1f} ms")
+        os.remove(destino)
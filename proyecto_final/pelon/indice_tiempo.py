@@ -0,0 +1,49 @@
+import time
+import numpy as np
+
+# ============================================================
+# ÍNDICE DE TIEMPO (BÚSQUEDA BINARIA)
+# ============================================================
+# El buffer de sesión garantiza tiempos no decrecientes, así que la
+# ventana de la gráfica y el tooltip se resuelven con búsqueda binaria
+# (np.searchsorted) en O(log n) en lugar de recorrer todas las muestras.
+
+def inicio_ventana(tiempos, corte):
+    # Primer índice con t > corte
+    return int(np.searchsorted(tiempos, corte, side="right"))
+
+def mas_cercano(tiempos, t):
+    # Índice de la muestra más cercana a t (-1 si no hay muestras)
+    n = len(tiempos)
+    if n == 0: return -1
+    i = int(np.searchsorted(tiempos, t))
+    if i == 0: return 0
+    if i >= n: return n - 1
+    return i if tiempos[i] - t < t - tiempos[i - 1] else i - 1
+
+# ============================================================
+# BENCHMARK: costo por tick vs tamaño de la sesión
+# ============================================================
+if __name__ == "__main__":
+    repeticiones = 2000
+    print(f"{'muestras':>10} | {'ventana (us)':>12} | {'cercano (us)':>12} | {'lista O(n) (us)':>15}")
+    for n in (1_000, 10_000, 100_000, 1_000_000, 10_000_000):
+        tiempos = np.arange(n, dtype=np.float64) * 0.5 + 1.7e9
+        corte = tiempos[-1] - 60
+        consultas = np.random.uniform(tiempos[0], tiempos[-1], repeticiones)
+
+        t0 = time.perf_counter()
+        for _ in range(repeticiones): inicio_ventana(tiempos, corte)
+        us_ventana = (time.perf_counter() - t0) / repeticiones * 1e6
+
+        t0 = time.perf_counter()
+        for q in consultas: mas_cercano(tiempos, q)
+        us_cercano = (time.perf_counter() - t0) / repeticiones * 1e6
+
+        # Referencia: la comprensión de lista que usaba update_ui_loop (solo tamaños chicos)
+        us_lista = float("nan")
+        if n <= 100_000:
+            lista = tiempos.tolist(); t0 = time.perf_counter()
+            for _ in range(5): [i for i, t in enumerate(lista) if t > corte]
+            us_lista = (time.perf_counter() - t0) / 5 * 1e6
+        print(f"{n:>10} | {us_ventana:>12.2f} | {us_cercano:>12.2f} | {us_lista:>15.1f}")
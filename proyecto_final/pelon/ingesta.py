@@ -0,0 +1,246 @@
+import os
+import time
+import queue
+import threading
+import selectors
+from datetime import datetime
+
+import serial
+
+from sesion_buffer import BufferSesion
+from protocolo import ParserProtocolo
+from alineacion_reloj import AlineadorReloj, fechas_locales
+
+# ============================================================
+# INGESTA MULTI-DISPOSITIVO
+# ============================================================
+# Cada puerto abierto tiene su propio lector; el estado de cada placa
+# (MAC, alias, últimos valores, contador y buffer de sesión) vive en un
+# EstadoDispositivo indexado por MAC, así varias ESP32 no se pisan. Si una
+# placa se reconecta en otro puerto recupera su mismo estado y buffer.
+# La GUI solo lee el estado del dispositivo que está mostrando.
+#
+# Lectura por eventos: un solo hilo espera con selectors a que cualquier
+# puerto tenga datos (sin sondear in_waiting), lee bloques grandes y parte
+# las líneas con ParserProtocolo (todo el bloque de una vez). En Windows los puertos no sirven con select, así
+# que ahí se usa un hilo por puerto con read() bloqueante.
+
+class EstadoDispositivo:
+    def __init__(self, clave, puerto, sesion):
+        self.clave = clave      # MAC, o "<puerto> (sin ID)" mientras no llega la línea ID:
+        self.mac = None
+        self.alias = "---"
+        self.puerto = puerto
+        self.temp = 0.0
+        self.hum = 0.0
+        self.pres = 0.0
+        self.paquetes = 0
+        self.sesion = sesion
+
+    def etiqueta(self):
+        return f"{self.alias} ({self.mac})" if self.mac else self.clave
+
+LEER_BLOQUE = 65536
+ESPERA_RESET_S = 2.0   # la ESP32 se reinicia al abrir el puerto
+USAR_SELECTOR = os.name != "nt"
+
+class LectorPuerto:
+    def __init__(self, gestor, puerto, baud):
+        self.gestor = gestor
+        self.puerto = puerto
+        # timeout=0: no bloqueante, el selector avisa cuándo hay datos
+        self.serial = serial.Serial(puerto, baud, timeout=0 if USAR_SELECTOR else 0.5)
+        self.estado = gestor._estado_provisional(puerto)
+        self.activo = True
+        self.parser = ParserProtocolo()
+        self.reloj = AlineadorReloj()  # millis() de la placa -> hora del host
+        self.sincronizar_en = time.monotonic() + ESPERA_RESET_S
+        self.bytes = 0
+
+    def escribir(self, texto):
+        try: self.serial.write(texto.encode()); return True
+        except Exception: return False
+
+    def sincronizar(self):
+        # Hora para el reloj de la placa y, si se pidió, modo binario
+        self.escribir(f"T:{datetime.now().strftime('%H:%M:%S')}\n")
+        if self.gestor.binario: self.escribir("BIN:1\n")
+        self.sincronizar_en = float("inf")
+
+    def cerrar(self):
+        self.activo = False
+        try: self.serial.close()
+        except Exception: pass
+
+    def leer(self):
+        # Lee todo lo disponible; regresa False si el puerto se cerró o falló
+        try:
+            if USAR_SELECTOR: datos = os.read(self.serial.fileno(), LEER_BLOQUE)
+            else: datos = self.serial.read(max(1, self.serial.in_waiting))
+        except (BlockingIOError, InterruptedError): return True  # EAGAIN/EINTR: el selector avisó pero aún no hay bytes
+        except (OSError, serial.SerialException): return False   # EIO: se desconectó el USB; o el puerto ya no sirve
+        if USAR_SELECTOR and not datos: return False  # EOF: se desconectó
+        if datos: self.procesar(datos)
+        return True
+
+    def procesar(self, datos):
+        self.bytes += len(datos)
+        muestras, identidad = self.parser.procesar(datos)
+        # La ID va primero: el lote es de la placa que está en este puerto
+        if identidad: self.gestor.identificar(self, *identidad)
+        if len(muestras): self.gestor.registrar_lote(self.estado, self.reloj.alinear(muestras[:, 0], time.time()), muestras)
+
+def hilo_receptor(gestor):
+    # Bucle único para todos los puertos (POSIX)
+    sel = gestor._selector
+    while gestor.ejecutando:
+        gestor._aplicar_pendientes()
+        espera = gestor._sincronizar_pendientes()
+        for key, _ in sel.select(timeout=espera):
+            if key.data is None:  # nos despertaron para registrar/quitar puertos
+                try: os.read(key.fd, 4096)
+                except OSError: pass
+                continue
+            lector = key.data
+            if lector.activo and not lector.leer(): gestor.cerrar(lector.puerto)
+
+def hilo_puerto(gestor, lector):
+    # Respaldo para Windows: read() bloquea hasta timeout, no gira en vacío
+    while lector.activo:
+        if time.monotonic() >= lector.sincronizar_en: lector.sincronizar()
+        if not lector.leer(): gestor.cerrar(lector.puerto); return
+
+class GestorIngesta:
+    def __init__(self, escritor, baud, retencion_s, tasa_max_hz, binario=False):
+        self.escritor = escritor
+        self.binario = binario   # pedir tramas binarias (BIN:1) al abrir cada puerto
+        self.baud = baud
+        self.retencion_s = retencion_s
+        self.tasa_max_hz = tasa_max_hz
+        self.lectores = {}       # puerto -> LectorPuerto
+        self.dispositivos = {}   # clave (MAC) -> EstadoDispositivo
+        self._lock = threading.Lock()
+        self.ejecutando = True
+        self._hilo = None
+        if USAR_SELECTOR:
+            # Los cambios de registro los aplica el propio hilo lector; el pipe lo despierta
+            self._selector = selectors.DefaultSelector()
+            self._pendientes = queue.SimpleQueue()
+            self._despertar_r, self._despertar_w = os.pipe()
+            os.set_blocking(self._despertar_r, False)
+            self._selector.register(self._despertar_r, selectors.EVENT_READ, None)
+
+    # --- Puertos ---
+    def abrir(self, puerto):
+        if puerto in self.lectores: return self.lectores[puerto]
+        lector = LectorPuerto(self, puerto, self.baud)  # lanza excepción si el puerto no abre
+        self.lectores[puerto] = lector
+        if USAR_SELECTOR:
+            self._pendientes.put(("alta", lector)); self._despertar()
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=hilo_receptor, args=(self,), daemon=True); self._hilo.start()
+        else:
+            threading.Thread(target=hilo_puerto, args=(self, lector), daemon=True).start()
+        return lector
+
+    def cerrar(self, puerto):
+        lector = self.lectores.pop(puerto, None)
+        if lector is None: return
+        if USAR_SELECTOR: self._pendientes.put(("baja", lector)); self._despertar()
+        else: lector.cerrar()
+
+    def cerrar_todos(self):
+        for puerto in list(self.lectores): self.cerrar(puerto)
+
+    def detener(self):
+        self.cerrar_todos(); self.ejecutando = False
+        if USAR_SELECTOR: self._despertar()
+        if self._hilo: self._hilo.join(1.0)
+
+    def _despertar(self):
+        try: os.write(self._despertar_w, b"x")
+        except OSError: pass
+
+    def _aplicar_pendientes(self):
+        while True:
+            try: op, lector = self._pendientes.get_nowait()
+            except queue.Empty: return
+            if op == "alta" and lector.activo:
+                self._selector.register(lector.serial.fileno(), selectors.EVENT_READ, lector)
+            elif op == "baja":
+                try: self._selector.unregister(lector.serial.fileno())
+                except (KeyError, ValueError, OSError): pass
+                lector.cerrar()
+
+    def _sincronizar_pendientes(self):
+        # Manda la hora a los puertos recién abiertos; regresa cuánto puede dormir select()
+        ahora = time.monotonic(); espera = None
+        for lector in list(self.lectores.values()):
+            if lector.sincronizar_en == float("inf"): continue
+            if ahora >= lector.sincronizar_en: lector.sincronizar()
+            else:
+                falta = lector.sincronizar_en - ahora
+                espera = falta if espera is None else min(espera, falta)
+        return espera
+
+    def abierto(self, puerto): return puerto in self.lectores
+
+    def hay_conexion(self): return bool(self.lectores)
+
+    def enviar(self, puerto, texto):
+        lector = self.lectores.get(puerto)
+        if lector is None: return False
+        if texto.startswith("SET_NAME:"):
+            # La placa se reinicia: vuelve en ASCII y sin hora, hay que sincronizarla otra vez
+            lector.sincronizar_en = time.monotonic() + ESPERA_RESET_S
+            if USAR_SELECTOR: self._despertar()
+        return lector.escribir(texto)
+
+    def enviar_todos(self, texto):
+        for lector in list(self.lectores.values()): lector.escribir(texto)
+
+    # --- Dispositivos ---
+    def identificar(self, lector, mac, alias):
+        estado = lector.estado
+        if estado.mac == mac:
+            if alias: estado.alias = alias
+            return
+        with self._lock:
+            previo = self.dispositivos.get(mac)
+            if previo is None:
+                # Primera vez que vemos esta MAC: el estado provisional se queda con ella
+                self.dispositivos.pop(estado.clave, None)
+                estado.clave = mac; self.dispositivos[mac] = estado; previo = estado
+            elif estado.paquetes == 0 and estado is not previo:
+                self.dispositivos.pop(estado.clave, None)
+            previo.mac = mac; previo.puerto = lector.puerto
+            if alias: previo.alias = alias
+            lector.estado = previo
+
+    def registrar_lote(self, estado, tiempos, muestras):
+        # tiempos: epoch de cada muestra (ya alineado); muestras: arreglo (n, 4) del parser -> millis, °C, %HR, hPa
+        t, h, p = muestras[:, 1], muestras[:, 2], muestras[:, 3]
+        estado.temp, estado.hum, estado.pres = float(t[-1]), float(h[-1]), float(p[-1])
+        estado.paquetes += len(muestras)
+        estado.sesion.extender(tiempos, t, h, p)
+        dispositivo = estado.mac if estado.mac else "Desconocido"
+        # Guardamos tambien el ALIAS
+        alias_db = estado.alias if estado.alias != "---" else "SinAlias"
+        # El INSERT lo hace el escritor en lotes (y reconecta solo si la DB cae); todo el bloque va a la cola de una vez
+        self.escritor.encolar_lote([(temp_k, hum, pres_pa, fecha, dispositivo, alias_db) for temp_k, hum, pres_pa, fecha
+                                    in zip((t + 273.15).tolist(), h.tolist(), (p * 100.0).tolist(), fechas_locales(tiempos))])
+
+    def errores_protocolo(self):
+        return sum(lector.parser.errores() for lector in list(self.lectores.values()))
+
+    def paquetes_totales(self):
+        return sum(d.paquetes for d in list(self.dispositivos.values()))
+
+    def _estado_provisional(self, puerto):
+        clave = f"{puerto} (sin ID)"
+        with self._lock:
+            estado = self.dispositivos.get(clave)
+            if estado is None:
+                estado = EstadoDispositivo(clave, puerto, BufferSesion(self.retencion_s, self.tasa_max_hz))
+                self.dispositivos[clave] = estado
+            return estado
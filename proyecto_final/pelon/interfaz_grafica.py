@@ -1,13 +1,9 @@
 import sys
-import time
 import json
 import os
-import serial
 import serial.tools.list_ports
-import threading
 import pymysql
-import csv
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import customtkinter as ctk
 from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry 
@@ -18,6 +14,21 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
 
+from escritor_db import EscritorDB
+from spool import SpoolLocal
+from pool_db import PoolDB, ErrorPool
+from ejecutor_consultas import EjecutorConsultas
+import exportador
+import resumenes
+import esquema
+from tabla_virtual import TablaVirtual, FuenteKeyset, FuenteLista
+from cache_consultas import CacheConsultas
+from ingesta import GestorIngesta
+from indice_tiempo import inicio_ventana, mas_cercano
+import conversion_unidades as conv
+from decimacion import DecimadorMinMax
+from renderizador import RenderizadorBlit
+
 # ============================================================
 # CONFIGURACIÓN
 # ============================================================
@@ -28,20 +39,39 @@ DB_HOST = "127.0.0.1"
 DB_USER = "admin"  
 DB_PASS = "1324" 
 DB_NAME = "sensores"
+# Escritura por lotes: se inserta al juntar DB_LOTE_FILAS o cada DB_LOTE_SEGUNDOS
+DB_LOTE_FILAS = 200
+DB_LOTE_SEGUNDOS = 1.0
+DB_COLA_MAX = 20000
+# Spool en disco: toda muestra pasa por aquí antes de MariaDB (sobrevive a caídas de la DB)
+SPOOL_ARCHIVO = "spool_mediciones.db"
+SPOOL_MAX_FILAS = 2_000_000
+# Historial: filas que llenan la tabla; rangos largos se leen de los resúmenes 1m/1h/1d
+HIST_FILAS_VISTA = 500
+HIST_MAX_CRUDAS = 5000
+TASA_DISPOSITIVO_HZ = 2.0   # el firmware manda una lectura cada 500 ms
+CACHE_HIST_MB = 64          # resultados de consultas del historial en memoria (LRU)
+# Sesión en memoria (por dispositivo): ventana de retención y tasa máxima esperada por segundo
+RETENCION_HORAS = 24
+TASA_MAX_HZ = 10
+MODO_BINARIO = False   # True: pedir tramas binarias a las placas (firmware con BIN:)
 
 # VARIABLES GLOBALES
-session_data = { "time": [], "temp": [], "hum": [], "pres": [] }
-val_id_locked = None          
-val_alias_hardware = "---"    
-val_temp = 0.0
-val_hum = 0.0
-val_pres = 0.0
-paquetes_recibidos = 0 
-arduino = None
-conexion_db = None
-cursor_db = None
-db_activa = False
-ejecutando = True
+# Ingesta y consultas usan conexiones distintas del pool (pymysql no es thread-safe)
+pool = PoolDB(host=DB_HOST, user=DB_USER, password=DB_PASS, database=DB_NAME)
+# Migraciones: al arrancar y con cada conexión nueva del escritor (la DB pudo estar caída al abrir)
+migrador = esquema.Migrador()
+# Cada lote confirmado en la DB invalida lo que la caché tenga de esas fechas
+cache_hist = CacheConsultas(CACHE_HIST_MB * 2**20)
+escritor = EscritorDB(pool.ingesta, DB_LOTE_FILAS, DB_LOTE_SEGUNDOS, DB_COLA_MAX, SpoolLocal(SPOOL_ARCHIVO, SPOOL_MAX_FILAS),
+                      al_insertar=resumenes.actualizar, al_confirmar=cache_hist.invalidar_lote, al_conectar=migrador.migrar)
+# Un lector por puerto; estado y buffer de sesión por MAC
+gestor = GestorIngesta(escritor, BAUD_RATE, RETENCION_HORAS * 3600, TASA_MAX_HZ, MODO_BINARIO)
+
+# Las gráficas trabajan con epoch float; matplotlib usa días desde su propia época
+ZONA_LOCAL = datetime.now().astimezone().tzinfo
+EPOCH_MPL = mdates.date2num(datetime(1970, 1, 1, tzinfo=timezone.utc))
+def a_num_mpl(t): return EPOCH_MPL + t / 86400.0
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
@@ -61,63 +91,6 @@ def guardar_apodo(id_real, nuevo_apodo):
 
 apodos_cache = cargar_apodos()
 
-def hilo_receptor():
-    global val_id_locked, val_alias_hardware, val_temp, val_hum, val_pres, paquetes_recibidos
-    while ejecutando:
-        if arduino and arduino.is_open:
-            try:
-                if arduino.in_waiting > 0:
-                    try:
-                        linea = arduino.readline().decode('utf-8', errors='ignore').strip()
-                    except: continue
-                    
-                    # --- 1. DETECCIÓN DE ID ---
-                    if linea.startswith("ID:") or linea.startswith("ID_THB:"):
-                        try:
-                            clean_content = linea.split(":", 1)[1]
-                            if "|" in clean_content:
-                                parts = clean_content.split("|")
-                                val_id_locked = parts[0].strip()
-                                val_alias_hardware = parts[1].strip()
-                            else:
-                                val_id_locked = clean_content.strip()
-                        except: pass
-                        continue 
-
-                    # --- 2. DETECCIÓN DE DATOS ---
-                    if "," in linea:
-                        partes = linea.split(",")
-                        if len(partes) >= 4:
-                            try:
-                                t = float(partes[1])
-                                h = float(partes[2])
-                                p = float(partes[3])
-                                
-                                ahora = datetime.now()
-                                val_temp, val_hum, val_pres = t, h, p
-                                paquetes_recibidos += 1
-
-                                session_data["time"].append(ahora)
-                                session_data["temp"].append(t)
-                                session_data["hum"].append(h)
-                                session_data["pres"].append(p)
-                                
-                                if db_activa and cursor_db:
-                                    try:
-                                        temp_k = t + 273.15
-                                        pres_pa = p * 100.0
-                                        dispositivo = val_id_locked if val_id_locked else "Desconocido"
-                                        # Guardamos tambien el ALIAS
-                                        alias_db = val_alias_hardware if val_alias_hardware != "---" else "SinAlias"
-                                        
-                                        sql = "INSERT INTO mediciones (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias) VALUES (%s, %s, %s, %s, %s, %s)"
-                                        cursor_db.execute(sql, (temp_k, h, pres_pa, ahora, dispositivo, alias_db))
-                                        conexion_db.commit()
-                                    except: pass
-                            except ValueError: continue 
-            except Exception: time.sleep(0.1)
-        else: time.sleep(0.1)
-
 class ProfessionalLogger(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -128,8 +101,12 @@ class ProfessionalLogger(ctk.CTk):
         self.geometry("1400x950")
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
-        self.is_connected = False
         self.annot_dict = {} 
+        self.dispositivo_actual = None  # clave (MAC) del dispositivo que se grafica
+        self.decimador = DecimadorMinMax()
+        # Historial y exportaciones corren fuera del hilo de Tk
+        self.ejecutor = EjecutorConsultas(self)
+        self.tarea_hist = None; self.tarea_exp = None
         self.var_db_status = ctk.StringVar(value="OFF")
         self.var_db_color = ctk.StringVar(value="#C62828")
         self.var_id_display = ctk.StringVar(value="---")
@@ -150,13 +127,13 @@ class ProfessionalLogger(ctk.CTk):
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    @property
+    def is_connected(self): return gestor.hay_conexion()
+
     def background_time_sync(self):
-        if self.is_connected and arduino:
-            try:
-                now_str = datetime.now().strftime("%H:%M:%S")
-                cmd = f"T:{now_str}\n"
-                arduino.write(cmd.encode())
-            except: pass
+        if self.is_connected:
+            now_str = datetime.now().strftime("%H:%M:%S")
+            gestor.enviar_todos(f"T:{now_str}\n")
         self.after(10000, self.background_time_sync) 
 
     def init_sidebar(self):
@@ -171,7 +148,7 @@ class ProfessionalLogger(ctk.CTk):
         ctk.CTkLabel(info_frame, text="ALIAS (HARDWARE):", font=("Arial", 10, "bold"), text_color="gray").pack(pady=(5,0))
         ctk.CTkLabel(info_frame, textvariable=self.var_alias_display, font=("Arial", 16, "bold"), text_color="#FFB74D").pack(pady=(0,10))
         ctk.CTkLabel(self.sidebar, text="CONEXIÓN SERIAL", anchor="w", font=ctk.CTkFont(size=12, weight="bold")).grid(row=2, column=0, padx=20, pady=(20, 0), sticky="ew")
-        self.combo_ports = ctk.CTkComboBox(self.sidebar, values=["Buscando..."])
+        self.combo_ports = ctk.CTkComboBox(self.sidebar, values=["Buscando..."], command=self.actualizar_boton_conexion)
         self.combo_ports.grid(row=3, column=0, padx=20, pady=5)
         btn_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
         btn_row.grid(row=4, column=0, padx=20, pady=5)
@@ -179,6 +156,14 @@ class ProfessionalLogger(ctk.CTk):
         self.btn_refresh.pack(side="left", padx=(0,5))
         self.btn_connect = ctk.CTkButton(btn_row, text="Conectar", width=140, fg_color="#2E7D32", hover_color="#1B5E20", command=self.toggle_connection)
         self.btn_connect.pack(side="left")
+        # Varias placas a la vez: se elige cuál se muestra en el monitor
+        disp_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        disp_row.grid(row=5, column=0, padx=20, pady=(10, 0), sticky="ew")
+        ctk.CTkLabel(disp_row, text="MOSTRAR DISPOSITIVO", anchor="w", font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w")
+        self.combo_disp = ctk.CTkComboBox(disp_row, values=["---"], command=self.seleccionar_dispositivo)
+        self.combo_disp.pack(fill="x", pady=5)
+        self.disp_por_etiqueta = {}
+        self.macs_db = []   # MACs con historial en la DB (se llena al arrancar)
         ctk.CTkLabel(self.sidebar, text="BASE DE DATOS", anchor="w", font=ctk.CTkFont(size=12, weight="bold")).grid(row=6, column=0, padx=20, pady=(30, 0), sticky="ew")
         self.entry_db_name = ctk.CTkEntry(self.sidebar, placeholder_text="DB Name"); self.entry_db_name.insert(0, DB_NAME)
         self.entry_db_name.grid(row=7, column=0, padx=20, pady=5)
@@ -234,6 +219,7 @@ class ProfessionalLogger(ctk.CTk):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
         self.canvas.mpl_connect("motion_notify_event", self.on_hover)
+        self.render = RenderizadorBlit(self.canvas)
         self.redraw_graphs()
 
     def set_time_window(self, value):
@@ -246,13 +232,11 @@ class ProfessionalLogger(ctk.CTk):
         self.unit_mode = (self.unit_mode + 1) % 3
         texts = ["Unidad: °C", "Unidad: °F", "Unidad: SI (K/Pa)"]
         self.btn_unit.configure(text=texts[self.unit_mode])
-        self.redraw_graphs()
+        self.redraw_graphs(); self.tabla_hist.refrescar()
 
     def get_converted_vals(self, cel, pres_hpa):
-        if self.unit_mode == 0: return (cel, "°C", pres_hpa, "hPa")
-        elif self.unit_mode == 1: return ((cel * 9/5) + 32, "°F", pres_hpa, "hPa")
-        elif self.unit_mode == 2: return (cel + 273.15, "K", pres_hpa * 100.0, "Pa") 
-        return (cel, "°C", pres_hpa, "hPa")
+        # Acepta escalares o arreglos completos
+        return conv.desde_celsius(cel, pres_hpa, self.unit_mode)
 
     def setup_history_tab(self):
         self.tab_history.grid_columnconfigure(0, weight=1)
@@ -278,6 +262,12 @@ class ProfessionalLogger(ctk.CTk):
         self.spin_vis_h_e = ctk.CTkComboBox(filter_frame, values=[f"{i:02d}" for i in range(24)], width=55); self.spin_vis_h_e.set("23"); self.spin_vis_h_e.pack(side="left")
         self.spin_vis_m_e = ctk.CTkComboBox(filter_frame, values=[f"{i:02d}" for i in range(60)], width=55); self.spin_vis_m_e.set("59"); self.spin_vis_m_e.pack(side="left")
 
+        self.combo_hist_disp = ctk.CTkComboBox(filter_frame, values=["Todos"], width=160); self.combo_hist_disp.set("Todos")
+        self.combo_hist_disp.pack(side="left", padx=(10, 0))
+        # Auto: resúmenes para rangos largos; Crudo: todas las filas (tabla virtual, por páginas)
+        self.combo_hist_res = ctk.CTkComboBox(filter_frame, values=["Auto", "Crudo"], width=80); self.combo_hist_res.set("Auto")
+        self.combo_hist_res.pack(side="left", padx=(5, 0))
+
         ctk.CTkButton(filter_frame, text="VER", width=50, fg_color="#FBC02D", text_color="black", hover_color="#F9A825", command=self.consultar_db_calendario).pack(side="left", padx=10)
 
         # --- ZONA 2: EXPORTAR (CON CALENDARIO) ---
@@ -304,15 +294,30 @@ class ProfessionalLogger(ctk.CTk):
 
         ctk.CTkButton(export_frame, text="GENERAR (SI)", fg_color="#00897B", hover_color="#00695C", command=self.exportar_rango_calendario).grid(row=0, column=3, padx=20)
 
-        # TABLA
-        self.tree_hist = ttk.Treeview(self.tab_history, columns=("fecha", "temp", "hum", "pres", "dev", "ali"), show="headings")
+        # TABLA (virtual: solo existen los renglones visibles)
+        tabla_frame = ctk.CTkFrame(self.tab_history, fg_color="transparent")
+        tabla_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        tabla_frame.grid_columnconfigure(0, weight=1); tabla_frame.grid_rowconfigure(0, weight=1)
+        self.tree_hist = ttk.Treeview(tabla_frame, columns=("fecha", "temp", "hum", "pres", "dev", "ali"), show="headings", selectmode="none")
         self.tree_hist.heading("fecha", text="Fecha Hora"); self.tree_hist.column("fecha", width=140)
         self.tree_hist.heading("temp", text="Temp"); self.tree_hist.column("temp", width=70)
         self.tree_hist.heading("hum", text="Hum"); self.tree_hist.column("hum", width=60)
         self.tree_hist.heading("pres", text="Presion"); self.tree_hist.column("pres", width=80)
         self.tree_hist.heading("dev", text="MAC"); self.tree_hist.column("dev", width=110) 
         self.tree_hist.heading("ali", text="Alias"); self.tree_hist.column("ali", width=100) 
-        self.tree_hist.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        self.tree_hist.grid(row=0, column=0, sticky="nsew")
+        barra_hist = ttk.Scrollbar(tabla_frame, orient="vertical"); barra_hist.grid(row=0, column=1, sticky="ns")
+        self.resolucion_hist = resumenes.CRUDO
+        self.tabla_hist = TablaVirtual(self.tree_hist, barra_hist, self.ejecutor, pool.consulta, self.formatear_historial)
+        self.tabla_hist.al_error = self.error_tarea
+
+        # ESTADO DE CONSULTAS / EXPORTACIONES EN SEGUNDO PLANO
+        estado_frame = ctk.CTkFrame(self.tab_history, fg_color="transparent")
+        estado_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.barra_hist = ctk.CTkProgressBar(estado_frame, width=250); self.barra_hist.set(0); self.barra_hist.pack(side="left", padx=10)
+        self._barra_animada = False
+        self.lbl_hist_estado = ctk.CTkLabel(estado_frame, text="", font=("Consolas", 11), text_color="gray"); self.lbl_hist_estado.pack(side="left", padx=10)
+        ctk.CTkButton(estado_frame, text="Cancelar", width=80, fg_color="gray30", command=self.cancelar_tareas_historial).pack(side="right", padx=10)
 
     # --- CONSULTA VISUALIZAR CON CALENDARIO ---
     def consultar_db_calendario(self):
@@ -323,27 +328,53 @@ class ProfessionalLogger(ctk.CTk):
         self.ejecutar_consulta_db(f"{d_s} {t_s}", f"{d_e} {t_e}")
 
     def ejecutar_consulta_db(self, start_iso, end_iso):
-        global cursor_db
-        for item in self.tree_hist.get_children(): self.tree_hist.delete(item)
-        try:
-            # Traemos tambien el ALIAS (columna 5)
-            sql = "SELECT fecha_hora, temperatura, humedad, presion, dispositivo_id, alias FROM mediciones WHERE fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora DESC LIMIT 500"
-            cursor_db.execute(sql, (start_iso, end_iso))
-            rows = cursor_db.fetchall()
-            
-            for r in rows:
-                t_show, u_t, p_show, u_p = self.get_converted_vals(0, 0)
-                # Conversión visual
-                if self.unit_mode == 0: t_show = r[1] - 273.15; p_show = r[3] / 100.0
-                elif self.unit_mode == 1: t_show = (r[1] - 273.15) * 9/5 + 32; p_show = r[3] / 100.0
-                elif self.unit_mode == 2: t_show = r[1]; p_show = r[3]
-                
-                alias_val = r[5] if r[5] else "---"
-                self.tree_hist.insert("", "end", values=(r[0], f"{t_show:.2f} {u_t}", r[2], f"{p_show:.1f} {u_p}", r[4], alias_val))
-                
-            if not rows: messagebox.showinfo("Info", "Sin datos en ese periodo.")
-        except Exception as e:
-            self.reconectar_db()
+        # Solo el conteo (o los resúmenes) corre aquí; las filas crudas las pide la tabla virtual al desplazarse
+        if self.tarea_hist and not self.tarea_hist.terminada: self.tarea_hist.cancelar()
+        dispositivo = self.combo_hist_disp.get()
+        dispositivo = None if dispositivo in ("Todos", "") else dispositivo
+        nombre = resumenes.CRUDO
+        if self.combo_hist_res.get() == "Auto":
+            nombre, _ = resumenes.elegir_resolucion(start_iso, end_iso, HIST_FILAS_VISTA, HIST_MAX_CRUDAS, TASA_DISPOSITIVO_HZ)
+        # Misma consulta otra vez (o solo cambió la unidad): sale de la caché, en SI
+        llave = (dispositivo, start_iso, end_iso, nombre)
+        fuente = cache_hist.obtener(llave)
+        if fuente is not None: self.mostrar_historial((nombre, fuente)); return
+        marca = cache_hist.marca()
+        def trabajo(tarea):
+            with pool.consulta() as conn, conn.cursor() as cur:
+                if nombre == resumenes.CRUDO:
+                    fuente = FuenteKeyset(start_iso, end_iso, dispositivo).preparar(cur)
+                    tarea.verificar()
+                    return nombre, fuente
+                # Rangos largos: los periodos de los resúmenes (1m/1h/1d) caben en memoria
+                _, filas = resumenes.consultar(cur, start_iso, end_iso, dispositivo, HIST_FILAS_VISTA, HIST_MAX_CRUDAS, TASA_DISPOSITIVO_HZ)
+                tarea.verificar()
+                return nombre, FuenteLista(filas)
+        self.tabla_hist.limpiar()
+        self.mostrar_progreso(0, None, "Consultando...")
+        def terminado(resultado):
+            cache_hist.guardar(llave, resultado[1], marca); self.mostrar_historial(resultado)
+        self.tarea_hist = self.ejecutor.enviar("historial", trabajo, al_terminar=terminado,
+                                               al_error=self.error_tarea, al_cancelar=lambda: self.mostrar_progreso(0, 0, "Consulta cancelada."))
+
+    def mostrar_historial(self, resultado):
+        self.resolucion_hist, fuente = resultado
+        self.tabla_hist.mostrar(fuente)
+        nombre = "filas crudas" if self.resolucion_hist == resumenes.CRUDO else f"periodos de {self.resolucion_hist}"
+        self.mostrar_progreso(1, 1, f"{fuente.total:,} {nombre}.")
+        if not fuente.total: messagebox.showinfo("Info", "Sin datos en ese periodo.")
+
+    def formatear_historial(self, r):
+        # Solo se llama para los renglones visibles. Crudas: (id, fecha, K, %, Pa, MAC, alias); resumidas: ver resumenes.consultar
+        if self.resolucion_hist == resumenes.CRUDO:
+            ts, u_t, ps, u_p = conv.desde_si(r[2], r[4], self.unit_mode)
+            return (r[1], f"{ts:.2f} {u_t}", f"{r[3]:.1f}", f"{ps:.1f} {u_p}", r[5], r[6] if r[6] else "---")
+        alias_val = r[5] if r[5] else "---"
+        # Promedio del periodo y [mínimo, máximo]
+        ts, u_t, ps, u_p = conv.desde_si(r[1], r[3], self.unit_mode)
+        t0, _, p0, _ = conv.desde_si(r[7], r[11], self.unit_mode)
+        t1, _, p1, _ = conv.desde_si(r[8], r[12], self.unit_mode)
+        return (r[0], f"{ts:.2f} [{t0:.1f}, {t1:.1f}] {u_t}", f"{r[2]:.1f} [{r[9]:.0f}, {r[10]:.0f}]", f"{ps:.1f} [{p0:.0f}, {p1:.0f}] {u_p}", r[4], alias_val)
 
     # --- EXPORTAR CON CALENDARIO ---
     def exportar_rango_calendario(self):
@@ -351,27 +382,40 @@ class ProfessionalLogger(ctk.CTk):
         d_s = self.cal_exp_start.get_date(); t_s = f"{self.spin_exp_h_s.get()}:{self.spin_exp_m_s.get()}:00"
         d_e = self.cal_exp_end.get_date(); t_e = f"{self.spin_exp_h_e.get()}:{self.spin_exp_m_e.get()}:59"
         
-        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv"), ("Texto", "*.txt")], title="Guardar Reporte")
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=exportador.EXTENSIONES, title="Guardar Reporte")
         if not filename: return
 
-        try:
-            sql = "SELECT fecha_hora, temperatura, humedad, presion, dispositivo_id, alias FROM mediciones WHERE fecha_hora BETWEEN %s AND %s ORDER BY fecha_hora ASC"
-            cursor_db.execute(sql, (f"{d_s} {t_s}", f"{d_e} {t_e}"))
-            rows = cursor_db.fetchall()
-            
-            if not rows: messagebox.showinfo("Info", "Sin datos."); return
-
-            is_csv = filename.endswith(".csv")
-            delimiter = ',' if is_csv else '\t'
-            with open(filename, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter=delimiter)
-                writer.writerow(["Fecha", "Temperatura (K)", "Humedad (%)", "Presion (Pa)", "MAC Address", "Alias"])
-                for r in rows:
-                    alias_val = r[5] if r[5] else "---"
-                    # Exportamos SIEMPRE en SI (K y Pa)
-                    writer.writerow([r[0], f"{r[1]:.2f}", r[2], f"{r[3]:.0f}", r[4], alias_val])
-            messagebox.showinfo("Éxito", f"Reporte generado: {len(rows)} registros.")
-        except Exception as err: messagebox.showerror("Error", str(err))
+        def trabajo(tarea):
+            # Exportación en streaming (SSCursor + fetchmany): memoria constante sin importar el rango
+            with pool.consulta() as conn:
+                return exportador.exportar_rango(conn, f"{d_s} {t_s}", f"{d_e} {t_e}", filename, tarea)
+
+        def terminado(n):
+            if n == 0: self.mostrar_progreso(0, 0, "Sin datos."); messagebox.showinfo("Info", "Sin datos."); return
+            self.mostrar_progreso(1, 1, f"Reporte generado: {n} registros.")
+            messagebox.showinfo("Éxito", f"Reporte generado: {n} registros.")
+        self.mostrar_progreso(0, None, "Exportando...")
+        self.tarea_exp = self.ejecutor.enviar("exportar", trabajo, al_terminar=terminado, al_progreso=self.mostrar_progreso,
+                                              al_error=self.error_tarea, al_cancelar=lambda: self.mostrar_progreso(0, 0, "Exportación cancelada."))
+
+    def cancelar_tareas_historial(self):
+        for t in (self.tarea_hist, self.tarea_exp):
+            if t and not t.terminada: t.cancelar()
+
+    def mostrar_progreso(self, hechas, total, texto=""):
+        # total=None: no sabemos cuánto falta (barra indeterminada)
+        if total is None:
+            if not self._barra_animada:
+                self.barra_hist.configure(mode="indeterminate"); self.barra_hist.start(); self._barra_animada = True
+        else:
+            self.barra_hist.stop(); self.barra_hist.configure(mode="determinate"); self._barra_animada = False
+            self.barra_hist.set(hechas / total if total else 0)
+        self.lbl_hist_estado.configure(text=f"{texto} {hechas}/{total}" if total and hechas < total else texto)
+
+    def error_tarea(self, err):
+        self.mostrar_progreso(0, 0, "Error.")
+        if isinstance(err, ErrorPool): messagebox.showwarning("Base de datos", str(err))
+        else: messagebox.showerror("Error", str(err))
 
     def setup_settings_tab(self):
         self.tab_settings.grid_columnconfigure(0, weight=1)
@@ -395,11 +439,13 @@ class ProfessionalLogger(ctk.CTk):
     def update_rate(self, val): self.refresh_rate = int(val); self.lbl_rate.configure(text=f"{int(val)} ms")
     
     def guardar_alias_hardware(self):
-        if not self.is_connected or not arduino: messagebox.showwarning("!", "Conecta el dispositivo."); return
+        # Se manda al dispositivo que está en pantalla
+        estado = self.estado_actual()
+        if not estado or not gestor.abierto(estado.puerto): messagebox.showwarning("!", "Conecta el dispositivo."); return
         new = self.entry_nick.get()
         if new:
             cmd = f"SET_NAME:{new}\n"
-            arduino.write(cmd.encode())
+            gestor.enviar(estado.puerto, cmd)
             messagebox.showinfo("Enviado", "Comando enviado. ESP32 reiniciando...")
             self.entry_nick.delete(0, 'end')
 
@@ -436,10 +482,12 @@ class ProfessionalLogger(ctk.CTk):
             plt.subplots_adjust(right=0.8, top=0.95, bottom=0.15)
         
         for ax in self.fig.axes:
-            ax.xaxis_date(); ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S')); plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+            ax.xaxis_date(); ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S', tz=ZONA_LOCAL)); plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
         for key, ax in self.axes_dict.items():
             annot = ax.annotate("", xy=(0,0), xytext=(10,10), textcoords="offset points", bbox=dict(boxstyle="round", fc="#1a1a1a", ec="white"), color="white")
             annot.set_visible(False); self.annot_dict[ax] = annot 
+        # Líneas y tooltips se pintan por blitting; el resto queda en el fondo
+        self.render.registrar(list(self.lines_dict.values()) + list(self.annot_dict.values()))
         self.canvas.draw()
 
     def setup_axis(self, ax, label, color, grid):
@@ -450,66 +498,75 @@ class ProfessionalLogger(ctk.CTk):
         l, = ax.plot([], [], color=color, linewidth=1.5); return l
 
     def update_ui_loop(self):
+        self.actualizar_lista_dispositivos()
+        estado = self.estado_actual()
+        ch = cache_hist.estadisticas()
+        texto_cache = f"Caché: {ch['aciertos']} aciertos / {ch['fallos']} fallos ({ch['tasa']:.0%}), {ch['bytes'] / 2**20:.1f} MB | Esquema: {migrador.texto}"
         if self.is_connected:
-            self.var_id_display.set(val_id_locked if val_id_locked else "Esperando...")
-            self.var_alias_display.set(val_alias_hardware) 
-            current_id = val_id_locked if val_id_locked else "---"
-            self.lbl_flow.configure(text=f"Live ID: {current_id} | Paquetes: {paquetes_recibidos}")
-        else: self.lbl_flow.configure(text="Desconectado.")
-
-        t_show, u_t, p_show, u_p = self.get_converted_vals(val_temp, val_pres)
+            mac = estado.mac if estado else None
+            self.var_id_display.set(mac if mac else "Esperando...")
+            self.var_alias_display.set(estado.alias if estado else "---") 
+            current_id = mac if mac else "---"
+            st = escritor.estadisticas(); sp = pool.estadisticas()
+            self.lbl_flow.configure(text=f"Live ID: {current_id} | Puertos: {len(gestor.lectores)} | Paquetes: {gestor.paquetes_totales()} (malos: {gestor.errores_protocolo()}) | DB cola: {st['cola']} | Spool: {st['spool']} | Flush: {st['latencia_ms']:.1f} ms (máx {st['latencia_max_ms']:.1f}) | Perdidas: {st['perdidas'] + st['descartadas']} | Pool: {sp['en_uso']}/{sp['abiertas']} en uso, {sp['reconexiones']} reconexiones | {self.render.fps:.1f} FPS, {self.render.ms_por_cuadro:.1f} ms/cuadro | {texto_cache}")
+        else: self.lbl_flow.configure(text=f"Desconectado. | {texto_cache}")
+        self.mostrar_estado_db()
+
+        if estado is None: self.after(self.refresh_rate, self.update_ui_loop); return
+        t_show, u_t, p_show, u_p = self.get_converted_vals(estado.temp, estado.pres)
         self.card_temp.configure(text=f"{t_show:.2f}"); self.card_temp.master.winfo_children()[2].configure(text=u_t)
-        self.card_hum.configure(text=f"{val_hum:.2f}")
+        self.card_hum.configure(text=f"{estado.hum:.2f}")
         self.card_pres.configure(text=f"{p_show:.0f}"); self.card_pres.master.winfo_children()[2].configure(text=u_p)
 
-        if len(session_data["time"]) > 0:
+        s_time, s_temp, s_hum, s_pres = estado.sesion.ventana()
+        if len(s_time) > 0:
             if self.graph_window_minutes > 0:
-                cutoff_time = session_data["time"][-1] - timedelta(minutes=self.graph_window_minutes)
-                indices = [i for i, t in enumerate(session_data["time"]) if t > cutoff_time]
-                start_idx = indices[0] if indices else 0
+                cutoff_time = s_time[-1] - self.graph_window_minutes * 60
+                start_idx = inicio_ventana(s_time, cutoff_time)
             else: start_idx = 0
 
-            times = session_data["time"][start_idx:]
-            plot_temps = []; plot_press = []
-            for i in range(start_idx, len(session_data["time"])):
-                res = self.get_converted_vals(session_data["temp"][i], session_data["pres"][i])
-                ts = res[0]; ps = res[2]
-                plot_temps.append(ts); plot_press.append(ps)
-            hums = session_data["hum"][start_idx:]
-
-            if 't' in self.lines_dict: 
-                self.lines_dict['t'].set_data(times, plot_temps)
-                self.lines_dict['t'].axes.set_ylabel(f"Temp ({u_t})")
-                self.autoscale(self.lines_dict['t'].axes, times, plot_temps)
-            if 'h' in self.lines_dict: 
-                self.lines_dict['h'].set_data(times, hums)
-                self.autoscale(self.lines_dict['h'].axes, times, hums)
-            if 'p' in self.lines_dict: 
-                self.lines_dict['p'].set_data(times, plot_press)
-                self.lines_dict['p'].axes.set_ylabel(f"Pres ({u_p})")
-                self.autoscale(self.lines_dict['p'].axes, times, plot_press)
-            self.canvas.draw_idle()
+            w_time = s_time[start_idx:]
+            limites = (a_num_mpl(w_time[0]), a_num_mpl(w_time[-1]))
+            # Cada serie se reduce a ~2 puntos por pixel antes de dibujarla.
+            # Se decima en °C/hPa y luego se convierte: la conversión no cambia el orden de min/max.
+            series = {}
+            for key, datos in (('t', s_temp), ('h', s_hum), ('p', s_pres)):
+                if key not in self.lines_dict: continue
+                ancho_px = max(int(self.lines_dict[key].axes.bbox.width), 100)
+                tx, ty = self.decimador.reducir((key, self.graph_window_minutes, id(estado)), w_time, datos[start_idx:], ancho_px)
+                series[key] = (a_num_mpl(tx), ty)
+            if 't' in series: series['t'] = (series['t'][0], self.get_converted_vals(series['t'][1], 0)[0])
+            if 'p' in series: series['p'] = (series['p'][0], self.get_converted_vals(0, series['p'][1])[2])
+
+            # Las etiquetas con unidades las pone redraw_graphs (toggle_units lo llama);
+            # aquí solo cambian los datos y, si se salen del margen, los límites
+            redibujar = False
+            for key, (tx, ty) in series.items():
+                self.lines_dict[key].set_data(tx, ty)
+                redibujar |= self.autoscale(self.lines_dict[key].axes, limites, ty)
+            self.render.cuadro(redibujar)
         self.after(self.refresh_rate, self.update_ui_loop)
 
     def autoscale(self, ax, x, y):
-        if not x or not y: return
-        ax.set_xlim(x[0], x[-1]); mi, ma = min(y), max(y); m = (ma - mi) * 0.1 if ma != mi else 1.0
-        ax.set_ylim(mi - m, ma + m)
+        # True si hubo que mover los límites (y por lo tanto redibujar el fondo)
+        return self.render.ajustar_limites(ax, x, y)
 
     def on_hover(self, event):
         for annot in self.annot_dict.values(): annot.set_visible(False)
-        if not self.cfg_show_tooltip.get() or not event.inaxes: self.canvas.draw_idle(); return
+        if not self.cfg_show_tooltip.get() or not event.inaxes: self.render.cuadro(); return
         annot = self.annot_dict.get(event.inaxes)
         if not annot: return
         try:
-            x_date = mdates.num2date(event.xdata).replace(tzinfo=None)
-            times = session_data["time"] 
-            if not times: return
-            idx = min(range(len(times)), key=lambda i: abs((times[i] - x_date).total_seconds()))
-            ts, ut, _, up = self.get_converted_vals(session_data["temp"][idx], session_data["pres"][idx])
-            annot.xy = (mdates.date2num(times[idx]), event.ydata)
-            annot.set_text(f"{times[idx].strftime('%H:%M:%S')}\nT: {ts:.1f}{ut}\nH: {session_data['hum'][idx]}%\nP: {up}")
-            annot.set_visible(True); self.canvas.draw_idle()
+            x_epoch = mdates.num2date(event.xdata).timestamp()
+            estado = self.estado_actual()
+            if estado is None: return
+            times, temps, hums, press = estado.sesion.ventana()
+            if len(times) == 0: return
+            idx = mas_cercano(times, x_epoch)
+            ts, ut, _, up = self.get_converted_vals(temps[idx], press[idx])
+            annot.xy = (a_num_mpl(times[idx]), event.ydata)
+            annot.set_text(f"{datetime.fromtimestamp(times[idx]).strftime('%H:%M:%S')}\nT: {ts:.1f}{ut}\nH: {hums[idx]:.2f}%\nP: {up}")
+            annot.set_visible(True); self.render.cuadro()
         except: pass
 
     def crear_kpi(self, p, t, v, u, c, color):
@@ -521,35 +578,71 @@ class ProfessionalLogger(ctk.CTk):
         puertos = [p.device for p in serial.tools.list_ports.comports()]
         self.combo_ports.configure(values=puertos if puertos else ["Sin Puertos"])
         if puertos: self.combo_ports.set(puertos[0])
+        self.actualizar_boton_conexion()
     def toggle_connection(self):
-        global arduino, val_id_locked
+        # Conecta/desconecta solo el puerto elegido; los demás siguen leyendo
         puerto = self.combo_ports.get()
-        if not self.is_connected:
-            try:
-                arduino = serial.Serial(puerto, BAUD_RATE, timeout=2)
-                time.sleep(2) 
-                now_str = datetime.now().strftime("%H:%M:%S")
-                arduino.write(f"T:{now_str}\n".encode())
-                self.is_connected = True; val_id_locked = None 
-                self.btn_connect.configure(text="Desconectar", fg_color="#C62828"); self.combo_ports.configure(state="disabled")
+        if not gestor.abierto(puerto):
+            try: gestor.abrir(puerto)
             except Exception as e: messagebox.showerror("Error", f"{e}")
-        else:
-            self.is_connected = False; 
-            if arduino: arduino.close()
-            self.btn_connect.configure(text="Conectar", fg_color="#2E7D32"); self.combo_ports.configure(state="normal")
+        else: gestor.cerrar(puerto)
+        self.actualizar_boton_conexion()
+    def actualizar_boton_conexion(self, _=None):
+        if gestor.abierto(self.combo_ports.get()): self.btn_connect.configure(text="Desconectar", fg_color="#C62828")
+        else: self.btn_connect.configure(text="Conectar", fg_color="#2E7D32")
+
+    def estado_actual(self):
+        # Si el dispositivo elegido desapareció (p.ej. se fusionó con su MAC), tomamos otro
+        d = self.dispositivo_actual
+        if d is None or gestor.dispositivos.get(d.clave) is not d:
+            d = next(iter(list(gestor.dispositivos.values())), None)
+            self.dispositivo_actual = d
+        return d
+    def seleccionar_dispositivo(self, etiqueta):
+        d = self.disp_por_etiqueta.get(etiqueta)
+        if d is not None: self.dispositivo_actual = d
+    def actualizar_lista_dispositivos(self):
+        etiquetas = {d.etiqueta(): d for d in list(gestor.dispositivos.values())}
+        if etiquetas.keys() != self.disp_por_etiqueta.keys():
+            self.disp_por_etiqueta = etiquetas
+            self.combo_disp.configure(values=list(etiquetas) if etiquetas else ["---"])
+            self.actualizar_filtro_historial()
+        actual = self.estado_actual()
+        texto = actual.etiqueta() if actual else "---"
+        if self.combo_disp.get() != texto: self.combo_disp.set(texto)
             
+    def actualizar_filtro_historial(self):
+        # MACs guardadas en la DB + las conectadas ahora
+        macs = set(self.macs_db) | {d.mac for d in list(gestor.dispositivos.values()) if d.mac}
+        self.combo_hist_disp.configure(values=["Todos"] + sorted(macs))
+
     def reconectar_db(self):
-        global conexion_db, cursor_db, db_activa
-        try:
-            if conexion_db: conexion_db.close()
-            conexion_db = pymysql.connect(host=DB_HOST, user=DB_USER, password=self.entry_db_pass.get(), database=self.entry_db_name.get())
-            cursor_db = conexion_db.cursor()
-            db_activa = True
-            self.var_db_status.set("ON"); self.var_db_color.set("#00E676"); self.lbl_db_status.configure(text_color="#00E676")
-        except: 
-            db_activa = False; self.var_db_status.set("OFF"); self.var_db_color.set("#C62828"); self.lbl_db_status.configure(text_color="#C62828")
-    def on_closing(self): global ejecutando; ejecutando = False; self.destroy(); sys.exit()
+        # El pool reconecta solo (con backoff); este botón aplica credenciales nuevas y prueba ya
+        pool.configurar(password=self.entry_db_pass.get(), database=self.entry_db_name.get())
+        cache_hist.limpiar()   # puede ser otra base de datos
+        pool.probar()
+        self.mostrar_estado_db()
+    def mostrar_estado_db(self):
+        if self.var_db_status.get() == ("ON" if pool.activa else "OFF"): return
+        if pool.activa: self.var_db_status.set("ON"); self.var_db_color.set("#00E676"); self.lbl_db_status.configure(text_color="#00E676")
+        else: self.var_db_status.set("OFF"); self.var_db_color.set("#C62828"); self.lbl_db_status.configure(text_color="#C62828")
+    def on_closing(self): self.ejecutor.cerrar(); gestor.detener(); escritor.detener(); pool.cerrar(); self.destroy(); sys.exit()
+
+def preparar_db():
+    # Migraciones pendientes (esquema.py) y lista de MACs con historial. Sin DB o si una migración
+    # falla no se detiene el arranque: el spool guarda todo, el escritor vuelve a migrar (al_conectar)
+    # con la siguiente conexión y el estado queda en el pie de la ventana (migrador.texto).
+    try:
+        with pool.consulta() as conn:
+            migrador.migrar(conn)
+            with conn.cursor() as cur: return resumenes.dispositivos(cur)
+    except (ErrorPool, pymysql.Error): return []
 
 if __name__ == "__main__":
-    t = threading.Thread(target=hilo_receptor, daemon=True); t.start()
-    app = ProfessionalLogger(); app.mainloop()
\ No newline at end of file
+    macs_db = preparar_db()
+    escritor.iniciar()
+    app = ProfessionalLogger(); app.macs_db = macs_db; app.actualizar_filtro_historial()
+    if migrador.error:
+        app.after(0, lambda: messagebox.showwarning("Base de datos", f"No se pudo migrar el esquema:\n{migrador.error}\n\n"
+                                                   "Las mediciones se guardan en el spool local y se reintenta al reconectar."))
+    app.mainloop()
\ No newline at end of file
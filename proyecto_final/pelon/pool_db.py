@@ -0,0 +1,157 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+import pymysql
+
+# ============================================================
+# POOL DE CONEXIONES MARIADB
+# ============================================================
+# pymysql no es thread-safe, así que nadie comparte conexión:
+#  - ingesta: una conexión dedicada, la usa solo el hilo escritor.
+#  - consultas: conexiones prestadas en exclusiva con "with pool.consulta()".
+# Las conexiones caídas se reemplazan solas; los intentos fallidos esperan
+# cada vez más (backoff exponencial) para no martillar a un servidor caído.
+
+class ErrorPool(Exception):
+    pass
+
+class PoolDB:
+    def __init__(self, tam_consultas=3, backoff_max=30.0, ping_cada=30.0, **parametros):
+        self.parametros = parametros
+        self.tam_consultas = tam_consultas
+        self.backoff_max = backoff_max
+        self.ping_cada = ping_cada
+        self._lock = threading.Lock()
+        self._libres = queue.LifoQueue()
+        self._creadas = 0
+        self._generacion = 0
+        self._ingesta = None
+        self._backoff = 0.0
+        self._proximo_intento = 0.0
+        self.activa = False
+        # Estadísticas
+        self.conexiones_creadas = 0
+        self.reconexiones = 0
+        self.fallos = 0
+        self.prestamos = 0
+        self.espera_ms = 0.0
+
+    def configurar(self, **parametros):
+        # Nuevos datos de acceso: las conexiones viejas se descartan al volver a usarse
+        with self._lock:
+            self.parametros.update(parametros)
+            self._generacion += 1
+            self._backoff = 0.0; self._proximo_intento = 0.0
+        while True:
+            try: self._cerrar(self._libres.get_nowait())
+            except queue.Empty: break
+            with self._lock: self._creadas -= 1
+
+    def probar(self):
+        # Intento inmediato (sin esperar el backoff), para el botón "Reconectar"
+        with self._lock: self._proximo_intento = 0.0
+        try:
+            with self.consulta(): pass
+        except ErrorPool: pass
+        return self.activa
+
+    def ingesta(self):
+        # Solo desde el hilo escritor. Regresa None si no hay servidor.
+        c = self._ingesta
+        if c is not None and (c._generacion_pool != self._generacion or not self._sana(c)):
+            self._cerrar(c); self._ingesta = c = None; self.reconexiones += 1
+        if c is None: self._ingesta = c = self._conectar()
+        return c
+
+    @contextmanager
+    def consulta(self, timeout=10.0):
+        conn = self._prestar(timeout)
+        try:
+            yield conn
+        finally:
+            # Sin autocommit cada SELECT deja abierta una transacción (REPEATABLE READ): sin el
+            # rollback, el siguiente que la tome seguiría viendo la foto vieja, sin lo insertado después
+            if conn.open:
+                try: conn.rollback()
+                except Exception: self._cerrar(conn)
+            if conn.open and conn._generacion_pool == self._generacion: self._libres.put(conn)
+            else:
+                self._cerrar(conn)
+                with self._lock: self._creadas -= 1
+
+    def estadisticas(self):
+        return {
+            "activa": self.activa,
+            "en_uso": self._creadas - self._libres.qsize(),
+            "abiertas": self._creadas + (1 if self._ingesta is not None else 0),
+            "creadas": self.conexiones_creadas,
+            "reconexiones": self.reconexiones,
+            "fallos": self.fallos,
+            "prestamos": self.prestamos,
+            "espera_prom_ms": self.espera_ms / self.prestamos if self.prestamos else 0.0,
+            "backoff_s": self._backoff,
+        }
+
+    def cerrar(self):
+        self.configurar()
+        if self._ingesta is not None: self._cerrar(self._ingesta); self._ingesta = None
+
+    def _prestar(self, timeout):
+        t0 = time.perf_counter()
+        conn = None
+        try: conn = self._libres.get_nowait()
+        except queue.Empty:
+            crear = False
+            with self._lock:
+                if self._creadas < self.tam_consultas: self._creadas += 1; crear = True
+            if crear:
+                conn = self._conectar()
+                if conn is None:
+                    with self._lock: self._creadas -= 1
+                    raise ErrorPool("Base de datos no disponible")
+            else:
+                try: conn = self._libres.get(timeout=timeout)
+                except queue.Empty: raise ErrorPool("No hay conexiones libres en el pool")
+
+        if conn._generacion_pool != self._generacion or not self._sana(conn):
+            self._cerrar(conn); self.reconexiones += 1
+            conn = self._conectar()
+            if conn is None:
+                with self._lock: self._creadas -= 1
+                raise ErrorPool("Base de datos no disponible")
+        self.prestamos += 1
+        self.espera_ms += (time.perf_counter() - t0) * 1000.0
+        return conn
+
+    def _conectar(self):
+        if time.monotonic() < self._proximo_intento: return None
+        generacion = self._generacion
+        try:
+            conn = pymysql.connect(connect_timeout=3, **self.parametros)
+        except pymysql.Error:
+            with self._lock:
+                self.fallos += 1; self.activa = False
+                self._backoff = min(max(self._backoff * 2, 1.0), self.backoff_max)
+                self._proximo_intento = time.monotonic() + self._backoff
+            return None
+        conn._generacion_pool = generacion
+        conn._ultimo_uso = time.monotonic()
+        with self._lock:
+            self.conexiones_creadas += 1; self.activa = True; self._backoff = 0.0
+        return conn
+
+    def _sana(self, conn):
+        # Ping solo si la conexión llevaba rato sin usarse
+        if not conn.open: return False
+        ahora = time.monotonic()
+        if ahora - conn._ultimo_uso > self.ping_cada:
+            try: conn.ping(reconnect=False)
+            except pymysql.Error: return False
+        conn._ultimo_uso = ahora
+        return True
+
+    def _cerrar(self, conn):
+        try: conn.close()
+        except Exception: pass
@@ -0,0 +1,264 @@
+import re
+import struct
+from binascii import crc_hqx
+
+import numpy as np
+
+# ============================================================
+# PARSER DEL PROTOCOLO SERIAL DE LA ESP32
+# ============================================================
+# El firmware manda, por cada lectura:
+#   ID:<MAC>|<alias>          (o ID_THB:<MAC> en versiones viejas)
+#   <millis>,<°C>,<%HR>,<hPa>
+# Se parsea un bloque de bytes completo de una vez: las líneas de datos se
+# juntan y numpy convierte todos los números en un solo paso (sin
+# decode/strip/split/float por línea). Si algo no cuadra (campos de más o
+# de menos, números inválidos) ese bloque pasa por el camino lento, que
+# valida línea por línea con un regex compilado. Nada se tira en silencio:
+# se cuenta como malformado, truncado o fuera de rango.
+#
+# Modo binario (opcional, se pide con "BIN:1"): cada lectura llega como
+#   0xA5 | largo=16 | uint32 millis | float32 °C | float32 %HR | float32 hPa | CRC16
+# (little-endian, CRC-16/CCITT-FALSE sobre largo + carga útil), 20 bytes en
+# lugar de ~55 de texto. Las líneas ID: siguen en ASCII. 0xA5 nunca aparece
+# en texto ASCII, así que el mismo parser entiende ambos modos sin estado.
+# Las tramas también se decodifican por bloque: candidatos, CRC y campos
+# salen con numpy sobre el buffer, sin un unpack por trama.
+
+_NUM = rb"[-+]?(?:\d+(?:\.\d*)?|\.\d+|nan|inf)"
+RE_DATOS = re.compile(rb"(\d+),(" + _NUM + rb"),(" + _NUM + rb"),(" + _NUM + rb")(?:,.*)?")
+RE_ID = re.compile(rb"ID(?:_THB)?:([^|]*)(?:\|(.*))?")
+
+# Rangos físicos del BME280; fuera de esto es ruido o sensor desconectado (nan)
+RANGO_TEMP = (-40.0, 85.0)
+RANGO_HUM = (0.0, 100.0)
+RANGO_PRES = (300.0, 1100.0)
+
+MAX_LINEA = 256  # un resto más largo sin "\n" es basura (baud equivocado, ruido)
+
+SIN_MUESTRAS = np.empty((0, 4), dtype=np.float64)
+
+SYNC = 0xA5
+TRAMA = struct.Struct("<BBIfffH")   # sync, largo, millis, t, h, p, crc
+LARGO_CARGA = 16
+CRC_INICIO = 0xFFFF
+
+DTYPE_TRAMA = np.dtype([("sync", "u1"), ("largo", "u1"), ("millis", "<u4"), ("t", "<f4"), ("h", "<f4"), ("p", "<f4"), ("crc", "<u2")])
+_BYTES_TRAMA = np.arange(TRAMA.size)
+BLOQUE_VECTORIAL = 2048  # desde aquí conviene decodificar las tramas con numpy
+
+def _tabla_crc():
+    tabla = np.zeros(256, dtype=np.uint16)
+    for b in range(256):
+        c = b << 8
+        for _ in range(8): c = (c << 1) ^ 0x1021 if c & 0x8000 else c << 1
+        tabla[b] = c & 0xFFFF
+    return tabla
+
+TABLA_CRC = _tabla_crc()
+
+def crc16_filas(bloque):
+    # CRC-16/CCITT-FALSE de cada fila de un arreglo (n, k) uint8, todas a la vez
+    crc = np.full(len(bloque), CRC_INICIO, dtype=np.uint16)
+    for j in range(bloque.shape[1]): crc = (crc << 8) ^ TABLA_CRC[(crc >> 8) ^ bloque[:, j]]
+    return crc
+
+def trama(millis, t, h, p):
+    # Lo que manda el firmware (sirve para pruebas y para el banco de pty)
+    cuerpo = struct.pack("<BIfff", LARGO_CARGA, millis, t, h, p)
+    return bytes([SYNC]) + cuerpo + struct.pack("<H", crc_hqx(cuerpo, CRC_INICIO))
+
+class ParserProtocolo:
+    def __init__(self):
+        self.resto = b""
+        self.lineas = 0
+        self.muestras = 0
+        self.malformadas = 0
+        self.truncadas = 0
+        self.fuera_rango = 0
+        self.tramas = 0
+        self.tramas_malas = 0
+        self.resto_bin = b""
+
+    def procesar(self, datos):
+        # Regresa (muestras, identidad):
+        #   muestras: arreglo (n, 4) float64 con columnas millis, °C, %HR, hPa, en orden de llegada
+        #   identidad: (mac, alias) de la última línea ID: del bloque, o None
+        binarias = None
+        if self.resto_bin or b"\xa5" in datos:
+            datos, binarias = self._tramas(self.resto_bin + datos)
+        texto, identidad = self._texto(datos)
+        if binarias is None or not len(texto): m = texto if binarias is None else binarias
+        else:  # justo al cambiar de modo llegan de los dos tipos
+            m = np.concatenate((binarias, texto)); m = m[np.argsort(m[:, 0], kind="stable")]
+        if not len(m): return SIN_MUESTRAS, identidad
+
+        t, h, p = m[:, 1], m[:, 2], m[:, 3]
+        ok = ((t >= RANGO_TEMP[0]) & (t <= RANGO_TEMP[1]) & (h >= RANGO_HUM[0]) & (h <= RANGO_HUM[1])
+              & (p >= RANGO_PRES[0]) & (p <= RANGO_PRES[1]))  # nan siempre da False
+        if not ok.all(): self.fuera_rango += int(len(ok) - ok.sum()); m = m[ok]
+        self.muestras += len(m)
+        return m, identidad
+
+    def _tramas(self, datos):
+        # Separa las tramas binarias válidas del texto que quedó entre ellas (líneas ID:).
+        # Lecturas chicas (tasa normal): unpack por trama; bloques grandes: todo con numpy
+        if len(datos) < BLOQUE_VECTORIAL: return self._tramas_struct(datos)
+        buf = np.frombuffer(datos, dtype=np.uint8); n = len(buf)
+        cand = np.flatnonzero(buf[:max(n - TRAMA.size + 1, 0)] == SYNC)
+        cand = cand[buf[cand + 1] == LARGO_CARGA]
+        crudas = buf[cand[:, None] + _BYTES_TRAMA]
+        calculado = crc16_filas(crudas[:, 1:2 + LARGO_CARGA])
+        ok = calculado == (crudas[:, -2].astype(np.uint16) | crudas[:, -1].astype(np.uint16) << 8)
+        cand, crudas = cand[ok], crudas[ok]
+        if len(cand) > 1 and (np.diff(cand) < TRAMA.size).any():
+            # Un falso candidato dentro de otra trama que además pasó el CRC: nos quedamos con la primera
+            quedan = []; fin = -1
+            for k, c in enumerate(cand.tolist()):
+                if c >= fin: quedan.append(k); fin = c + TRAMA.size
+            cand, crudas = cand[quedan], crudas[quedan]
+
+        es_texto = np.ones(n, dtype=bool)
+        es_texto[(cand[:, None] + _BYTES_TRAMA).ravel()] = False
+        # Una trama que quedó cortada al final espera al siguiente bloque
+        j = datos.find(b"\xa5", max(cand[-1] + TRAMA.size if len(cand) else 0, n - TRAMA.size + 1))
+        if j >= 0: self.resto_bin = datos[j:]; es_texto[j:] = False
+        else: self.resto_bin = b""
+        texto = buf[es_texto].tobytes()
+        sueltos = texto.count(b"\xa5")  # tramas dañadas (CRC o largo) o ruido
+        if sueltos: self.tramas_malas += sueltos; texto = texto.replace(b"\xa5", b"")
+
+        self.tramas += len(cand)
+        f = crudas.view(DTYPE_TRAMA)[:, 0]
+        return texto, np.column_stack((f["millis"], f["t"], f["h"], f["p"])).astype(np.float64)
+
+    def _tramas_struct(self, datos):
+        vista = memoryview(datos); n = len(datos)
+        filas = []; texto = []; pos = 0
+        while True:
+            i = datos.find(b"\xa5", pos)
+            if i < 0: texto.append(vista[pos:]); self.resto_bin = b""; break
+            texto.append(vista[pos:i])
+            if n - i < TRAMA.size: self.resto_bin = datos[i:]; break  # cortada: esperamos al siguiente bloque
+            _, largo, millis, t, h, p, crc = TRAMA.unpack_from(vista, i)
+            if largo == LARGO_CARGA and crc_hqx(vista[i + 1:i + 2 + LARGO_CARGA], CRC_INICIO) == crc:
+                filas.append((millis, t, h, p)); pos = i + TRAMA.size
+            else:
+                self.tramas_malas += 1; pos = i + 1  # 0xA5 suelto o bytes dañados: resincronizamos
+        self.tramas += len(filas)
+        return b"".join(texto), np.array(filas, dtype=np.float64).reshape(-1, 4)
+
+    def _texto(self, datos):
+        datos = self.resto + datos
+        corte = datos.rfind(b"\n") + 1
+        self.resto = datos[corte:]
+        if len(self.resto) > MAX_LINEA: self.resto = b""; self.truncadas += 1
+        if not corte: return SIN_MUESTRAS, None
+
+        lineas = datos[:corte].replace(b"\r", b"").split(b"\n"); lineas.pop()
+        self.lineas += len(lineas)
+        de_datos = [l for l in lineas if l[:1].isdigit()]
+        ids = [l for l in lineas if l[:2] == b"ID"]
+        identidad = self._identidad(ids[-1]) if ids else None
+
+        m = None
+        # Exactamente 4 campos en cada línea: con solo contar el total, una línea de 3 y otra de 5
+        # sumarían 8 y los números quedarían corridos de una fila a la otra
+        if len(de_datos) + len(ids) == len(lineas) and all(l.count(b",") == 3 for l in de_datos):
+            try: m = np.array(b",".join(de_datos).split(b","), dtype=np.float64).reshape(-1, 4)
+            except ValueError: pass
+        if m is None: m = self._lento(lineas)
+        return m, identidad
+
+    def _identidad(self, linea):
+        m = RE_ID.fullmatch(linea.strip())
+        if m is None: return None
+        alias = m.group(2).strip().decode("utf-8", "replace") if m.group(2) else None
+        return m.group(1).strip().decode("utf-8", "replace"), alias
+
+    def _lento(self, lineas):
+        # Valida y clasifica línea por línea; solo para bloques con algo raro
+        filas = []
+        for linea in lineas:
+            linea = linea.strip()
+            if not linea or linea.startswith(b"ID"): continue
+            m = RE_DATOS.fullmatch(linea)
+            if m: filas.append([float(x) for x in m.groups()])
+            # Datos cortados a la mitad (reinicio de la placa, bytes perdidos) vs basura
+            elif linea[:1].isdigit() and b"," in linea: self.truncadas += 1
+            else: self.malformadas += 1
+        return np.array(filas, dtype=np.float64).reshape(-1, 4)
+
+    def errores(self):
+        return self.malformadas + self.truncadas + self.fuera_rango + self.tramas_malas
+
+# ============================================================
+# BENCHMARK: líneas/s con el parser viejo (por línea) vs el nuevo (por bloque)
+# ============================================================
+if __name__ == "__main__":
+    import glob
+    import time
+
+    def lineas_capturadas(binario=False):
+        # Convierte las capturas exportadas (K, Pa) de vuelta al protocolo del firmware
+        salida = []; millis = 0; k = 0
+        for archivo in sorted(glob.glob("prueba*.txt")):
+            with open(archivo, encoding="utf-8") as f:
+                next(f, None)
+                for linea in f:
+                    c = linea.rstrip("\n").split("\t")
+                    try: t, h, p = float(c[1]) - 273.15, float(c[2]), float(c[3]) / 100.0
+                    except (ValueError, IndexError): continue
+                    millis += 500; k += 1
+                    ident = f"ID:{c[4] if len(c) > 4 else '24:D7:EB:59:2E:30'}|SinAlias\r\n".encode()
+                    if binario: salida.append((ident if k % 10 == 1 else b"") + trama(millis, t, h, p))
+                    else: salida.append(ident + f"{millis},{t:.2f},{h:.2f},{p:.2f}\r\n".encode())
+        return b"".join(salida)
+
+    def parser_viejo(datos):
+        # Lo que hacía LectorPuerto: decode, strip, startswith, split y float por línea
+        muestras = []
+        for cruda in datos.split(b"\n"):
+            linea = cruda.decode('utf-8', errors='ignore').strip()
+            if linea.startswith("ID:") or linea.startswith("ID_THB:"): continue
+            if "," in linea:
+                partes = linea.split(",")
+                if len(partes) >= 4:
+                    try: muestras.append((float(partes[1]), float(partes[2]), float(partes[3])))
+                    except ValueError: pass
+        return muestras
+
+    base = lineas_capturadas()
+    if not base: raise SystemExit("No hay prueba*.txt en este directorio")
+    repetir = max(1, 400_000 // base.count(b"\n"))
+    datos = base * repetir
+    n_lineas = datos.count(b"\n")
+    print(f"{n_lineas} líneas ({len(datos) / 1e6:.1f} MB)")
+    for bloque in (4096, 65536):  # una lectura típica del puerto / LEER_BLOQUE a tope
+        t0 = time.perf_counter()
+        for i in range(0, len(datos), bloque): parser_viejo(datos[i:i + bloque])
+        viejo = time.perf_counter() - t0
+
+        p = ParserProtocolo()
+        t0 = time.perf_counter()
+        for i in range(0, len(datos), bloque): p.procesar(datos[i:i + bloque])
+        nuevo = time.perf_counter() - t0
+
+        print(f"  bloques de {bloque:5d} B | viejo {n_lineas / viejo:10,.0f} líneas/s | nuevo {n_lineas / nuevo:10,.0f} líneas/s (x{viejo / nuevo:.1f})")
+    print(f"  muestras {p.muestras} | malformadas {p.malformadas} | truncadas {p.truncadas} | fuera de rango {p.fuera_rango}")
+
+    # Mismas lecturas en tramas binarias: bytes por muestra (límite a 115200 baud) y muestras/s
+    binario = lineas_capturadas(binario=True) * repetir
+    n_muestras = p.muestras
+    p = ParserProtocolo()
+    t0 = time.perf_counter()
+    for i in range(0, len(binario), 65536): p.procesar(binario[i:i + 65536])
+    seg = time.perf_counter() - t0
+    for nombre, flujo, n_seg in (("texto", datos, nuevo), ("binario", binario, seg)):
+        por_muestra = len(flujo) / n_muestras
+        print(f"  {nombre:8s}: {por_muestra:5.1f} B/muestra -> máx {11520 / por_muestra:5.0f} muestras/s a 115200 baud | parser {n_muestras / n_seg:10,.0f} muestras/s")
+    print(f"  tramas {p.tramas} | tramas malas {p.tramas_malas}")
+
+    p = ParserProtocolo()
+    prueba = b"ID:AA:BB|x\n1,22.5,50,800\n2,22.5\nhola\n3,nan,50,800\n4,22.5,50,8000\n\n5,-1.5,99.9,1013.25,extra\n6,1"
+    print("  casos:", p.procesar(prueba), "resto", p.resto, "| malformadas", p.malformadas, "truncadas", p.truncadas, "fuera de rango", p.fuera_rango)
@@ -0,0 +1,70 @@
+import time
+
+# ============================================================
+# RENDERIZADOR INCREMENTAL (BLITTING)
+# ============================================================
+# Los ejes, ticks y etiquetas se dibujan una vez y se guardan como fondo;
+# en cada cuadro solo se restauran y se pintan las líneas y los tooltips.
+# Los límites tienen margen extra: mientras los datos quepan en ellos no
+# se redibuja la figura completa.
+
+class RenderizadorBlit:
+    def __init__(self, canvas, margen=0.1):
+        self.canvas = canvas
+        self.margen = margen
+        self.fondo = None
+        self.artistas = []
+        self.ms_por_cuadro = 0.0
+        self.fps = 0.0
+        self.redibujos = 0
+        self._ultimo_cuadro = None
+        canvas.mpl_connect("draw_event", self._al_dibujar)
+
+    def registrar(self, artistas):
+        # Llamar después de reconstruir la figura (redraw_graphs)
+        self.artistas = list(artistas)
+        for a in self.artistas: a.set_animated(True)
+        self.fondo = None
+
+    def ajustar_limites(self, ax, x, y):
+        # Regresa True si los límites cambiaron y hace falta redibujar el fondo
+        if len(x) == 0 or len(y) == 0: return False
+        cambio = False
+        x0, x1 = float(x[0]), float(x[-1])
+        if x1 - x0 < 1 / 86400: x0 -= 1 / 86400  # al menos 1 s visible
+        a, b = ax.get_xlim(); span = x1 - x0
+        if x1 > b or x0 < a or (b - a) > span * (1 + 2 * self.margen):
+            ax.set_xlim(x0, x1 + span * self.margen); cambio = True
+
+        mi, ma = float(y.min()), float(y.max())
+        pad = (ma - mi) * 2 * self.margen if ma != mi else 1.0
+        c, d = ax.get_ylim()
+        if mi < c or ma > d or (ma - mi + 2 * pad) < (d - c) * 0.5:
+            ax.set_ylim(mi - pad, ma + pad); cambio = True
+        return cambio
+
+    def cuadro(self, redibujar=False):
+        t0 = time.perf_counter()
+        if redibujar or self.fondo is None:
+            self.redibujos += 1
+            self.canvas.draw()  # dispara draw_event -> se captura el fondo nuevo
+        else:
+            self.canvas.restore_region(self.fondo)
+            self._pintar_artistas()
+            self.canvas.blit(self.canvas.figure.bbox)
+        fin = time.perf_counter()
+        self.ms_por_cuadro = (fin - t0) * 1000.0
+        if self._ultimo_cuadro is not None:
+            # Promedio exponencial para que la lectura no brinque
+            inst = 1.0 / max(fin - self._ultimo_cuadro, 1e-6)
+            self.fps = inst if self.fps == 0 else self.fps * 0.8 + inst * 0.2
+        self._ultimo_cuadro = fin
+
+    def _al_dibujar(self, event):
+        self.fondo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._pintar_artistas()
+
+    def _pintar_artistas(self):
+        fig = self.canvas.figure
+        for a in self.artistas:
+            if a.figure is fig and a.get_visible(): fig.draw_artist(a)
@@ -0,0 +1,162 @@
+from datetime import datetime
+
+import numpy as np
+
+# ============================================================
+# RESÚMENES (ROLLUPS) 1 MIN / 1 H / 1 DÍA POR DISPOSITIVO
+# ============================================================
+# Junto a "mediciones" se mantienen tablas con conteo, suma, mínimo y
+# máximo de cada variable por dispositivo y periodo. Se actualizan en la
+# misma transacción que el INSERT de las filas crudas (el escritor llama a
+# actualizar), con INSERT ... ON DUPLICATE KEY UPDATE: sumas y conteos se
+# acumulan, así el promedio sale exacto aunque un minuto llegue en partes.
+#
+# El historial elige la resolución más gruesa que todavía llena la vista:
+# un año a 1 Hz son 31M filas crudas, pero solo 8760 horas.
+# Todo en SI, como mediciones (K, %, Pa).
+
+# nombre, tabla, unidad de numpy para truncar, segundos por periodo (gruesa -> fina)
+RESOLUCIONES = [
+    ("1d", "mediciones_1d", "D", 86400),
+    ("1h", "mediciones_1h", "h", 3600),
+    ("1m", "mediciones_1m", "m", 60),
+]
+CRUDO = "crudo"
+
+SQL_TABLA = """CREATE TABLE IF NOT EXISTS {tabla} (
+    dispositivo_id VARCHAR(32) NOT NULL,
+    periodo DATETIME NOT NULL,
+    alias VARCHAR(64),
+    n INT UNSIGNED NOT NULL,
+    t_suma DOUBLE NOT NULL, t_min FLOAT NOT NULL, t_max FLOAT NOT NULL,
+    h_suma DOUBLE NOT NULL, h_min FLOAT NOT NULL, h_max FLOAT NOT NULL,
+    p_suma DOUBLE NOT NULL, p_min FLOAT NOT NULL, p_max FLOAT NOT NULL,
+    PRIMARY KEY (dispositivo_id, periodo),
+    KEY idx_periodo (periodo)
+)"""
+
+_COLUMNAS = "dispositivo_id, periodo, alias, n, t_suma, t_min, t_max, h_suma, h_min, h_max, p_suma, p_min, p_max"
+
+def _acumular(tabla):
+    # Columnas de la tabla destino calificadas: en INSERT ... SELECT "alias" existe en las dos tablas
+    return (f"{tabla}.alias = VALUES(alias), {tabla}.n = {tabla}.n + VALUES(n), "
+            + ", ".join(f"{tabla}.{v}_suma = {tabla}.{v}_suma + VALUES({v}_suma), {tabla}.{v}_min = LEAST({tabla}.{v}_min, VALUES({v}_min)), "
+                        f"{tabla}.{v}_max = GREATEST({tabla}.{v}_max, VALUES({v}_max))" for v in "thp"))
+
+def sql_upsert(tabla):
+    return f"INSERT INTO {tabla} ({_COLUMNAS}) VALUES ({', '.join(['%s'] * 13)}) ON DUPLICATE KEY UPDATE {_acumular(tabla)}"
+
+# Reconstrucción desde las filas crudas (tablas nuevas o datos viejos)
+SQL_RECONSTRUIR = ("INSERT INTO {tabla} (" + _COLUMNAS + ") "
+                   "SELECT dispositivo_id, {truncar} AS periodo, MAX(alias), COUNT(*), "
+                   "SUM(temperatura), MIN(temperatura), MAX(temperatura), SUM(humedad), MIN(humedad), MAX(humedad), "
+                   "SUM(presion), MIN(presion), MAX(presion) FROM mediciones WHERE fecha_hora BETWEEN %s AND %s "
+                   "GROUP BY dispositivo_id, periodo ON DUPLICATE KEY UPDATE {acumular}")
+_TRUNCAR_SQL = {
+    "1d": "DATE(fecha_hora)",
+    "1h": "DATE_FORMAT(fecha_hora, '%%Y-%%m-%%d %%H:00:00')",
+    "1m": "DATE_FORMAT(fecha_hora, '%%Y-%%m-%%d %%H:%%i:00')",
+}
+
+def crear_tablas(cur):
+    for _, tabla, _, _ in RESOLUCIONES: cur.execute(SQL_TABLA.format(tabla=tabla))
+
+def reconstruir(cur, inicio, fin):
+    # Ojo: acumula. Para rehacer un rango ya resumido, borrarlo antes de esas tablas.
+    for nombre, tabla, _, _ in RESOLUCIONES:
+        cur.execute(SQL_RECONSTRUIR.format(tabla=tabla, truncar=_TRUNCAR_SQL[nombre], acumular=_acumular(tabla)), (inicio, fin))
+
+def agregar(lote):
+    # lote: filas de SQL_INSERT (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias).
+    # Regresa {tabla: [filas para sql_upsert(tabla)]} con un renglón por (dispositivo, periodo).
+    if not lote: return {}
+    valores = np.array([(f[0], f[1], f[2]) for f in lote], dtype=np.float64)
+    fechas = np.array([f[3] for f in lote], dtype="datetime64[us]")
+    dispositivos = [f[4] for f in lote]
+    salida = {tabla: [] for _, tabla, _, _ in RESOLUCIONES}
+    for disp in set(dispositivos):
+        sel = np.array([d == disp for d in dispositivos]) if len(set(dispositivos)) > 1 else slice(None)
+        v = valores[sel]; f = fechas[sel]
+        alias = next(fila[5] for fila in reversed(lote) if fila[4] == disp)
+        for _, tabla, unidad, _ in RESOLUCIONES:
+            periodos = f.astype(f"datetime64[{unidad}]")
+            orden = np.argsort(periodos, kind="stable")
+            p_ord = periodos[orden]; v_ord = v[orden]
+            inicios = np.flatnonzero(np.concatenate(([True], p_ord[1:] != p_ord[:-1])))
+            n = np.diff(np.append(inicios, len(p_ord)))
+            suma = np.add.reduceat(v_ord, inicios); mn = np.minimum.reduceat(v_ord, inicios); mx = np.maximum.reduceat(v_ord, inicios)
+            for k, periodo in enumerate(p_ord[inicios].astype("datetime64[s]").tolist()):
+                salida[tabla].append((disp, periodo, alias, int(n[k]),
+                                      float(suma[k, 0]), float(mn[k, 0]), float(mx[k, 0]),
+                                      float(suma[k, 1]), float(mn[k, 1]), float(mx[k, 1]),
+                                      float(suma[k, 2]), float(mn[k, 2]), float(mx[k, 2])))
+    return salida
+
+def actualizar(cur, lote):
+    # Se llama con el mismo cursor (y transacción) que insertó el lote crudo
+    for tabla, filas in agregar(lote).items():
+        if filas: cur.executemany(sql_upsert(tabla), filas)
+
+def inicio_periodo(fecha, nombre):
+    # Inicio del periodo de esa resolución que contiene a fecha (el mismo truncado que agregar)
+    if isinstance(fecha, str): fecha = datetime.fromisoformat(fecha)
+    unidad = next(u for n, _, u, _ in RESOLUCIONES if n == nombre)
+    return np.datetime64(fecha, "us").astype(f"datetime64[{unidad}]").astype("datetime64[s]").tolist()
+
+def elegir_resolucion(inicio, fin, filas_vista, max_crudas, tasa_hz):
+    # La más gruesa que todavía da filas_vista periodos. Si ninguna alcanza: las filas
+    # crudas si caben en la vista (estimadas con la tasa de muestreo), si no la más fina.
+    if isinstance(inicio, str): inicio = datetime.fromisoformat(inicio)
+    if isinstance(fin, str): fin = datetime.fromisoformat(fin)
+    duracion = (fin - inicio).total_seconds()
+    for nombre, tabla, _, segundos in RESOLUCIONES:
+        if duracion / segundos >= filas_vista: return nombre, tabla
+    if duracion * tasa_hz <= max_crudas: return CRUDO, "mediciones"
+    return RESOLUCIONES[-1][0], RESOLUCIONES[-1][1]
+
+def consultar(cur, inicio, fin, dispositivo=None, filas_vista=500, max_crudas=5000, tasa_hz=2.0):
+    # Regresa (resolución, filas). Filas crudas: (fecha, K, %, Pa, MAC, alias).
+    # Resumidas: (periodo, K prom, % prom, Pa prom, MAC, alias, n, K min, K max, % min, % max, Pa min, Pa max).
+    nombre, tabla = elegir_resolucion(inicio, fin, filas_vista, max_crudas, tasa_hz)
+    filtro = " AND dispositivo_id = %s" if dispositivo else ""
+    # Un rango que empieza a media hora (o a medio día) también muestra ese primer periodo, ya completo
+    desde = inicio if nombre == CRUDO else inicio_periodo(inicio, nombre)
+    params = (desde, fin, dispositivo) if dispositivo else (desde, fin)
+    if nombre == CRUDO:
+        cur.execute("SELECT fecha_hora, temperatura, humedad, presion, dispositivo_id, alias FROM mediciones "
+                    f"WHERE fecha_hora BETWEEN %s AND %s{filtro} ORDER BY fecha_hora DESC LIMIT {int(max_crudas)}", params)
+    else:
+        cur.execute("SELECT periodo, t_suma / n, h_suma / n, p_suma / n, dispositivo_id, alias, n, t_min, t_max, h_min, h_max, p_min, p_max "
+                    f"FROM {tabla} WHERE periodo BETWEEN %s AND %s{filtro} ORDER BY periodo DESC, dispositivo_id", params)
+    return nombre, cur.fetchall()
+
+def dispositivos(cur):
+    cur.execute(f"SELECT DISTINCT dispositivo_id FROM {RESOLUCIONES[0][1]} ORDER BY dispositivo_id")
+    return [r[0] for r in cur.fetchall()]
+
+# ============================================================
+# BENCHMARK: costo de mantener los resúmenes y tamaño de las consultas
+# ============================================================
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+
+    base = datetime(2025, 12, 1)
+    lote = [(294.0 + (k % 100) / 100, 58.0, 81600.0 + k % 7, base + timedelta(seconds=k * 0.5), f"24:D7:EB:59:2E:3{k % 3}", "SinAlias")
+            for k in range(5000)]
+    t0 = time.perf_counter(); vueltas = 50
+    for _ in range(vueltas): r = agregar(lote)
+    seg = (time.perf_counter() - t0) / vueltas
+    print(f"agregar: {len(lote) / seg:,.0f} filas/s -> " + ", ".join(f"{t}: {len(f)} upserts" for t, f in r.items()) + " por lote de 5000")
+
+    # Comprobación contra un cálculo directo
+    t1m = r["mediciones_1m"]; fila = next(f for f in t1m if f[0].endswith("30"))
+    mismas = [x for x in lote if x[4] == fila[0] and x[3].replace(second=0, microsecond=0) == fila[1]]
+    assert fila[3] == len(mismas) and abs(fila[4] - sum(x[0] for x in mismas)) < 1e-6 and fila[5] == min(x[0] for x in mismas)
+
+    print("filas por consulta (1 dispositivo a 1 Hz):")
+    for rango in (timedelta(minutes=10), timedelta(hours=6), timedelta(days=1), timedelta(days=30), timedelta(days=365)):
+        nombre, _ = elegir_resolucion(base, base + rango, 500, 5000, 1.0)
+        crudas = int(rango.total_seconds())
+        filas = crudas if nombre == CRUDO else crudas // dict((r[0], r[3]) for r in RESOLUCIONES)[nombre]
+        print(f"  {str(rango):>18} -> {nombre:5s}: {filas:8,d} filas (crudas: {crudas:11,d})")
@@ -0,0 +1,75 @@
+import numpy as np
+
+from indice_tiempo import inicio_ventana
+
+# ============================================================
+# BUFFER DE SESIÓN (ANILLO COLUMNAR)
+# ============================================================
+# Sustituye a las listas de session_data. Capacidad fija: tiempos como
+# epoch float64 y canales en float32. Cada muestra se escribe dos veces
+# (en i y en i + capacidad) para que las últimas N muestras siempre
+# formen un bloque contiguo y se puedan entregar como vistas sin copiar.
+# Los tiempos se mantienen no decrecientes para poder usar búsqueda binaria.
+
+class BufferSesion:
+    def __init__(self, retencion_s, tasa_max_hz, holgura=1024):
+        # holgura: lugares extra que el receptor puede sobrescribir mientras
+        # la GUI todavía usa una vista, sin pisar las muestras visibles
+        self.retencion_s = retencion_s
+        self.holgura = holgura
+        self.capacidad = int(retencion_s * tasa_max_hz) + holgura
+        self._t = np.zeros(2 * self.capacidad, dtype=np.float64)
+        self._temp = np.zeros(2 * self.capacidad, dtype=np.float32)
+        self._hum = np.zeros(2 * self.capacidad, dtype=np.float32)
+        self._pres = np.zeros(2 * self.capacidad, dtype=np.float32)
+        self.total = 0  # muestras recibidas desde el inicio (no solo las retenidas)
+
+    def __len__(self):
+        return min(self.total, self.capacidad - self.holgura)
+
+    def append(self, t, temp, hum, pres):
+        i = self.total % self.capacidad; j = i + self.capacidad
+        if self.total:
+            previo = self._t[(self.total - 1) % self.capacidad]
+            if t < previo: t = previo  # el reloj del host retrocedió (NTP)
+        self._t[i] = self._t[j] = t
+        self._temp[i] = self._temp[j] = temp
+        self._hum[i] = self._hum[j] = hum
+        self._pres[i] = self._pres[j] = pres
+        # Se incrementa al final: la GUI solo ve muestras ya escritas completas
+        self.total += 1
+
+    def extender(self, t, temp, hum, pres):
+        # Lote completo de una vez (arreglos del mismo largo)
+        n = len(t)
+        if n == 0: return
+        # La última escrita se lee antes de saltar total (al saltar, ese índice ya apunta a otra)
+        previo = self._t[(self.total - 1) % self.capacidad] if self.total else None
+        if n > self.capacidad:  # solo caben las últimas
+            t, temp, hum, pres = t[-self.capacidad:], temp[-self.capacidad:], hum[-self.capacidad:], pres[-self.capacidad:]
+            self.total += n - self.capacidad; n = self.capacidad
+        t = np.asarray(t, dtype=np.float64)
+        if previo is not None: t = np.maximum(t, previo)
+        t = np.maximum.accumulate(t)
+        i = (self.total + np.arange(n)) % self.capacidad; j = i + self.capacidad
+        for arr, v in ((self._t, t), (self._temp, temp), (self._hum, hum), (self._pres, pres)):
+            arr[i] = v; arr[j] = v
+        self.total += n
+
+    def ventana(self):
+        # Vistas (t, temp, hum, pres) de las muestras retenidas, de la más vieja a la más nueva
+        total = self.total; n = min(total, self.capacidad - self.holgura)
+        if n == 0:
+            return self._t[:0], self._temp[:0], self._hum[:0], self._pres[:0]
+        fin = (total - 1) % self.capacidad + self.capacidad + 1
+        ini = fin - n
+        t = self._t[ini:fin]
+        # Además del límite por capacidad, recortamos por tiempo de retención
+        if t[-1] - t[0] > self.retencion_s:
+            ini += inicio_ventana(t, t[-1] - self.retencion_s)
+        return self._t[ini:fin], self._temp[ini:fin], self._hum[ini:fin], self._pres[ini:fin]
+
+    def ultimo(self):
+        if self.total == 0: return None
+        i = (self.total - 1) % self.capacidad
+        return self._t[i], self._temp[i], self._hum[i], self._pres[i]
@@ -0,0 +1,58 @@
+import sqlite3
+
+# ============================================================
+# SPOOL LOCAL (WRITE-AHEAD) PARA LAS MEDICIONES
+# ============================================================
+# Toda muestra pasa primero por aquí: una tabla SQLite en modo WAL, de
+# solo agregar al final. El escritor la va vaciando hacia "mediciones" en
+# MariaDB y borra lo que ya quedó confirmado; si la DB está caída las filas
+# se acumulan en disco y sobreviven a cerrar el programa.
+#
+# El disco está acotado: pasando de max_filas se tiran las más viejas (y
+# se cuentan). Lo usa un solo hilo (el escritor); los contadores se pueden
+# leer desde la GUI.
+
+class SpoolLocal:
+    def __init__(self, ruta, max_filas=2_000_000):
+        self.ruta = ruta
+        self.max_filas = max_filas
+        self.descartadas = 0
+        self.db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")       # sobrevive a que se cierre el programa
+        self.db.execute("PRAGMA journal_size_limit=16777216")
+        self.db.execute("CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY, temperatura REAL, humedad REAL, presion REAL, "
+                        "fecha_hora TEXT, dispositivo_id TEXT, alias TEXT)")
+        self.pendientes = self.db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def agregar(self, filas):
+        # filas: (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias) como en SQL_INSERT
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT INTO spool (temperatura, humedad, presion, fecha_hora, dispositivo_id, alias) VALUES (?, ?, ?, ?, ?, ?)",
+                                ((t, h, p, f.isoformat(sep=" ") if hasattr(f, "isoformat") else f, d, a) for t, h, p, f, d, a in filas))
+            sobran = self.pendientes + len(filas) - self.max_filas
+            if sobran > 0:
+                self.db.execute("DELETE FROM spool WHERE id IN (SELECT id FROM spool ORDER BY id LIMIT ?)", (sobran,))
+                self.descartadas += sobran
+        self.pendientes = min(self.pendientes + len(filas), self.max_filas)
+
+    def leer(self, n):
+        # Las n filas más viejas: (sus ids, filas). MariaDB acepta la fecha como texto ISO.
+        filas = self.db.execute("SELECT id, temperatura, humedad, presion, fecha_hora, dispositivo_id, alias FROM spool ORDER BY id LIMIT ?", (n,)).fetchall()
+        return [f[0] for f in filas], [f[1:] for f in filas]
+
+    def confirmar(self, hasta_id, n):
+        # Ya están en MariaDB: se borran del spool
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM spool WHERE id <= ?", (hasta_id,))
+        self.pendientes = max(self.pendientes - n, 0)
+
+    def bytes_en_disco(self):
+        pagina, paginas = self.db.execute("PRAGMA page_size").fetchone()[0], self.db.execute("PRAGMA page_count").fetchone()[0]
+        return pagina * paginas
+
+    def cerrar(self):
+        try: self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)"); self.db.close()
+        except sqlite3.Error: pass
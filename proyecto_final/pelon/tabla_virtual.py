@@ -0,0 +1,257 @@
+import bisect
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from tkinter import ttk
+
+import resumenes
+from cache_consultas import bytes_filas
+
+# ============================================================
+# TABLA VIRTUAL DEL HISTORIAL (PAGINACIÓN POR LLAVE)
+# ============================================================
+# El Treeview solo tiene los renglones que caben en pantalla; al moverse
+# se les cambian los valores (nunca se borran e insertan miles de items).
+# Las filas vienen por páginas desde una "fuente":
+#   - FuenteKeyset: filas crudas de mediciones, de la más nueva a la más
+#     vieja. La página siguiente se pide a partir de la llave (fecha_hora, id)
+#     de la última fila de la anterior: siempre es un rango del índice, sin
+#     OFFSET que recorra todo lo de antes.
+#     Para saltar con la barra a la mitad de millones de filas se usan
+#     "anclas": el conteo por hora de mediciones_1h dice en qué hora cae la
+#     fila k, y solo se salta (OFFSET) dentro de esa hora.
+#   - FuenteLista: filas que ya están en memoria (resúmenes 1m/1h/1d).
+# Las páginas se leen en el ejecutor (fuera del hilo de Tk) y se guardan en
+# la fuente (LRU de max_paginas), así una fuente que vuelve de la caché de
+# consultas trae lo que ya se había leído; las vecinas de lo visible se
+# piden por adelantado.
+
+TAM_PAGINA = 200
+
+class FuenteLista:
+    local = True
+
+    def __init__(self, filas, tam_pagina=TAM_PAGINA):
+        self.filas = filas
+        self.tam_pagina = tam_pagina
+        self.total = len(filas)
+
+    def leer(self, cur, k, previa=None, siguiente=None):
+        return self.filas[k * self.tam_pagina:(k + 1) * self.tam_pagina]
+
+    def bytes(self): return bytes_filas(self.filas)
+
+class FuenteKeyset:
+    local = False
+    COLUMNAS = "id, fecha_hora, temperatura, humedad, presion, dispositivo_id, alias"
+
+    def __init__(self, inicio, fin, dispositivo=None, tam_pagina=TAM_PAGINA):
+        self.inicio = datetime.fromisoformat(inicio) if isinstance(inicio, str) else inicio
+        self.fin = datetime.fromisoformat(fin) if isinstance(fin, str) else fin
+        self.dispositivo = dispositivo
+        self.tam_pagina = tam_pagina
+        self.anclas = []    # (límite superior exclusivo o None, filas antes de esta ancla), de la más nueva a la más vieja
+        self.total = 0
+        self.paginas = OrderedDict()   # k -> filas (LRU, lo llena TablaVirtual)
+
+    def bytes(self): return sum(bytes_filas(p) for p in self.paginas.values()) + 64 * len(self.anclas)
+
+    @staticmethod
+    def clave(fila): return fila[1], fila[0]   # (fecha_hora, id)
+
+    def _where(self):
+        filtro = " AND dispositivo_id = %s" if self.dispositivo else ""
+        return f"WHERE fecha_hora BETWEEN %s AND %s{filtro}", [self.inicio, self.fin] + ([self.dispositivo] if self.dispositivo else [])
+
+    def _contar(self, cur, desde, hasta, incluir_hasta):
+        where, params = self._where()
+        cur.execute(f"SELECT COUNT(*) FROM mediciones {where} AND fecha_hora >= %s AND fecha_hora {'<=' if incluir_hasta else '<'} %s",
+                    params + [desde, hasta])
+        return cur.fetchone()[0]
+
+    def preparar(self, cur):
+        # Horas completas: de mediciones_1h (exacto, se actualiza en la misma transacción que mediciones).
+        # Las horas partidas de los extremos se cuentan directo: son a lo más una hora de índice cada una.
+        h_ini = self.inicio.replace(minute=0, second=0, microsecond=0)
+        if h_ini < self.inicio: h_ini += timedelta(hours=1)
+        h_fin = self.fin.replace(minute=0, second=0, microsecond=0)
+        tramos = []   # (límite, filas)
+        if h_fin <= h_ini:
+            tramos.append((None, self._contar(cur, self.inicio, self.fin, True)))
+        else:
+            tramos.append((None, self._contar(cur, h_fin, self.fin, True)))
+            filtro = " AND dispositivo_id = %s" if self.dispositivo else ""
+            cur.execute(f"SELECT periodo, SUM(n) FROM {resumenes.RESOLUCIONES[1][1]} WHERE periodo >= %s AND periodo < %s{filtro} "
+                        "GROUP BY periodo ORDER BY periodo DESC", [h_ini, h_fin] + ([self.dispositivo] if self.dispositivo else []))
+            tramos += [(periodo + timedelta(hours=1), int(n)) for periodo, n in cur.fetchall()]
+            tramos.append((h_ini, self._contar(cur, self.inicio, h_ini, False)))
+        self.anclas = []; acumuladas = 0
+        for limite, n in tramos:
+            if n: self.anclas.append((limite, acumuladas)); acumuladas += n
+        self.total = acumuladas
+        return self
+
+    def leer(self, cur, k, previa=None, siguiente=None):
+        # previa: llave de la última fila de la página k-1; siguiente: de la primera de k+1 (si están en caché)
+        where, params = self._where()
+        sql = f"SELECT {self.COLUMNAS} FROM mediciones {where}"
+        n = self.tam_pagina
+        if previa is not None:
+            # fecha_hora <= llave es redundante, pero le da al optimizador el rango del índice directo
+            cur.execute(sql + f" AND fecha_hora <= %s AND (fecha_hora < %s OR (fecha_hora = %s AND id < %s)) ORDER BY fecha_hora DESC, id DESC LIMIT {n}",
+                        params + [previa[0], previa[0], previa[0], previa[1]])
+            return list(cur.fetchall())
+        if siguiente is not None:
+            cur.execute(sql + f" AND fecha_hora >= %s AND (fecha_hora > %s OR (fecha_hora = %s AND id > %s)) ORDER BY fecha_hora ASC, id ASC LIMIT {n}",
+                        params + [siguiente[0], siguiente[0], siguiente[0], siguiente[1]])
+            return list(reversed(cur.fetchall()))
+        # Salto: ancla donde cae la fila k*n y OFFSET solo dentro de ella
+        fila = k * n
+        i = max(bisect.bisect_right([a[1] for a in self.anclas], fila) - 1, 0)
+        limite, antes = self.anclas[i] if self.anclas else (None, 0)
+        if limite is not None: sql += " AND fecha_hora < %s"; params.append(limite)
+        cur.execute(sql + f" ORDER BY fecha_hora DESC, id DESC LIMIT {n} OFFSET {max(fila - antes, 0)}", params)
+        return list(cur.fetchall())
+
+# ============================================================
+# VISTA: TREEVIEW CON RENGLONES REUSADOS
+# ============================================================
+class TablaVirtual:
+    def __init__(self, tree, barra, ejecutor, abrir_conexion, formatear, max_paginas=50, max_en_vuelo=4):
+        # tree: ttk.Treeview (show="headings"); barra: ttk.Scrollbar vertical.
+        # abrir_conexion: context manager que da una conexión (pool.consulta); formatear(fila) -> valores.
+        self.tree = tree; self.barra = barra
+        self.ejecutor = ejecutor; self.abrir_conexion = abrir_conexion
+        self.formatear = formatear
+        self.max_paginas = max_paginas
+        self.max_en_vuelo = max_en_vuelo
+        self.fuente = None
+        self.en_vuelo = {}             # k -> Tarea
+        self.generacion = 0
+        self.primera = 0
+        self.items = []
+        self.al_error = None
+        barra.configure(command=self._yview)
+        tree.bind("<Configure>", self._redimensionar)
+        tree.bind("<MouseWheel>", lambda e: self._rueda(-1 if e.delta > 0 else 1))
+        tree.bind("<Button-4>", lambda e: self._rueda(-1))
+        tree.bind("<Button-5>", lambda e: self._rueda(1))
+
+    def mostrar(self, fuente):
+        self.limpiar(); self.fuente = fuente
+        self._render()
+
+    def limpiar(self):
+        # Las páginas se quedan en la fuente (puede volver de la caché de consultas)
+        self.generacion += 1
+        for tarea in self.en_vuelo.values(): tarea.cancelar()
+        self.en_vuelo.clear()
+        self.fuente = None; self.primera = 0
+        self._render()
+
+    def refrescar(self): self._render()   # p. ej. al cambiar de unidades: la caché guarda SI
+
+    # --- Desplazamiento ---
+    def _visibles(self):
+        alto_fila = int(ttk.Style().lookup("Treeview", "rowheight") or 20); encabezado = 25
+        return max((self.tree.winfo_height() - encabezado) // alto_fila, 1)
+
+    def _redimensionar(self, _evento=None):
+        n = self._visibles()
+        if n == len(self.items): return
+        self.tree.delete(*self.items)
+        self.items = [self.tree.insert("", "end", values=()) for _ in range(n)]
+        self._render()
+
+    def _mover(self, primera):
+        total = self.fuente.total if self.fuente else 0
+        primera = max(min(int(primera), total - len(self.items)), 0)
+        if primera != self.primera: self.primera = primera; self._render()
+
+    def _yview(self, accion, cantidad, unidad=None):
+        total = self.fuente.total if self.fuente else 0
+        if accion == "moveto": self._mover(float(cantidad) * total)
+        elif accion == "scroll": self._mover(self.primera + int(cantidad) * (len(self.items) if unidad == "pages" else 1))
+
+    def _rueda(self, pasos):
+        self._mover(self.primera + pasos * 3); return "break"
+
+    # --- Pintado y páginas ---
+    def _render(self):
+        total = self.fuente.total if self.fuente else 0
+        tam = self.fuente.tam_pagina if self.fuente else TAM_PAGINA
+        for i, item in enumerate(self.items):
+            idx = self.primera + i
+            if idx >= total: self.tree.item(item, values=()); continue
+            k, j = divmod(idx, tam)
+            filas = self._pagina(k)
+            if filas is None: self.tree.item(item, values=("...",))
+            elif j < len(filas): self.tree.item(item, values=self.formatear(filas[j]))
+            else: self.tree.item(item, values=())
+        n = max(len(self.items), 1)
+        self.barra.set(self.primera / total if total else 0.0, min((self.primera + n) / total, 1.0) if total else 1.0)
+        if not self.fuente or not total: return
+        # Por adelantado: la página de antes y la de después de lo visible
+        k_ini = self.primera // tam; k_fin = min(self.primera + n - 1, total - 1) // tam
+        for k in (k_ini - 1, k_fin + 1):
+            if 0 <= k * tam < total: self._pagina(k)
+        # Lo que ya quedó lejos no vale la pena leerlo
+        for k in [k for k in self.en_vuelo if k < k_ini - 2 or k > k_fin + 2]: self.en_vuelo.pop(k).cancelar()
+
+    def _pagina(self, k):
+        if self.fuente.local: return self.fuente.leer(None, k)
+        paginas = self.fuente.paginas
+        if k in paginas: paginas.move_to_end(k); return paginas[k]
+        if k not in self.en_vuelo and len(self.en_vuelo) < self.max_en_vuelo: self._pedir(k)
+        return None
+
+    def _guardar(self, fuente, k, filas):
+        fuente.paginas[k] = filas
+        while len(fuente.paginas) > self.max_paginas: fuente.paginas.popitem(last=False)
+
+    def _pedir(self, k):
+        fuente = self.fuente; generacion = self.generacion; paginas = fuente.paginas
+        previa = fuente.clave(paginas[k - 1][-1]) if paginas.get(k - 1) else None
+        siguiente = fuente.clave(paginas[k + 1][0]) if previa is None and paginas.get(k + 1) else None
+        def trabajo(tarea):
+            with self.abrir_conexion() as conn, conn.cursor() as cur:
+                return fuente.leer(cur, k, previa, siguiente)
+        def propia():
+            # Una página cancelada y vuelta a pedir tiene otra tarea: los avisos de la vieja no cuentan
+            if generacion != self.generacion or self.en_vuelo.get(k) is not tarea[0]: return False
+            del self.en_vuelo[k]; return True
+        def listo(filas):
+            # Aunque ya se muestre otra cosa, la página sirve a su fuente (si vuelve de la caché)
+            if k not in paginas: self._guardar(fuente, k, filas)
+            if generacion != self.generacion: return
+            propia(); self._render()
+        def fallo(e):
+            if propia() and self.al_error: self.al_error(e)
+        tarea = [self.ejecutor.enviar(f"pagina {k}", trabajo, al_terminar=listo, al_error=fallo, al_cancelar=propia)]
+        self.en_vuelo[k] = tarea[0]
+
+# ============================================================
+# BENCHMARK: página profunda con OFFSET vs por llave (SQLite en memoria)
+# ============================================================
+if __name__ == "__main__":
+    import sqlite3
+    import time
+
+    n = 2_000_000
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE mediciones (id INTEGER PRIMARY KEY, fecha_hora TEXT, temperatura REAL)")
+    base = datetime(2025, 1, 1)
+    db.executemany("INSERT INTO mediciones (fecha_hora, temperatura) VALUES (?, ?)",
+                   (((base + timedelta(seconds=k // 2)).isoformat(sep=" "), 294.0) for k in range(n)))
+    db.execute("CREATE INDEX idx_fecha ON mediciones (fecha_hora, id)")
+    sql = "SELECT id, fecha_hora, temperatura FROM mediciones"
+    for fila in (1_000, 500_000, 1_900_000):
+        t0 = time.perf_counter()
+        pagina = db.execute(sql + f" ORDER BY fecha_hora DESC, id DESC LIMIT {TAM_PAGINA} OFFSET {fila}").fetchall()
+        t_offset = time.perf_counter() - t0
+        previa = db.execute(sql + f" ORDER BY fecha_hora DESC, id DESC LIMIT 1 OFFSET {fila - 1}").fetchone()
+        t0 = time.perf_counter()
+        llave = db.execute(sql + f" WHERE fecha_hora <= ? AND (fecha_hora < ? OR (fecha_hora = ? AND id < ?)) ORDER BY fecha_hora DESC, id DESC LIMIT {TAM_PAGINA}",
+                           (previa[1], previa[1], previa[1], previa[0])).fetchall()
+        t_llave = time.perf_counter() - t0
+        assert llave == pagina
+        print(f"fila {fila:>9,d}: OFFSET {t_offset * 1000:8.2f} ms | llave {t_llave * 1000:6.2f} ms")
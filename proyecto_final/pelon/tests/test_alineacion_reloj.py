@@ -0,0 +1,55 @@
+import numpy as np
+
+from alineacion_reloj import DESBORDE_MS, AlineadorReloj
+
+def test_desborde_entre_lotes_sigue_contando():
+    al = AlineadorReloj()
+    antes = al.alinear([DESBORDE_MS - 1000, DESBORDE_MS - 500], 100.0)
+    despues = al.alinear([0, 500], 101.0)
+    assert al.vueltas == 1 and al.reinicios == 0 and al.ultimo_ms == DESBORDE_MS + 500
+    # El modelo no se reinicia: todo el tramo queda en la misma recta, 0.5 s entre muestras
+    assert np.diff(np.r_[antes, despues]).tolist() == [0.5, 0.5, 0.5]
+
+def test_desborde_a_media_lectura():
+    al = AlineadorReloj()
+    t = al.alinear([DESBORDE_MS - 1000, DESBORDE_MS - 500, 0, 500], 100.0)
+    assert al.vueltas == 1 and al.reinicios == 0
+    assert np.diff(t).tolist() == [0.5, 0.5, 0.5] and t[-1] == 100.0
+
+def test_reinicio_entre_lotes_empieza_modelo_nuevo():
+    al = AlineadorReloj()
+    al.alinear([DESBORDE_MS - 1000], 100.0)   # con una vuelta previa: el reinicio también la olvida
+    al.alinear([500], 101.0)
+    t = al.alinear([300, 800], 105.0)
+    assert al.reinicios == 1 and al.vueltas == 0 and al.ultimo_ms == 800
+    # Modelo nuevo: la última muestra cae en "ahora" y las demás según su millis
+    assert t.tolist() == [104.5, 105.0] and al.desfase == 105.0 - 0.8
+
+def test_reinicio_a_media_lectura_conserva_el_modelo_viejo():
+    al = AlineadorReloj()
+    al.alinear([1000, 1500], 100.0)            # desfase 98.5
+    t = al.alinear([2000, 2500, 300, 800], 103.0)
+    assert al.reinicios == 1
+    # Lo anterior al reinicio sigue en el desfase viejo, no pegado a la primera muestra nueva
+    assert t[:2].tolist() == [100.5, 101.0]
+    assert t[2:].tolist() == [102.5, 103.0] and al.desfase == 103.0 - 0.8
+
+def test_reinicio_en_la_primera_muestra_del_lote():
+    al = AlineadorReloj()
+    al.alinear([5000], 100.0)
+    t = al.alinear([100, 600], 102.0)
+    assert al.reinicios == 1 and t.tolist() == [101.5, 102.0]
+
+def test_dos_reinicios_en_un_lote():
+    al = AlineadorReloj()
+    t = al.alinear([1000, 2000, 100, 600, 50, 550], 200.0)
+    assert al.reinicios == 2 and al.ultimo_ms == 550
+    # Cada tramo con su propio modelo; el último de cada uno llegó a más tardar "ahora"
+    assert np.allclose(t, [199.0, 200.0, 199.5, 200.0, 199.5, 200.0])
+
+def test_nunca_en_el_futuro_y_lote_vacio():
+    al = AlineadorReloj()
+    assert len(al.alinear([], 100.0)) == 0 and al.desfase is None
+    al.alinear([1000], 100.0)
+    # Llega antes de lo que predice el modelo (cota nueva más baja): se recorta a "ahora"
+    assert al.alinear([3000], 101.0).tolist() == [101.0]
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from cache_consultas import CacheConsultas
+
+MAC_A, MAC_B = "24:D7:EB:59:2E:30", "24:D7:EB:59:2E:31"
+
+class Fuente:
+    def __init__(self, n=10): self.n = n
+    def bytes(self): return self.n
+
+def llave(disp, dia, res="1m"): return (disp, f"2025-01-{dia:02d} 00:00:00", f"2025-01-{dia:02d} 23:59:59", res)
+
+def fila(fecha, disp=MAC_A): return (294.0, 50.0, 81600.0, fecha, disp, "x")
+
+def cache_llena():
+    c = CacheConsultas()
+    for ll in (llave(MAC_A, 3), llave(MAC_B, 3), llave(None, 3), llave(MAC_A, 4), llave(None, 5)): c.guardar(ll, Fuente())
+    return c
+
+def test_lote_tira_solo_lo_que_traslapa():
+    c = cache_llena()
+    c.invalidar_lote([fila(datetime(2025, 1, 3, 12)), fila(datetime(2025, 1, 3, 13))])
+    # Mismo dispositivo o "Todos" en ese día; el otro dispositivo y los otros días se quedan
+    assert c.obtener(llave(MAC_A, 3)) is None and c.obtener(llave(None, 3)) is None
+    assert c.obtener(llave(MAC_B, 3)) is not None and c.obtener(llave(MAC_A, 4)) is not None and c.obtener(llave(None, 5)) is not None
+    assert c.estadisticas()["invalidadas"] == 2
+
+def test_fechas_del_spool_en_texto_y_bordes():
+    c = cache_llena()
+    # El spool regresa las fechas como texto ISO; un rango de varios días del mismo lote se junta por dispositivo
+    c.invalidar_lote([fila("2025-01-04 23:59:59.250000", MAC_B), fila("2025-01-05 00:00:00", MAC_B)])
+    assert c.obtener(llave(MAC_A, 4)) is not None    # otro dispositivo
+    assert c.obtener(llave(None, 5)) is None          # "Todos" sí
+    # 23:59:59.25 queda fuera de un BETWEEN que termina en 23:59:59
+    assert c.obtener(llave(None, 3)) is not None
+
+def test_consulta_que_empezo_antes_de_invalidarse_no_se_guarda():
+    c = CacheConsultas(); m = c.marca()
+    c.invalidar_lote([fila(datetime(2025, 1, 3, 12))])
+    assert c.guardar(llave(MAC_A, 3), Fuente(), m) is False and c.obtener(llave(MAC_A, 3)) is None
+    # Lo que no toca esa invalidación sí se guarda, y lo que empezó después también
+    assert c.guardar(llave(MAC_B, 3), Fuente(), m) is True
+    assert c.guardar(llave(MAC_A, 3), Fuente(), c.marca()) is True
+
+def test_expulsa_por_lru_al_pasar_del_presupuesto():
+    c = CacheConsultas(max_bytes=25)
+    c.guardar(llave(MAC_A, 1), Fuente()); c.guardar(llave(MAC_A, 2), Fuente())
+    c.obtener(llave(MAC_A, 1))                         # la 2 queda como la menos usada
+    c.guardar(llave(MAC_A, 3), Fuente())
+    assert c.obtener(llave(MAC_A, 2)) is None and c.obtener(llave(MAC_A, 1)) is not None
+    # Una fuente cruda que crece al leer páginas se recalcula en cada acceso
+    grande = Fuente(); c.guardar(llave(MAC_A, 4), grande); grande.n = 30
+    c.obtener(llave(MAC_A, 4))
+    assert c.estadisticas()["bytes"] <= 25 and c.obtener(llave(MAC_A, 4)) is None
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from decimacion import DecimadorMinMax, ancho_columna, minmax_por_columna
+
+ANCHO_PX = 50
+
+def serie(n, paso=0.5, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return np.arange(n) * paso + 1000.0, rng.normal(size=n).cumsum()
+
+def directo(t, y, ancho_px=ANCHO_PX):
+    ancho = ancho_columna(t[-1] - t[0], ancho_px)
+    nt, ny, _ = minmax_por_columna(t, y, ancho)
+    return nt, ny, ancho
+
+def sin_primera_columna(t, y, ancho, t0):
+    # La primera columna de la ventana (la de t0) puede estar cortada: la caché conserva lo que ya tenía de ella
+    resto = np.floor(t / ancho) > np.floor(t0 / ancho)
+    return t[resto], y[resto]
+
+def test_llamadas_incrementales_igual_que_una_sola():
+    t, y = serie(20_000); d = DecimadorMinMax()
+    for fin in range(2000, 20_000, 137):
+        ini = fin - 2000                                   # ventana deslizante de 2000 muestras
+        rt, ry = d.reducir("t", t[ini:fin], y[ini:fin], ANCHO_PX)
+        nt, ny, ancho = directo(t[ini:fin], y[ini:fin])
+        a, b = sin_primera_columna(rt, ry, ancho, t[ini]), sin_primera_columna(nt, ny, ancho, t[ini])
+        np.testing.assert_array_equal(a[0], b[0]); np.testing.assert_array_equal(a[1], b[1])
+    # Sí se reusó la caché: columnas cerradas guardadas de vueltas anteriores
+    assert d._cache["t"].ultima_columna is not None and len(d._cache["t"].t)
+
+def test_ventana_alineada_a_columnas_coincide_exacto():
+    t, y = serie(8000); d = DecimadorMinMax()
+    ancho = ancho_columna(t[1999] - t[0], ANCHO_PX)
+    for fin in range(2000, 8000, 250):
+        # Inicio justo en el borde de una columna: nada queda cortado
+        ini = int(np.searchsorted(t, np.ceil(t[fin - 2000] / ancho) * ancho))
+        rt, ry = d.reducir("t", t[ini:fin], y[ini:fin], ANCHO_PX)
+        nt, ny, a = directo(t[ini:fin], y[ini:fin])
+        if a != ancho: continue
+        np.testing.assert_array_equal(rt, nt); np.testing.assert_array_equal(ry, ny)
+
+def test_cambio_de_ancho_rearma_la_cache():
+    t, y = serie(40_000); d = DecimadorMinMax()
+    d.reducir("t", t[:2000], y[:2000], ANCHO_PX)
+    anterior = d._cache["t"].ancho
+    # Ventana 8 veces más larga: otro ancho de columna, la caché vieja no sirve
+    rt, ry = d.reducir("t", t[:16_000], y[:16_000], ANCHO_PX)
+    nt, ny, ancho = directo(t[:16_000], y[:16_000])
+    assert ancho != anterior and d._cache["t"].ancho == ancho
+    np.testing.assert_array_equal(rt, nt); np.testing.assert_array_equal(ry, ny)
+
+def test_datos_que_retroceden_rearman_la_cache():
+    t, y = serie(6000); d = DecimadorMinMax()
+    d.reducir("t", t[2000:6000], y[2000:6000], ANCHO_PX)
+    # Sesión nueva (o buffer limpiado): el último tiempo es menor que lo que hay en caché
+    rt, ry = d.reducir("t", t[:4000], y[:4000], ANCHO_PX)
+    nt, ny, _ = directo(t[:4000], y[:4000])
+    np.testing.assert_array_equal(rt, nt); np.testing.assert_array_equal(ry, ny)
+
+@pytest.mark.parametrize("n", [0, 1, 2 * ANCHO_PX])
+def test_pocas_muestras_pasan_tal_cual(n):
+    t, y = serie(n)
+    rt, ry = DecimadorMinMax().reducir("t", t, y, ANCHO_PX)
+    assert rt is t and ry is y
@@ -0,0 +1,27 @@
+import threading
+
+from ejecutor_consultas import EjecutorConsultas
+
+class Widget:
+    # Sin Tk: after() solo guarda la función; el test bombea a mano
+    def after(self, ms, fn): pass
+
+def esperar(ejecutor):
+    ejecutor._pool.shutdown(wait=True); ejecutor._bombear()
+
+def test_resultado_de_tarea_cancelada_no_llega():
+    ejecutor = EjecutorConsultas(Widget()); listo = threading.Event(); eventos = []
+    def trabajo(tarea): listo.wait(5); return "datos viejos"
+    tarea = ejecutor.enviar("historial", trabajo, al_terminar=lambda r: eventos.append(("ok", r)),
+                            al_error=lambda e: eventos.append(("error", e)), al_cancelar=lambda: eventos.append(("cancelada",)))
+    # Se cancela cuando el trabajo ya pasó su último verificar(): su "ok" se cambia por "cancelada"
+    tarea.cancelar(); listo.set(); esperar(ejecutor)
+    assert eventos == [("cancelada",)] and tarea.terminada and not ejecutor.activas
+
+def test_error_en_un_callback_no_detiene_la_bomba(capsys):
+    ejecutor = EjecutorConsultas(Widget()); eventos = []
+    def falla(r): raise RuntimeError("widget destruido")
+    ejecutor.enviar("a", lambda t: 1, al_terminar=falla)
+    ejecutor.enviar("b", lambda t: 2, al_terminar=eventos.append)
+    esperar(ejecutor)
+    assert eventos == [2] and "widget destruido" in capsys.readouterr().err
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pymysql
+import pytest
+
+from escritor_db import EscritorDB
+from spool import SpoolLocal
+
+class Cursor:
+    def __init__(self, conn): self.conn = conn
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def executemany(self, sql, filas):
+        filas = list(filas)
+        if self.conn.error: raise self.conn.error
+        for f in filas:
+            if f[0] == "malo": raise pymysql.err.DataError(1366, "Incorrect DOUBLE value")
+        self.conn.pendientes += filas
+
+class Conexion:
+    # Simula pymysql: lo insertado solo queda en "tabla" con commit
+    def __init__(self, error=None):
+        self.error = error; self.tabla = []; self.pendientes = []
+    def cursor(self): return Cursor(self)
+    def commit(self): self.tabla += self.pendientes; self.pendientes = []
+    def rollback(self): self.pendientes = []
+
+def fila(k, temp=20.0): return (temp, 50.0, 81000.0, datetime(2025, 1, 1, 0, 0, k), "24:D7:EB:59:2E:30", "x")
+
+@pytest.fixture
+def spool(tmp_path):
+    s = SpoolLocal(str(tmp_path / "spool.db")); yield s; s.cerrar()
+
+def escritor(conn, spool, **kw):
+    e = EscritorDB(lambda: conn, spool=spool, **kw)
+    e._guardar([fila(k) for k in range(5)] + [fila(5, "malo")] + [fila(k) for k in range(6, 10)])
+    return e
+
+def test_fila_invalida_se_tira_sola(spool):
+    conn = Conexion(); e = escritor(conn, spool)
+    e._drenar()
+    assert len(conn.tabla) == 9 and e.perdidas == 1 and spool.pendientes == 0
+
+@pytest.mark.parametrize("error", [pymysql.err.ProgrammingError(1146, "Table 'sensores.mediciones' doesn't exist"),
+                                   pymysql.err.OperationalError(2013, "Lost connection"),
+                                   pymysql.err.InterfaceError(0, "")])
+def test_errores_de_esquema_o_conexion_conservan_el_spool(spool, error):
+    conn = Conexion(error); e = escritor(conn, spool)
+    e._drenar()
+    assert conn.tabla == [] and e.perdidas == 0 and spool.pendientes == 10 and e.errores == 1
+    # Al arreglarse (p. ej. ya migrado) el mismo spool llega completo, menos la fila inválida
+    conn.error = None; e._drenar()
+    assert len(conn.tabla) == 9 and spool.pendientes == 0
+
+def test_error_en_al_insertar_conserva_el_spool(spool):
+    def gancho(cur, lote): raise RuntimeError("bug en el gancho")
+    conn = Conexion(); e = escritor(conn, spool, al_insertar=gancho)
+    e._drenar()
+    assert conn.tabla == [] and e.perdidas == 0 and spool.pendientes == 10 and "bug en el gancho" in e.ultimo_error
+
+def test_error_en_al_confirmar_no_duplica(spool):
+    avisos = []
+    def aviso(lote): avisos.append(len(lote)); raise RuntimeError("caché rota")
+    conn = Conexion(); e = EscritorDB(lambda: conn, spool=spool, al_confirmar=aviso)
+    e._guardar([fila(k) for k in range(10)]); e._drenar()
+    assert len(conn.tabla) == 10 and avisos == [10] and spool.pendientes == 0 and e.insertadas == 10
+
+def test_conexion_perdida_a_media_revision_fila_por_fila(spool):
+    conn = Conexion(); e = escritor(conn, spool)
+    original = Cursor.executemany
+    def cae_en_la_octava(self, sql, filas):
+        if len(conn.tabla) == 7: raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+        original(self, sql, filas)
+    Cursor.executemany = cae_en_la_octava
+    try: e._drenar()
+    finally: Cursor.executemany = original
+    # 7 insertadas una por una (la 6a, inválida, tirada): salen del spool; las 2 últimas esperan
+    assert len(conn.tabla) == 7 and e.perdidas == 1 and spool.pendientes == 2
+    e._drenar()
+    assert len(conn.tabla) == 9 and spool.pendientes == 0
+
+def test_dataerror_en_resumenes_no_tira_filas(spool):
+    # Un DataError en al_insertar no es culpa de las filas crudas: todo el lote se reintenta
+    def gancho(cur, lote): raise pymysql.err.DataError(1264, "Out of range value for column 'n'")
+    conn = Conexion(); e = EscritorDB(lambda: conn, spool=spool, al_insertar=gancho)
+    e._guardar([fila(k) for k in range(10)]); e._drenar()
+    assert conn.tabla == [] and e.perdidas == 0 and spool.pendientes == 10
+    e.al_insertar = None; e._drenar()
+    assert len(conn.tabla) == 10 and spool.pendientes == 0
+
+def test_al_conectar_corre_con_cada_conexion_nueva(spool):
+    actual = [Conexion()]; preparadas = []; fallar = [True]
+    def migrar(conn):
+        if fallar[0]: raise pymysql.err.OperationalError(2003, "Can't connect")
+        preparadas.append(conn)
+    e = EscritorDB(lambda: actual[0], spool=spool, al_conectar=migrar)
+    e._guardar([fila(k) for k in range(10)]); e._drenar()
+    # Sin migrar no se inserta nada; se reintenta en la siguiente vuelta
+    assert actual[0].tabla == [] and spool.pendientes == 10
+    fallar[0] = False; e._drenar(); e._drenar()
+    assert preparadas == [actual[0]] and len(actual[0].tabla) == 10
+    # Reconexión: el pool entrega otra conexión y se vuelve a migrar antes de insertar
+    actual[0] = Conexion(); e._guardar([fila(k) for k in range(3)]); e._drenar()
+    assert len(preparadas) == 2 and preparadas[1] is actual[0] and len(actual[0].tabla) == 3
+
+def test_encolar_lote_cuenta_la_capacidad_en_filas():
+    conn = Conexion(); e = EscritorDB(lambda: conn, max_filas=4, max_espera=0.05, capacidad=10)
+    assert e.encolar_lote([fila(k) for k in range(6)]) is True
+    # Solo caben 4 más: se guardan esas y el resto se descarta
+    assert e.encolar_lote([fila(k) for k in range(6, 12)]) is False and e.encolar(fila(12)) is False
+    assert e.estadisticas()["cola"] == 10 and e.descartadas == 3
+    e.iniciar(); e.detener()
+    assert [f[3] for f in conn.tabla] == [fila(k)[3] for k in range(10)] and e.estadisticas()["cola"] == 0
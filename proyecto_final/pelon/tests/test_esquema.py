@@ -0,0 +1,18 @@
+import pymysql
+import pytest
+
+import esquema
+
+def test_migrador_reporta_avance_error_y_reintento(monkeypatch):
+    vistos = []; fallar = [True]
+    def migrar(conn, avisar=None):
+        avisar("migrando a v1: prueba"); vistos.append(m.texto)
+        if fallar[0]: raise pymysql.err.OperationalError(1142, "ALTER command denied")
+        return [1, 2]
+    monkeypatch.setattr(esquema, "migrar", migrar)
+    m = esquema.Migrador()
+    with pytest.raises(pymysql.err.OperationalError): m.migrar(object())
+    assert vistos == ["migrando a v1: prueba"] and "ALTER command denied" in m.error and "reintenta" in m.texto
+    fallar[0] = False
+    assert m.migrar(object()) == [1, 2]
+    assert m.error is None and m.texto.endswith("al día (aplicadas: 1, 2)")
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import exportador
+
+pa = pytest.importorskip("pyarrow")
+
+class Cursor:
+    def __init__(self, filas): self.filas = filas
+    def fetchmany(self, n): lote, self.filas = self.filas[:n], self.filas[n:]; return lote
+
+def filas():
+    # Bloques de 4: la segunda MAC y su alias aparecen hasta el segundo bloque, y luego se alternan
+    base = datetime(2025, 12, 1)
+    macs = ["24:D7:EB:59:2E:30"] * 4 + ["24:D7:EB:59:2E:31", "24:D7:EB:59:2E:30"] * 3
+    return [(base + timedelta(seconds=k), 294.0, 50.0, 81600.0, m, "Sotano" if m.endswith("31") else None) for k, m in enumerate(macs)]
+
+@pytest.mark.parametrize("escribir, ext", [(exportador.escribir_arrow, ".arrow"), (exportador.escribir_parquet, ".parquet")])
+def test_macs_nuevas_en_bloques_posteriores(tmp_path, escribir, ext):
+    destino = str(tmp_path / ("datos" + ext))
+    assert escribir(Cursor(filas()), destino, bloque=4) == 10
+    if ext == ".arrow":
+        with pa.memory_map(destino) as src: tabla = pa.ipc.open_file(src).read_all()
+    else: tabla = exportador.pq.read_table(destino)
+    assert tabla.column("dispositivo_id").to_pylist() == [f[4] for f in filas()]
+    assert tabla.column("alias").to_pylist() == [f[5] or "---" for f in filas()]
+
+def test_npz_con_varias_macs(tmp_path):
+    destino = str(tmp_path / "datos.npz")
+    assert exportador.escribir_npz(Cursor(filas()), destino, bloque=4) == 10
+    with np.load(destino) as z: macs = z["dispositivo_id_valores"][z["dispositivo_id"]].tolist()
+    assert macs == [f[4] for f in filas()]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from indice_tiempo import inicio_ventana, mas_cercano
+
+T = np.array([10.0, 11.0, 11.0, 13.0, 20.0])
+
+@pytest.mark.parametrize("t, esperado", [
+    (-1e9, 0), (9.99, 0),           # antes de la primera
+    (20.0001, 4), (1e12, 4),        # después de la última
+    (10.0, 0), (13.0, 3), (20.0, 4), (11.0, 1),   # exacto (repetidos: la primera)
+    (12.0, 2),                      # empate a la mitad: la anterior (la última de las repetidas)
+    (12.1, 3), (16.4, 3), (16.6, 4),
+])
+def test_mas_cercano(t, esperado):
+    assert mas_cercano(T, t) == esperado
+
+def test_mas_cercano_igual_que_recorrer():
+    rng = np.random.default_rng(0)
+    tiempos = np.sort(rng.uniform(0, 100, 500))
+    for t in rng.uniform(-10, 110, 200):
+        assert abs(tiempos[mas_cercano(tiempos, t)] - t) == np.abs(tiempos - t).min()
+
+def test_sin_muestras():
+    assert mas_cercano(np.empty(0), 5.0) == -1
+    assert mas_cercano(np.array([3.0]), 5.0) == 0
+
+@pytest.mark.parametrize("corte, esperado", [(0.0, 0), (10.0, 1), (11.0, 3), (12.0, 3), (20.0, 5), (99.0, 5)])
+def test_inicio_ventana(corte, esperado):
+    # Primer índice con t > corte
+    assert inicio_ventana(T, corte) == esperado
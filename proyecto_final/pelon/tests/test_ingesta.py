@@ -0,0 +1,32 @@
+import errno
+
+import pytest
+
+import ingesta
+from ingesta import LectorPuerto
+
+class Serial:
+    def fileno(self): return 99
+
+def lector(monkeypatch, resultado):
+    def leer(fd, n):
+        if isinstance(resultado, BaseException): raise resultado
+        return resultado
+    monkeypatch.setattr(ingesta, "USAR_SELECTOR", True)
+    monkeypatch.setattr(ingesta.os, "read", leer)
+    l = LectorPuerto.__new__(LectorPuerto); l.serial = Serial(); l.recibidos = []
+    l.procesar = l.recibidos.append
+    return l
+
+@pytest.mark.parametrize("error", [BlockingIOError(errno.EAGAIN, "Resource temporarily unavailable"), InterruptedError(errno.EINTR, "")])
+def test_lectura_sin_datos_no_cierra_el_puerto(monkeypatch, error):
+    l = lector(monkeypatch, error)
+    assert l.leer() is True and l.recibidos == []
+
+@pytest.mark.parametrize("resultado", [b"", OSError(errno.EIO, "Input/output error")])
+def test_eof_o_eio_cierran_el_puerto(monkeypatch, resultado):
+    assert lector(monkeypatch, resultado).leer() is False
+
+def test_datos_se_procesan(monkeypatch):
+    l = lector(monkeypatch, b"1000,21.5,40.0,812.3\n")
+    assert l.leer() is True and l.recibidos == [b"1000,21.5,40.0,812.3\n"]
@@ -0,0 +1,30 @@
+import pymysql
+
+import pool_db
+from pool_db import PoolDB
+
+class Conexion:
+    def __init__(self, falla_rollback=False):
+        self.open = True; self.rollbacks = 0; self.falla_rollback = falla_rollback
+    def rollback(self):
+        if self.falla_rollback: raise pymysql.err.OperationalError(2013, "Lost connection")
+        self.rollbacks += 1
+    def close(self): self.open = False
+
+def test_consulta_cierra_la_transaccion_al_devolver(monkeypatch):
+    creadas = []
+    monkeypatch.setattr(pool_db.pymysql, "connect", lambda **kw: creadas.append(Conexion()) or creadas[-1])
+    pool = PoolDB(tam_consultas=1)
+    with pool.consulta() as conn: pass
+    # La siguiente consulta reusa la conexión, ya sin la foto REPEATABLE READ de la anterior
+    assert conn.rollbacks == 1
+    with pool.consulta() as otra: assert otra is conn
+    assert len(creadas) == 1
+
+def test_conexion_que_no_hace_rollback_no_vuelve_al_pool(monkeypatch):
+    creadas = []
+    monkeypatch.setattr(pool_db.pymysql, "connect", lambda **kw: creadas.append(Conexion(not creadas)) or creadas[-1])
+    pool = PoolDB(tam_consultas=1)
+    with pool.consulta() as conn: pass
+    assert not conn.open and pool.estadisticas()["abiertas"] == 0
+    with pool.consulta() as otra: assert otra is not conn
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from protocolo import ParserProtocolo
+
+def lento(bloque):
+    # El camino del regex, línea por línea, como referencia
+    p = ParserProtocolo()
+    return p._lento(bloque.replace(b"\r", b"").split(b"\n")[:-1]), p
+
+BLOQUES = [
+    b"ID:24:D7:EB:59:2E:30|Sala\r\n1000,21.5,40.0,812.3\r\n1500,21.6,40.1,812.4\r\n",
+    # 3 campos + 5 campos = 8: el total cuadra pero las filas no
+    b"1000,21.5,40.0\n1500,21.6,40.1,812.4,99\n2000,21.7,40.2,812.5\n",
+    b"1000,21.5,40.0,812.3\n1500,21.6,,812.4\n2000,21.7,40.2,812.5\n",
+    b"1000,21.5,40.0,812.3\n1500,21.6\n2000,21.7,40.2,812.5\n",
+    b"1000,21.5,40.0,812.3\nbasura\n2000,21.7,40.2,812.5\n",
+    b"1000,21.5,40.0,812.3,\n2000,21.7,40.2,812.5\n",
+]
+
+@pytest.mark.parametrize("bloque", BLOQUES)
+def test_rapido_y_regex_dan_lo_mismo(bloque):
+    p = ParserProtocolo()
+    m, _ = p.procesar(bloque)
+    esperado, ref = lento(bloque)
+    np.testing.assert_array_equal(m, esperado)
+    assert (p.malformadas, p.truncadas) == (ref.malformadas, ref.truncadas)
+
+def test_filas_corridas_no_se_aceptan():
+    p = ParserProtocolo()
+    m, _ = p.procesar(BLOQUES[1])
+    # Solo la fila completa y la de 5 campos (el regex acepta campos extra); la de 3 es truncada
+    assert m[:, 0].tolist() == [1500.0, 2000.0] and p.truncadas == 1
+    assert m[0].tolist() == [1500.0, 21.6, 40.1, 812.4]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import resumenes
+from resumenes import CRUDO, agregar, elegir_resolucion, consultar
+
+MAC_A, MAC_B = "24:D7:EB:59:2E:30", "24:D7:EB:59:2E:31"
+
+class Cursor:
+    def __init__(self): self.sql = None; self.params = None
+    def execute(self, sql, params): self.sql = sql; self.params = params
+    def fetchall(self): return []
+
+@pytest.mark.parametrize("rango, esperado", [
+    (timedelta(days=600), "1d"),                      # 600 días llenan la vista
+    (timedelta(days=30), "1h"),                       # 720 horas
+    (timedelta(hours=12), "1m"),                      # 720 minutos
+    (timedelta(minutes=30), CRUDO),                   # 3600 crudas a 2 Hz caben en max_crudas
+    (timedelta(hours=2), "1m"),                       # 14400 crudas no caben: la más fina
+])
+def test_elegir_resolucion(rango, esperado):
+    inicio = datetime(2025, 1, 1)
+    assert elegir_resolucion(inicio, inicio + rango, 500, 5000, 2.0)[0] == esperado
+    # Igual con texto ISO, como llegan de la GUI
+    assert elegir_resolucion(str(inicio), str(inicio + rango), 500, 5000, 2.0)[0] == esperado
+
+def test_agregar_sumas_minimos_y_maximos():
+    base = datetime(2025, 1, 1, 10, 59, 30)
+    lote = [(290.0, 40.0, 80000.0, base, MAC_A, "viejo"),
+            (292.0, 42.0, 80200.0, base + timedelta(seconds=20), MAC_A, "sala"),
+            (300.0, 50.0, 81000.0, base + timedelta(seconds=40), MAC_A, "sala"),   # ya es 11:00
+            (280.0, 30.0, 79000.0, base, MAC_B, "sotano")]
+    r = agregar(lote)
+    por = {t: {(f[0], f[1]): f for f in filas} for t, filas in r.items()}
+    m = por["mediciones_1m"][(MAC_A, datetime(2025, 1, 1, 10, 59))]
+    assert m[2:] == ("sala", 2, 582.0, 290.0, 292.0, 82.0, 40.0, 42.0, 160200.0, 80000.0, 80200.0)
+    assert set(por["mediciones_1h"]) == {(MAC_A, datetime(2025, 1, 1, 10)), (MAC_A, datetime(2025, 1, 1, 11)), (MAC_B, datetime(2025, 1, 1, 10))}
+    d = por["mediciones_1d"][(MAC_A, datetime(2025, 1, 1))]
+    assert d[3:] == (3, 882.0, 290.0, 300.0, 132.0, 40.0, 50.0, 241200.0, 80000.0, 81000.0)
+    assert por["mediciones_1d"][(MAC_B, datetime(2025, 1, 1))][3:7] == (1, 280.0, 280.0, 280.0)
+    assert agregar([]) == {}
+
+@pytest.mark.parametrize("inicio, fin, resolucion, desde", [
+    ("2025-01-01 10:00:00", "2026-12-31 00:00:00", "1d", datetime(2025, 1, 1)),
+    ("2025-01-01 10:30:00", "2025-02-15 00:00:00", "1h", datetime(2025, 1, 1, 10)),
+    ("2025-01-01 10:30:45", "2025-01-01 23:00:00", "1m", datetime(2025, 1, 1, 10, 30)),
+])
+def test_consultar_incluye_el_primer_periodo(inicio, fin, resolucion, desde):
+    cur = Cursor()
+    nombre, _ = consultar(cur, inicio, fin, MAC_A)
+    assert nombre == resolucion and cur.params == (desde, fin, MAC_A) and "periodo BETWEEN" in cur.sql
+
+def test_consultar_crudas_usa_el_rango_tal_cual():
+    cur = Cursor()
+    assert consultar(cur, "2025-01-01 10:00:07", "2025-01-01 10:10:00")[0] == CRUDO
+    assert cur.params == ("2025-01-01 10:00:07", "2025-01-01 10:10:00")
+
+def test_inicio_periodo():
+    assert resumenes.inicio_periodo(datetime(2025, 3, 9, 23, 59, 59, 999000), "1d") == datetime(2025, 3, 9)
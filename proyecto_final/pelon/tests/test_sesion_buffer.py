@@ -0,0 +1,54 @@
+import numpy as np
+
+from sesion_buffer import BufferSesion
+
+def lote(t0, n, paso=1.0):
+    t = t0 + np.arange(n) * paso
+    return t, (t * 2).astype(np.float32), (t * 3).astype(np.float32), (t * 4).astype(np.float32)
+
+def test_vuelta_del_anillo_da_las_ultimas_en_orden():
+    b = BufferSesion(retencion_s=1000, tasa_max_hz=0.01, holgura=2)   # capacidad 12, visibles 10
+    for k in range(37): b.append(float(k), k * 2.0, k * 3.0, k * 4.0)
+    t, temp, hum, pres = b.ventana()
+    assert t.tolist() == list(range(27, 37)) and temp.tolist() == [k * 2.0 for k in range(27, 37)]
+    assert len(b) == 10 and b.total == 37 and b.ultimo()[0] == 36.0
+    # Vista contigua sobre el arreglo doble, sin copia
+    assert np.shares_memory(t, b._t)
+
+def test_holgura_protege_la_vista_de_la_gui():
+    b = BufferSesion(retencion_s=1000, tasa_max_hz=0.01, holgura=3)   # capacidad 13, visibles 10
+    b.extender(*lote(0.0, 20))
+    t, *_ = b.ventana(); visto = t.copy()
+    # El receptor puede escribir hasta "holgura" muestras más sin pisar lo que la GUI ya tiene
+    b.extender(*lote(20.0, 3))
+    assert t.tolist() == visto.tolist() == list(range(10, 20))
+    assert b.ventana()[0].tolist() == list(range(13, 23))
+
+def test_extender_mas_que_la_capacidad_guarda_las_ultimas():
+    b = BufferSesion(retencion_s=1000, tasa_max_hz=0.01, holgura=2)   # capacidad 12
+    b.extender(*lote(0.0, 5))
+    b.extender(*lote(5.0, 50))
+    t, temp, _, pres = b.ventana()
+    assert t.tolist() == list(range(45, 55)) and pres.tolist() == [k * 4.0 for k in range(45, 55)]
+    assert b.total == 55 and b.ultimo()[0] == 54.0
+
+def test_extender_mas_que_la_capacidad_no_retrocede_el_tiempo():
+    b = BufferSesion(retencion_s=1000, tasa_max_hz=0.01, holgura=2)
+    b.extender(*lote(0.0, 30))                                        # última: 29
+    b.extender(*lote(0.0, 20))                                        # el reloj retrocedió
+    t = b.ventana()[0]
+    assert (np.diff(t) >= 0).all() and t[0] >= 29.0
+
+def test_tiempos_no_decrecientes_y_recorte_por_retencion():
+    b = BufferSesion(retencion_s=10, tasa_max_hz=1)                   # capacidad de sobra
+    b.append(5.0, 1, 1, 1); b.append(4.0, 1, 1, 1)                    # NTP movió el reloj hacia atrás
+    assert b.ventana()[0].tolist() == [5.0, 5.0]
+    b.extender(*lote(6.0, 20))
+    t = b.ventana()[0]
+    assert t[0] >= t[-1] - 10 and t[-1] == 25.0
+
+def test_vacio():
+    b = BufferSesion(10, 1)
+    assert len(b) == 0 and b.ultimo() is None and all(len(a) == 0 for a in b.ventana())
+    b.extender(*lote(0.0, 0))
+    assert b.total == 0
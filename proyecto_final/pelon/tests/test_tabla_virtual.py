@@ -0,0 +1,94 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from tabla_virtual import FuenteKeyset
+
+sqlite3.register_converter("FECHA", lambda b: datetime.fromisoformat(b.decode()))
+
+class Cursor:
+    # Cursor tipo pymysql (%s, datetime) sobre SQLite en memoria; guarda lo que se ejecutó
+    def __init__(self, db): self.db = db; self.consultas = []; self._filas = []
+    def execute(self, sql, params=()):
+        self.consultas.append((sql, list(params)))
+        params = [p.isoformat(sep=" ") if isinstance(p, datetime) else p for p in params]
+        self._filas = self.db.execute(sql.replace("%s", "?"), params).fetchall()
+    def fetchall(self): return self._filas
+    def fetchone(self): return self._filas[0] if self._filas else None
+
+BASE = datetime(2025, 3, 1, 10, 0)
+MACS = ("AA", "BB")
+
+@pytest.fixture
+def cur():
+    db = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    db.execute("CREATE TABLE mediciones (id INTEGER PRIMARY KEY, fecha_hora FECHA, temperatura REAL, humedad REAL, "
+               "presion REAL, dispositivo_id TEXT, alias TEXT)")
+    db.execute("CREATE TABLE mediciones_1h (periodo FECHA, dispositivo_id TEXT, n INTEGER)")
+    # 10:00-15:00 cada 20 s con la hora 12 vacía; 3 filas por segundo (empates en fecha_hora) y los id
+    # revueltos respecto al tiempo, para que el orden dependa de verdad de (fecha_hora, id)
+    filas = [(BASE + timedelta(seconds=s), mac) for s in range(0, 5 * 3600, 20) if not 7200 <= s < 10800
+             for mac in (MACS[0], MACS[1], MACS[s % 40 // 20])]
+    random.Random(0).shuffle(filas)
+    db.executemany("INSERT INTO mediciones (fecha_hora, temperatura, humedad, presion, dispositivo_id, alias) "
+                   "VALUES (?, 294.0, 50.0, 81000.0, ?, NULL)", [(f.isoformat(sep=" "), m) for f, m in filas])
+    db.execute("INSERT INTO mediciones_1h SELECT strftime('%Y-%m-%d %H:00:00', fecha_hora), dispositivo_id, COUNT(*) "
+               "FROM mediciones GROUP BY 1, 2")
+    return Cursor(db)
+
+def todas(cur, inicio, fin, dispositivo=None):
+    filtro = " AND dispositivo_id = %s" if dispositivo else ""
+    cur.execute(f"SELECT {FuenteKeyset.COLUMNAS} FROM mediciones WHERE fecha_hora BETWEEN %s AND %s{filtro} "
+                "ORDER BY fecha_hora DESC, id DESC", [inicio, fin] + ([dispositivo] if dispositivo else []))
+    return cur.fetchall()
+
+RANGOS = [
+    (BASE + timedelta(minutes=17, seconds=30), BASE + timedelta(hours=4, minutes=41)),   # horas partidas en los dos extremos
+    (BASE, BASE + timedelta(hours=5)),                                                  # alineado a la hora
+    (BASE + timedelta(hours=1, minutes=5), BASE + timedelta(hours=1, minutes=50)),      # dentro de una sola hora
+]
+
+@pytest.mark.parametrize("inicio, fin", RANGOS)
+@pytest.mark.parametrize("dispositivo", [None, "BB"])
+def test_anclas_cuentan_igual_que_las_filas(cur, inicio, fin, dispositivo):
+    ref = todas(cur, inicio, fin, dispositivo)
+    f = FuenteKeyset(inicio, fin, dispositivo).preparar(cur)
+    assert f.total == len(ref)
+    # Cada ancla dice cuántas filas del rango quedan en o después de su límite
+    # (el borde superior solo deja ancla None si tiene filas; si no, la primera es el fin de la última hora)
+    limites = [a[0] for a in f.anclas]
+    assert f.anclas[0][1] == 0 and None not in limites[1:] and limites[1:] == sorted(limites[1:], reverse=True)
+    for limite, antes in f.anclas:
+        assert antes == sum(1 for r in ref if limite is not None and r[1] >= limite)
+    # La hora sin datos no deja ancla
+    assert BASE + timedelta(hours=3) not in limites
+
+@pytest.mark.parametrize("inicio, fin", RANGOS)
+@pytest.mark.parametrize("dispositivo", [None, "AA"])
+def test_salto_a_cualquier_pagina(cur, inicio, fin, dispositivo):
+    ref = todas(cur, inicio, fin, dispositivo)
+    f = FuenteKeyset(inicio, fin, dispositivo, tam_pagina=7).preparar(cur)
+    for k in range(-(-f.total // 7)):
+        cur.consultas.clear()
+        assert f.leer(cur, k) == ref[k * 7:(k + 1) * 7], k
+        # El OFFSET es solo dentro de la hora del ancla, no desde la fila más nueva
+        assert int(cur.consultas[0][0].rsplit("OFFSET ", 1)[1]) < 3 * 180
+    assert f.leer(cur, f.total // 7 + 1) == []
+
+def test_paginas_por_llave_con_empates(cur):
+    inicio, fin = RANGOS[0]
+    ref = todas(cur, inicio, fin)
+    f = FuenteKeyset(inicio, fin, tam_pagina=7).preparar(cur)
+    paginas = [ref[i:i + 7] for i in range(0, len(ref), 7)]
+    # Con 3 filas por segundo y páginas de 7, casi todos los cortes caen a media fecha_hora
+    assert sum(p[-1][1] == s[0][1] for p, s in zip(paginas, paginas[1:])) > len(paginas) // 2
+    for k in range(1, len(paginas)):
+        assert f.leer(cur, k, previa=f.clave(paginas[k - 1][-1])) == paginas[k], k
+    for k in range(len(paginas) - 1):
+        assert f.leer(cur, k, siguiente=f.clave(paginas[k + 1][0])) == paginas[k], k
+
+def test_rango_vacio(cur):
+    f = FuenteKeyset(BASE + timedelta(hours=2, minutes=10), BASE + timedelta(hours=2, minutes=50)).preparar(cur)
+    assert f.total == 0 and f.anclas == [] and f.leer(cur, 0) == []